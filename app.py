@@ -5,6 +5,7 @@ import os
 import json
 from datetime import datetime
 import secrets
+from typing import List, Optional
 
 # Core FastAPI and database imports
 from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
@@ -15,35 +16,29 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import the browser manager
 from aurora_agent.browser_manager import browser_manager
-from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import RedirectResponse, HTMLResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 import os
 
 # Import OAuth and database components
-from aurora_agent.auth import oauth_manager, store_user_tokens, get_user_tokens, get_valid_access_token
+from aurora_agent.auth import (
+    get_oauth_manager, store_user_tokens, get_user_tokens, get_valid_access_token,
+    start_token_renewal, stop_token_renewal,
+)
 from aurora_agent.database import create_tables, get_db, AsyncSessionLocal, UserToken
-# from aurora_agent.websocket_manager import websocket_manager  # Module not found - commented out
-# from aurora_agent.webhook_handler import webhook_handler  # Module not found - commented out
+from aurora_agent.mission_queue import mission_queue, QueueFullError, PRIORITY_INTERACTIVE
+from aurora_agent.mission_events import (
+    MissionEventTranslator, final_text, format_sse, MISSION_STARTED, SCREENSHOT, TOOL_FINISHED
+)
+from aurora_agent.websocket_manager import websocket_manager, GROUP_ADMIN_TOKEN
+from aurora_agent.webhook_handler import webhook_handler, WebhookQueueFullError
+from aurora_agent.llm_clients import clear_prompt_caches, usage_stats as llm_usage_stats
 # from aurora_agent.gcp_services.deployment_service import ImprinterDeploymentService  # Module not found - commented out
 
 # Create minimal stubs for missing components
-class WebSocketManager:
-    def __init__(self):
-        pass
-    async def connect(self, websocket):
-        pass
-    async def disconnect(self, websocket):
-        pass
-
-class WebhookHandler:
-    def __init__(self):
-        pass
-    async def handle_webhook(self, request):
-        return {"status": "ok"}
-
 class ImprinterDeploymentService:
     def __init__(self, credentials=None):
         self.credentials = credentials
@@ -61,8 +56,6 @@ class ImprinterDeploymentService:
         return {"deployed": False, "error": "ImprinterDeploymentService not available in this environment"}
 
 # Create stub instances
-websocket_manager = WebSocketManager()
-webhook_handler = WebhookHandler()
 deployment_service = ImprinterDeploymentService()
 
 app = FastAPI()
@@ -76,6 +69,18 @@ if os.path.exists(static_path):
 @app.on_event("startup")
 async def startup_event():
     await create_tables()
+    # Missions run on a bounded worker pool, one worker per browser context
+    mission_queue.start(execute_browser_mission)
+    # Renew cached OAuth tokens before they expire so requests never wait on Google
+    start_token_renewal()
+    webhook_handler.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await mission_queue.stop()
+    await stop_token_renewal()
+    await webhook_handler.stop()
+    await clear_prompt_caches()
 
 
 logger = logging.getLogger(__name__)
@@ -98,17 +103,111 @@ async def root():
         </html>
         """)
 
-# --- Critical ADK Patch ---
-# The google-adk library does not correctly add the user's first message to the request.
-# We are patching the method responsible for calling the LLM (`_call_llm_async`)
-# to ensure the user's content is added to the request payload before being sent.
-from google.adk.flows.llm_flows import base_llm_flow
-
 
 @app.post("/run-mission")
 async def run_mission(payload: dict):
-    session_id = payload.get("session_id", "default")
-    return await execute_browser_mission(payload, session_id)
+    session_id = payload.get("session_id")
+    try:
+        # Still waits for the result, but takes its turn in the queue instead of racing other missions
+        return await mission_queue.run(payload, session_id, PRIORITY_INTERACTIVE)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+# --- Mission Job Endpoints ---
+
+@app.post("/missions", status_code=202)
+async def submit_mission(payload: dict):
+    """
+    Queues a mission and returns its job ID immediately.
+    Optional `priority` is "interactive" (default) or "background".
+    """
+    session_id = payload.get("session_id")
+    priority = payload.get("priority", PRIORITY_INTERACTIVE)
+    try:
+        job = mission_queue.submit(payload, session_id, priority)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return mission_queue.status(job.id)
+
+
+@app.get("/missions/{job_id}")
+async def get_mission_status(job_id: str):
+    """Status, queue position and (once finished) result of a mission job."""
+    status = mission_queue.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Mission job {job_id} not found")
+    return status
+
+
+@app.delete("/missions/{job_id}")
+async def cancel_mission(job_id: str):
+    """Cancels a queued or running mission job."""
+    job = mission_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Mission job {job_id} not found")
+    return mission_queue.status(job_id)
+
+
+def _sse_response(job) -> StreamingResponse:
+    async def stream():
+        async for progress in job.subscribe():
+            yield format_sse(progress)
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.post("/run-mission/stream")
+async def run_mission_stream(payload: dict):
+    """
+    Like /run-mission, but streams progress records as Server-Sent Events
+    (tool_started, tool_finished, model_text, screenshot, mission_finished).
+    """
+    session_id = payload.get("session_id")
+    try:
+        job = mission_queue.submit(payload, session_id, payload.get("priority", PRIORITY_INTERACTIVE))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return _sse_response(job)
+
+
+@app.get("/missions/{job_id}/events")
+async def stream_mission_events(job_id: str):
+    """Server-Sent Events for a submitted job: past records first, then live ones."""
+    job = mission_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Mission job {job_id} not found")
+    return _sse_response(job)
+
+
+@app.get("/missions/{job_id}/screenshots/{seq}")
+async def get_mission_screenshot(job_id: str, seq: int):
+    """Serves a screenshot referenced by a `screenshot` progress record."""
+    job = mission_queue.get(job_id)
+    image = job.screenshots.get(seq) if job else None
+    if image is None:
+        raise HTTPException(status_code=404, detail="Screenshot not found")
+    return Response(content=image, media_type="image/png")
+
+
+@app.websocket("/ws/missions/{job_id}")
+async def mission_events_websocket(websocket: WebSocket, job_id: str):
+    """WebSocket alternative to /missions/{job_id}/events."""
+    await websocket.accept()
+    job = mission_queue.get(job_id)
+    if job is None:
+        await websocket.close(code=4404, reason="Mission job not found")
+        return
+    try:
+        async for progress in job.subscribe():
+            await websocket.send_json(progress)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Mission event subscriber for {job_id} disconnected")
 
 
 # --- OAuth 2.0 Endpoints ---
@@ -133,7 +232,7 @@ async def google_auth_redirect(request: Request, user_id: str = "default_teacher
         state_with_user = f"{state}:{user_id}"
         
         # Create authorization URL
-        auth_url = oauth_manager.create_authorization_url(state_with_user)
+        auth_url = get_oauth_manager().create_authorization_url(state_with_user)
         
         logger.info(f"Redirecting user {user_id} to Google OAuth: {auth_url}")
         
@@ -184,7 +283,7 @@ async def google_auth_callback(
             raise HTTPException(status_code=400, detail="Invalid state parameter")
         
         # Exchange authorization code for tokens
-        token_data = oauth_manager.exchange_code_for_tokens(code, state)
+        token_data = get_oauth_manager().exchange_code_for_tokens(code, state)
         
         # Store tokens in database
         await store_user_tokens(db, user_id, token_data)
@@ -270,6 +369,12 @@ async def auth_status(user_id: str = "default_teacher", db: AsyncSession = Depen
         raise HTTPException(status_code=500, detail="Failed to check authentication status")
 
     
+# --- Critical ADK Patch ---
+# The google-adk library does not correctly add the user's first message to the request.
+# We are patching the method responsible for calling the LLM (`_call_llm_async`)
+# to ensure the user's content is added to the request payload before being sent.
+# google.adk takes over a second to import, so the patch is applied on the first
+# mission rather than when the app is imported.
 async def patched_call_llm_async(self, invocation_context):
     llm_request = self._build_llm_request(invocation_context)
     if invocation_context.new_message and invocation_context.new_message.content:
@@ -279,17 +384,45 @@ async def patched_call_llm_async(self, invocation_context):
     ):
         yield self._build_event_from_llm_response(llm_response)
 
-# Apply the patch
-base_llm_flow.BaseLlmFlow._call_llm_async = patched_call_llm_async
+_adk_patch_applied = False
+
+def apply_adk_patch():
+    global _adk_patch_applied
+    if _adk_patch_applied:
+        return
+    from google.adk.flows.llm_flows import base_llm_flow
+
+    base_llm_flow.BaseLlmFlow._call_llm_async = patched_call_llm_async
+    _adk_patch_applied = True
 # --- End of Patch ---
 
 
 # --- Main Executor Function ---
-async def execute_browser_mission(mission_payload: dict, session_id: str) -> dict:
+async def _emit_screenshot(emit):
+    """Sends a screenshot reference if the page visibly changed since the last one."""
+    try:
+        image, diff = await browser_manager.capture_changed_screenshot()
+    except Exception as e:
+        logger.debug(f"No progress screenshot: {e}")
+        return
+    if image:
+        emit({"type": SCREENSHOT, "image": image, "width": diff.size[0], "height": diff.size[1],
+              "bbox": list(diff.bbox) if diff.bbox else None})
+
+
+async def execute_browser_mission(mission_payload: dict, session_id: Optional[str], on_event=None) -> dict:
+    """
+    Runs one mission turn; without a `session_id` nothing is persisted. `on_event` receives compact progress records (see
+    aurora_agent.mission_events) as the agent works.
+    """
     logger.info(f"--- ADK MISSION STARTING (Session: {session_id}) ---")
+    emit = on_event or (lambda progress: None)
+    translator = MissionEventTranslator()
+    stream_screenshots = bool(mission_payload.get("stream_screenshots"))
 
     try:
-        await browser_manager.start_browser()
+        # A named session gets its own profile clone in persistent-profile mode
+        await browser_manager.start_browser(session_id=session_id)
         logger.info("Browser is running.")
     except Exception as e:
         logger.error(f"CRITICAL: Failed to start browser: {e}", exc_info=True)
@@ -304,51 +437,45 @@ async def execute_browser_mission(mission_payload: dict, session_id: str) -> dic
 
     logger.info(f"Invoking root_agent with enriched prompt...")
 
-    # Initialize the runner with a session service.
-    session_service = InMemorySessionService()
-    await session_service.create_session(session_id=session_id, user_id=user_id, app_name="aurora_agent")
-    runner = Runner(agent=root_agent, session_service=session_service, app_name="aurora_agent")
-
-    # +++ THIS IS THE CRITICAL FIX +++
-    # We build the structured Event object instead of passing a raw string.
-    new_content = Content(parts=[Part(text=prompt_with_context)])
-    new_message_event = Event(author="user", content=new_content)
-    # The runner also expects a top-level 'parts' attribute, so we add it.
-    new_message_event.parts = new_content.parts
-    # +++ END OF FIX +++
-    
+    # Runners are cached per agent. A named session persists in the database, so a
+    # multi-turn session continues its conversation; without a session_id the
+    # turn runs on a throwaway in-memory session.
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai.types import Content, Part
+    from aurora_agent.mission_sessions import mission_session
+    apply_adk_patch()
+    try:
+        # NOTE: no root agent factory exists in this tree yet, so missions fail here until one is added
+        from aurora_agent.agent_brains.root_agent import get_expert_agent
+        agent = get_expert_agent()
+    except Exception as e:
+        logger.error(f"CRITICAL: Failed to load the mission agent: {e}", exc_info=True)
+        return {"status": "ERROR", "result": f"Agent failed to load: {e}"}
+
+    new_message = Content(role="user", parts=[Part(text=prompt_with_context)])
+    emit({"type": MISSION_STARTED, "prompt": prompt})
+
     final_result = "No textual output from agent."
     try:
-        # --- THIS IS THE CORRECTED LOOP ---
-        async for event in runner.run_async(
-            user_id=user_id,
-            session_id=session_id,
-            new_message=new_message_event
-        ):
-            logger.info(f"[DEBUG] Raw event from runner: {event}")
-
-            # The most robust way to check for the final response is to look for
-            # an event that has content but is NOT a tool call.
-            # The final textual response from the agent is a specific kind of event.
-            
-            is_tool_call = event.content and event.content.parts and hasattr(event.content.parts[0], 'tool_code')
-            has_text = event.content and event.content.parts and hasattr(event.content.parts[0], 'text')
-
-            if has_text and not is_tool_call:
-                # This is likely the final conversational response from the agent.
-                final_result = event.content.parts[0].text
-                logger.info(f"Captured agent's final textual response: {final_result}")
-            elif is_tool_call:
-                # This is an intermediate step where the agent is using a tool.
-                tool_call = event.content.parts[0].tool_code
-                tool_name = tool_call.name
-                tool_args = tool_call.args if hasattr(tool_call, 'args') else None
-                logger.info(f"Agent is calling tool: {tool_name} with args: {tool_args}")
-            
-        # The loop finishes when the agent's run is complete.
-        # The last captured text is our final result.
-        # --- END OF CORRECTED LOOP ---
-                    
+        # Named sessions are locked and their history compacted before the turn (mission_sessions.py)
+        async with mission_session(agent, user_id, session_id) as (runner, run_session_id):
+            # SSE streaming makes ADK yield partial events, which become model_text records with partial=true
+            async for event in runner.run_async(
+                user_id=user_id,
+                session_id=run_session_id,
+                new_message=new_message,
+                run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+            ):
+                logger.debug(f"Raw event from runner: {event}")
+                for progress in translator.translate(event):
+                    emit(progress)
+                    if progress["type"] == TOOL_FINISHED and stream_screenshots:
+                        await _emit_screenshot(emit)
+
+                text = final_text(event)
+                if text:
+                    final_result = text
+
         logger.info(f"ADK mission completed. Final result: {final_result}")
         return {"status": "SUCCESS", "result": final_result}
 
@@ -362,61 +489,120 @@ async def execute_browser_mission(mission_payload: dict, session_id: str) -> dic
 # ============================================================================
 
 @app.websocket("/ws/{user_id}")
-async def websocket_endpoint(websocket: WebSocket, user_id: str):
-    """WebSocket endpoint for real-time communication with frontend"""
+async def websocket_endpoint(websocket: WebSocket, user_id: str, groups: str = ""):
+    """
+    WebSocket endpoint for real-time communication with frontend.
+    `groups` is an optional comma-separated list (e.g. a class) for group broadcasts;
+    only groups the user was granted server-side are joined.
+    """
+    connection = None
     try:
-        await websocket_manager.connect(user_id, websocket)
+        connection = await websocket_manager.connect(
+            user_id, websocket, [group for group in groups.split(",") if group]
+        )
         
         # Keep connection alive and handle incoming messages
         while True:
             try:
                 # Wait for messages from client (heartbeat, etc.)
                 data = await websocket.receive_text()
+                if websocket_manager.handle_heartbeat(connection, data):
+                    continue
                 message = json.loads(data)
                 
                 # Handle different message types from client
                 if message.get("type") == "heartbeat":
-                    await websocket_manager.send_to_user(user_id, {
-                        "type": "heartbeat_response",
-                        "timestamp": datetime.utcnow().isoformat()
-                    })
+                    websocket_manager.answer_heartbeat(connection)
                 elif message.get("type") == "status_request":
                     await websocket_manager.send_to_user(user_id, {
                         "type": "status_response",
                         "connected_users": websocket_manager.get_active_users(),
                         "user_id": user_id
                     })
+                elif message.get("type") == "join_group" and message.get("group"):
+                    if not websocket_manager.request_join(user_id, message["group"]):
+                        await websocket_manager.send_to_user(user_id, {
+                            "type": "error",
+                            "message": f"Not authorized to join group {message['group']}",
+                        })
+                elif message.get("type") == "leave_group" and message.get("group"):
+                    websocket_manager.leave_group(user_id, message["group"])
                     
             except WebSocketDisconnect:
                 break
             except Exception as e:
-                print(f"WebSocket error for user {user_id}: {e}")
+                logger.warning(f"WebSocket error for user {user_id}: {e}")
                 break
                 
     except Exception as e:
-        print(f"WebSocket connection error for user {user_id}: {e}")
+        logger.error(f"WebSocket connection error for user {user_id}: {e}")
     finally:
-        websocket_manager.disconnect(user_id)
+        if connection:
+            websocket_manager.disconnect(user_id, websocket)
+
+class GroupMembersRequest(BaseModel):
+    user_ids: List[str]
+
+def require_group_admin(x_admin_token: Optional[str] = Header(None)):
+    """Guards the group endpoints with the WEBSOCKET_GROUP_ADMIN_TOKEN shared secret."""
+    if not GROUP_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Group administration is disabled; set WEBSOCKET_GROUP_ADMIN_TOKEN")
+    if not secrets.compare_digest(x_admin_token or "", GROUP_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@app.post("/ws/groups/{group}/members", dependencies=[Depends(require_group_admin)])
+async def grant_group_members(group: str, request: GroupMembersRequest):
+    """
+    Allows users (e.g. a class roster) to join a WebSocket group. Users join on
+    their next connect with `?groups=` or by sending a `join_group` message.
+    """
+    websocket_manager.grant_group(group, request.user_ids)
+    return {"group": group, "granted": sorted(websocket_manager.group_grants.get(group, ()))}
+
+@app.delete("/ws/groups/{group}/members/{user_id}", dependencies=[Depends(require_group_admin)])
+async def revoke_group_member(group: str, user_id: str):
+    """Withdraws one user's access to a group and removes them from it."""
+    websocket_manager.revoke_group(group, [user_id])
+    return {"group": group, "granted": sorted(websocket_manager.group_grants.get(group, ()))}
+
+@app.delete("/ws/groups/{group}", dependencies=[Depends(require_group_admin)])
+async def revoke_group(group: str):
+    """Withdraws every grant of a group and empties it."""
+    websocket_manager.revoke_group(group)
+    return {"group": group, "granted": []}
 
 # ============================================================================
 # WEBHOOK ENDPOINTS  
 # ============================================================================
 
-@app.post("/webhook/sheets")
+@app.post("/webhook/sheets", status_code=202)
 async def sheets_webhook(request: Request):
-    """Webhook endpoint to receive events from Google Apps Script"""
+    """
+    Webhook endpoint to receive events from Google Apps Script.
+    Events are acknowledged as soon as they are queued; delivery to the
+    owning user's WebSocket happens in batches in the background.
+    """
     try:
-        # Parse the incoming JSON payload
         payload = await request.json()
-        
-        # Process the webhook event
-        result = await webhook_handler.process_webhook_event(payload)
-        
-        return result
-        
-    except Exception as e:
-        print(f"Webhook error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook body must be a JSON object")
+    
+    try:
+        return await webhook_handler.process_webhook_event(payload)
+    except WebhookQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+@app.get("/webhook/stats")
+async def webhook_stats():
+    """Counters for the webhook ingestion pipeline."""
+    return webhook_handler.stats
+
+@app.get("/llm/usage")
+async def llm_usage():
+    """Input (fresh and provider-cached) and output tokens per LLM purpose since startup."""
+    return llm_usage_stats
 
 @app.get("/webhook/test")
 async def test_webhook():
@@ -646,40 +832,7 @@ async def start_imprinting_session(request: StartImprintingRequest):
 # NEW VERIFICATION SESSION ENDPOINTS (Playwright + VLM + API)
 # ============================================================================
 
-# from aurora_agent.session_core import get_or_create_session, cleanup_session  # Module not found - commented out
-
-# Create stub implementations for session_core functions
-active_sessions = {}
-
-class VerificationSession:
-    def __init__(self, user_id, websocket):
-        self.user_id = user_id
-        self.websocket = websocket
-        self.active = False
-    
-    async def start_session(self, spreadsheet_url):
-        self.active = True
-        return {"success": True, "message": "Session started (stub implementation)"}
-    
-    async def stop_session(self):
-        self.active = False
-        return {"success": True, "message": "Session stopped"}
-    
-    async def get_session_status(self):
-        return {
-            "active": self.active,
-            "user_id": self.user_id,
-            "message": "Session status (stub implementation)"
-        }
-
-async def get_or_create_session(user_id, websocket):
-    if user_id not in active_sessions:
-        active_sessions[user_id] = VerificationSession(user_id, websocket)
-    return active_sessions[user_id]
-
-async def cleanup_session(user_id):
-    if user_id in active_sessions:
-        del active_sessions[user_id]
+from aurora_agent.session_core import get_or_create_session, cleanup_session, active_sessions
 
 class VerificationSessionRequest(BaseModel):
     user_id: str
@@ -767,6 +920,10 @@ async def verification_websocket(websocket: WebSocket, user_id: str):
                         "message": "Verification session stopped"
                     })
                     
+                elif command == "RAW_EVENT":
+                    # Interactions captured by the client feed the same pipeline as browser capture
+                    session.submit_raw_event(data.get("event", {}))
+                    
                 elif command == "GET_STATUS":
                     status = await session.get_session_status()
                     await websocket.send_json({
@@ -804,8 +961,6 @@ async def get_verification_status(user_id: str):
     Get the current status of a user's verification session.
     """
     try:
-        # active_sessions is now defined locally above
-        
         if user_id not in active_sessions:
             return {
                 "active": False,
@@ -6,17 +6,12 @@ import json
 import re
 from typing import Dict, Any
 
-from google.adk.runners import Runner
-from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.genai.types import Content, Part
-
-from .agent_brains.root_agent import get_expert_agent # Simplified import
 from .browser_manager import browser_manager
-from .agent_brains.experts.sheets_expert_agent import set_extracted_sheet_name
+from .mission_events import MissionEventTranslator, final_text, MISSION_STARTED
 
 logger = logging.getLogger(__name__)
 
-async def execute_browser_mission(mission_payload: Dict[str, Any]) -> Dict[str, Any]:
+async def execute_browser_mission(mission_payload: Dict[str, Any], on_event=None) -> Dict[str, Any]:
     mission_prompt = mission_payload.get("mission_prompt")
     application = mission_payload.get("application")
     context = mission_payload.get("session_context", {})
@@ -26,35 +21,27 @@ async def execute_browser_mission(mission_payload: Dict[str, Any]) -> Dict[str,
         return {"status": "ERROR", "result": "Payload must include 'application' and 'mission_prompt'."}
 
     logger.info(f"--- Starting Mission for app '{application}': {mission_prompt} ---")
-    print(f"\n=== BROWSER STARTUP DEBUG ===")
-    print(f"About to start browser with headless=False...")
-    await browser_manager.start_browser(headless=False)  # Visible browser for debugging
-    print(f"Browser startup completed. Browser instance: {browser_manager.browser_instance}")
-    print(f"Browser context: {browser_manager.context}")
+    emit = on_event or (lambda progress: None)
+    # Visible browser for debugging; a named session gets its own profile clone in persistent-profile mode
+    await browser_manager.start_browser(headless=False, session_id=mission_payload.get("session_id"))
     
     # Navigate to the Google Sheets URL to make browser window visible
     sheets_url = context.get("current_url") if context else None
     if sheets_url:
-        print(f"Navigating to Google Sheets URL: {sheets_url}")
         await browser_manager.navigate(sheets_url)
-        print(f"Navigation completed. Browser should now be visible.")
     else:
-        print(f"No sheets URL found in session context")
-    print(f"==============================\n")
+        logger.debug("No sheets URL found in session context")
     
     try:
+        # ADK and the expert agents are imported on the first mission, not at service import
+        from google.adk.runners import Runner
+        from google.adk.sessions.in_memory_session_service import InMemorySessionService
+        from google.genai.types import Content, Part
+        from .agent_brains.root_agent import get_expert_agent # Simplified import
+        from .agent_brains.experts.sheets_expert_agent import set_extracted_sheet_name
+
         expert_agent = get_expert_agent()
-        
-        # Debug: Log agent details
-        print(f"\n=== AGENT DEBUG INFO ===")
-        print(f"Agent name: {expert_agent.name}")
-        print(f"Agent model: {expert_agent.model}")
-        print(f"Agent tools count: {len(expert_agent.tools) if hasattr(expert_agent, 'tools') else 'No tools attr'}")
-        if hasattr(expert_agent, 'tools'):
-            tool_names = [getattr(tool, '__name__', str(tool)) for tool in expert_agent.tools]
-            print(f"Tool names: {tool_names}")
-        print(f"Agent instruction preview: {expert_agent.instruction[:100]}...")
-        print(f"========================\n")
+        logger.debug(f"Running agent '{expert_agent.name}' ({expert_agent.model}) with {len(getattr(expert_agent, 'tools', []))} tools")
         
         runner = Runner(
             agent=expert_agent,
@@ -86,15 +73,9 @@ async def execute_browser_mission(mission_payload: Dict[str, Any]) -> Dict[str,
             # For all other missions (including chart creation), frame as direct user request
             imperative_prompt = f"Please help me with this task: {mission_prompt}"
         
-        logger.info(f"Sending to agent: {imperative_prompt}")
-        print(f"\n=== DEBUG: SENDING TO AGENT ===")
-        print(f"Original mission prompt: {mission_prompt}")
-        print(f"Extracted sheet name: {extracted_sheet_name}")
-        print(f"Final user request to agent:")
-        print(f"---")
-        print(imperative_prompt)
-        print(f"---")
-        print(f"===============================\n")
+        logger.info(f"Sending to agent: {imperative_prompt} (extracted sheet name: {extracted_sheet_name})")
+        emit({"type": MISSION_STARTED, "prompt": mission_prompt})
+        translator = MissionEventTranslator()
         new_message_content = Content(parts=[Part(text=imperative_prompt)])
         
         final_agent_response = "Mission completed without a tool call."
@@ -105,38 +86,21 @@ async def execute_browser_mission(mission_payload: Dict[str, Any]) -> Dict[str,
             session_id=session.id,
             new_message=new_message_content,
         ):
-            logger.info(f"ADK Event: {event.author}")
-            print(f"\n--- ADK EVENT DEBUG ---")
-            print(f"Event author: {event.author}")
-            print(f"Event has function calls: {bool(event.get_function_calls())}")
-            if event.get_function_calls():
-                print(f"Function calls: {event.get_function_calls()}")
-            if event.content and event.content.parts:
-                print(f"Event content parts count: {len(event.content.parts)}")
-                if event.content.parts and hasattr(event.content.parts[0], 'text') and event.content.parts[0].text:
-                    print(f"Event text: {event.content.parts[0].text[:200]}...")
-                else:
-                    print(f"Event has no text content (likely function call event)")
-            print(f"----------------------\n")
+            for progress in translator.translate(event):
+                emit(progress)
             
             if event.get_function_calls():
                 tool_was_called = True
-                logger.info("Agent made a tool call.")
-            if event.author != "tool" and event.content and event.content.parts and hasattr(event.content.parts[0], 'text') and event.content.parts[0].text:
-                 final_agent_response = event.content.parts[0].text
+            text = final_text(event)
+            if text and event.author != "tool":
+                final_agent_response = text
         
         # The mission is only successful if a tool was actually used.
         if not tool_was_called:
-            print(f"\n=== MISSION FAILURE DEBUG ===")
-            print(f"Tool was called: {tool_was_called}")
-            print(f"Final agent response: {final_agent_response}")
-            print(f"==============================\n")
+            logger.warning(f"Agent finished without calling a tool. Final response: {final_agent_response}")
             return {"status": "ERROR", "result": f"Agent failed to call a tool. Final response: {final_agent_response}"}
         
-        print(f"\n=== MISSION SUCCESS ===")
-        print(f"Tool was called: {tool_was_called}")
-        print(f"Final result: {final_agent_response}")
-        print(f"========================\n")
+        logger.info(f"Mission succeeded: {final_agent_response}")
         return {"status": "SUCCESS", "result": final_agent_response}
 
     except Exception as e:
@@ -6,27 +6,37 @@ Handles teacher authentication and token management.
 """
 import os
 import json
+import asyncio
+import logging
 import secrets
+import time
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from fastapi import HTTPException, Depends, Request
 from fastapi.responses import RedirectResponse
-from google_auth_oauthlib.flow import Flow
-from google.auth.transport.requests import Request as GoogleRequest
-from google.oauth2.credentials import Credentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
-from .database import get_db, UserToken
+from .database import get_db, UserToken, AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
 
 # OAuth 2.0 Configuration
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 REDIRECT_URI = os.getenv("REDIRECT_URI", "http://localhost:8000/auth/google/callback")
 
+# Cached tokens are treated as expired this long before their real expiry.
+TOKEN_EXPIRY_MARGIN = timedelta(seconds=int(os.getenv("TOKEN_EXPIRY_MARGIN_SECONDS", "60")))
+# The background task renews cached tokens that expire within this window.
+TOKEN_RENEWAL_WINDOW = timedelta(seconds=int(os.getenv("TOKEN_RENEWAL_WINDOW_SECONDS", "600")))
+TOKEN_RENEWAL_INTERVAL_SECONDS = int(os.getenv("TOKEN_RENEWAL_INTERVAL_SECONDS", "60"))
+# Only tokens used this recently are renewed; idle ones are evicted and reloaded from the database on next use.
+TOKEN_IDLE_SECONDS = int(os.getenv("TOKEN_IDLE_SECONDS", "1800"))
+
 # Required scopes for Google Drive, Sheets, and Apps Script
 SCOPES = [
     'https://www.googleapis.com/auth/drive.file',
@@ -64,6 +74,8 @@ class GoogleOAuthManager:
         Returns:
             Authorization URL for redirecting user
         """
+        from google_auth_oauthlib.flow import Flow
+
         flow = Flow.from_client_config(
             self.client_config,
             scopes=SCOPES,
@@ -90,6 +102,8 @@ class GoogleOAuthManager:
         Returns:
             Dictionary containing token information
         """
+        from google_auth_oauthlib.flow import Flow
+
         flow = Flow.from_client_config(
             self.client_config,
             scopes=SCOPES,
@@ -118,6 +132,9 @@ class GoogleOAuthManager:
         Returns:
             Dictionary with new token information
         """
+        from google.auth.transport.requests import Request as GoogleRequest
+        from google.oauth2.credentials import Credentials
+
         credentials = Credentials(
             token=None,
             refresh_token=refresh_token,
@@ -133,8 +150,21 @@ class GoogleOAuthManager:
             'token_expiry': credentials.expiry
         }
 
-# Global OAuth manager instance
-oauth_manager = GoogleOAuthManager()
+# Global OAuth manager instance, created on first use so that importing this
+# module neither loads the OAuth client libraries nor requires the client secrets.
+_oauth_manager: Optional[GoogleOAuthManager] = None
+
+def get_oauth_manager() -> GoogleOAuthManager:
+    global _oauth_manager
+    if _oauth_manager is None:
+        _oauth_manager = GoogleOAuthManager()
+    return _oauth_manager
+
+def __getattr__(name: str):
+    # Keeps `from aurora_agent.auth import oauth_manager` working for existing callers
+    if name == "oauth_manager":
+        return get_oauth_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 async def store_user_tokens(
     db: AsyncSession,
@@ -142,7 +172,7 @@ async def store_user_tokens(
     token_data: dict
 ) -> None:
     """
-    Store or update user tokens in database.
+    Store or update user tokens in database and refresh the in-memory cache.
     
     Args:
         db: Database session
@@ -178,6 +208,7 @@ async def store_user_tokens(
         db.add(new_token)
     
     await db.commit()
+    token_cache.put(user_id, token_data['access_token'], token_data.get('token_expiry'), token_data.get('refresh_token'))
 
 async def get_user_tokens(
     db: AsyncSession,
@@ -196,6 +227,131 @@ async def get_user_tokens(
     result = await db.execute(select(UserToken).where(UserToken.user_id == user_id))
     return result.scalar_one_or_none()
 
+class TokenCache:
+    """
+    In-memory cache of valid access tokens with single-flight refresh.
+
+    Concurrent callers for the same user share one refresh, the blocking Google
+    refresh call runs on a worker thread, and `renew_expiring` lets a background
+    task refresh the tokens of recently active users shortly before they expire.
+    """
+
+    def __init__(self):
+        # user_id -> (access_token, expiry as naive UTC or None, refresh_token)
+        self._entries: Dict[str, Tuple[str, Optional[datetime], Optional[str]]] = {}
+        # user_id -> monotonic time the token was last stored or asked for
+        self._last_used: Dict[str, float] = {}
+        self._refreshes: Dict[str, asyncio.Task] = {}
+
+    def put(self, user_id: str, access_token: str, expiry: Optional[datetime], refresh_token: Optional[str] = None):
+        previous = self._entries.get(user_id)
+        if refresh_token is None and previous:
+            refresh_token = previous[2]
+        self._entries[user_id] = (access_token, expiry, refresh_token)
+        self._last_used.setdefault(user_id, time.monotonic())
+
+    def invalidate(self, user_id: str):
+        self._entries.pop(user_id, None)
+        self._last_used.pop(user_id, None)
+
+    def get(self, user_id: str) -> Optional[str]:
+        """Returns the cached token if it is still comfortably valid."""
+        if user_id in self._entries:
+            self._last_used[user_id] = time.monotonic()
+        entry = self._entries.get(user_id)
+        if entry and (entry[1] is None or entry[1] - TOKEN_EXPIRY_MARGIN > datetime.utcnow()):
+            return entry[0]
+        return None
+
+    def refresh_token_for(self, user_id: str) -> Optional[str]:
+        entry = self._entries.get(user_id)
+        return entry[2] if entry else None
+
+    async def refresh(self, user_id: str, refresh_token: str) -> Optional[str]:
+        """Refreshes a user's token once, however many callers ask concurrently."""
+        task = self._refreshes.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._refresh(user_id, refresh_token))
+            self._refreshes[user_id] = task
+            task.add_done_callback(lambda _: self._refreshes.pop(user_id, None))
+        # Shield so that one cancelled caller does not cancel the refresh for the others
+        return await asyncio.shield(task)
+
+    async def _refresh(self, user_id: str, refresh_token: str) -> Optional[str]:
+        try:
+            # credentials.refresh() does blocking HTTP; keep it off the event loop
+            new_token_data = await asyncio.to_thread(get_oauth_manager().refresh_access_token, refresh_token)
+        except Exception as e:
+            # Refresh failed, user needs to re-authenticate
+            logger.warning(f"Token refresh failed for {user_id}: {e}")
+            self.invalidate(user_id)
+            return None
+
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(UserToken)
+                .where(UserToken.user_id == user_id)
+                .values(
+                    access_token=new_token_data['access_token'],
+                    token_expiry=new_token_data['token_expiry'],
+                    updated_at=datetime.utcnow()
+                )
+            )
+            await db.commit()
+        self.put(user_id, new_token_data['access_token'], new_token_data['token_expiry'], refresh_token)
+        logger.info(f"Refreshed access token for {user_id}")
+        return new_token_data['access_token']
+
+    def evict_idle(self) -> int:
+        """Drops tokens nobody asked for within TOKEN_IDLE_SECONDS. Returns how many."""
+        cutoff = time.monotonic() - TOKEN_IDLE_SECONDS
+        idle = [user_id for user_id, used in self._last_used.items() if used < cutoff and user_id not in self._refreshes]
+        for user_id in idle:
+            self.invalidate(user_id)
+        return len(idle)
+
+    async def renew_expiring(self):
+        """Evicts idle tokens, then refreshes the remaining ones that expire within the renewal window."""
+        evicted = self.evict_idle()
+        if evicted:
+            logger.info(f"Evicted {evicted} idle access tokens from the cache")
+        horizon = datetime.utcnow() + TOKEN_RENEWAL_WINDOW
+        expiring = [
+            (user_id, refresh_token) for user_id, (_, expiry, refresh_token) in list(self._entries.items())
+            if expiry and refresh_token and expiry <= horizon
+        ]
+        if expiring:
+            await asyncio.gather(*(self.refresh(user_id, token) for user_id, token in expiring), return_exceptions=True)
+
+
+token_cache = TokenCache()
+_renewal_task: Optional[asyncio.Task] = None
+
+
+async def _renewal_loop():
+    while True:
+        await asyncio.sleep(TOKEN_RENEWAL_INTERVAL_SECONDS)
+        try:
+            await token_cache.renew_expiring()
+        except Exception as e:
+            logger.error(f"Background token renewal failed: {e}", exc_info=True)
+
+
+def start_token_renewal():
+    """Starts the background task that renews cached tokens before they expire."""
+    global _renewal_task
+    if _renewal_task is None or _renewal_task.done():
+        _renewal_task = asyncio.create_task(_renewal_loop())
+
+
+async def stop_token_renewal():
+    global _renewal_task
+    if _renewal_task:
+        _renewal_task.cancel()
+        await asyncio.gather(_renewal_task, return_exceptions=True)
+        _renewal_task = None
+
+
 async def get_valid_access_token(
     db: AsyncSession,
     user_id: str
@@ -203,6 +359,9 @@ async def get_valid_access_token(
     """
     Get a valid access token for user, refreshing if necessary.
     
+    Served from the in-memory cache when possible; the database is only read
+    on a cache miss.
+    
     Args:
         db: Database session
         user_id: User identifier
@@ -210,25 +369,20 @@ async def get_valid_access_token(
     Returns:
         Valid access token or None if user not authenticated
     """
-    user_token = await get_user_tokens(db, user_id)
-    if not user_token:
-        return None
+    cached = token_cache.get(user_id)
+    if cached:
+        return cached
     
-    # Check if token is expired
-    if user_token.token_expiry and user_token.token_expiry <= datetime.utcnow():
-        try:
-            # Refresh the token
-            new_token_data = oauth_manager.refresh_access_token(user_token.refresh_token)
-            
-            # Update database with new token
-            await store_user_tokens(db, user_id, {
-                'access_token': new_token_data['access_token'],
-                'token_expiry': new_token_data['token_expiry']
-            })
-            
-            return new_token_data['access_token']
-        except Exception as e:
-            # Refresh failed, user needs to re-authenticate
+    refresh_token = token_cache.refresh_token_for(user_id)
+    if not refresh_token:
+        user_token = await get_user_tokens(db, user_id)
+        if not user_token:
             return None
+        token_cache.put(user_id, user_token.access_token, user_token.token_expiry, user_token.refresh_token)
+        cached = token_cache.get(user_id)
+        if cached:
+            return cached
+        refresh_token = user_token.refresh_token
     
-    return user_token.access_token
+    # Token is expired (or about to be): refresh it once for all concurrent callers
+    return await token_cache.refresh(user_id, refresh_token)
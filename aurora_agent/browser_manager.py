@@ -1,14 +1,63 @@
 # File: session-bubble/aurora_agent/browser_manager.py
 # in aurora_agent/browser_manager.py (FINAL, CORRECTED VERSION)
+from __future__ import annotations
+
 import asyncio
 import traceback
 import logging
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Tuple
 import os
+import json
+
+from .browser_profile import clone_profile, prune_profile_cache, remove_profile_clone
+from .frame_dedup import FrameDeduplicator, FrameDiff, crop_region, page_key, should_send_crop
+
+# Playwright is imported when the browser is started, keeping it out of app startup
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser, BrowserContext
 
 logger = logging.getLogger(__name__)
 
+# Opt-in persistent profile mode. Chromium then keeps its HTTP cache, compiled code
+# cache and service workers on disk, so warm navigations survive a restart.
+PERSISTENT_PROFILE = os.getenv("BROWSER_PERSISTENT_PROFILE", "false").lower() in ("1", "true", "yes")
+# Kept outside the source tree: Chromium writes to the profile and its cache is pruned.
+PROFILE_DIR = os.getenv(
+    "BROWSER_PROFILE_DIR",
+    os.path.join(os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "aurora", "browser-profile"),
+)
+PROFILE_CLONES_DIR = os.getenv("BROWSER_PROFILE_CLONES_DIR")  # Defaults to a sibling of PROFILE_DIR
+PROFILE_CACHE_MAX_MB = int(os.getenv("BROWSER_PROFILE_CACHE_MAX_MB", "512"))
+
+class _PersistentBrowser:
+    """
+    Stands in for the Browser of a persistent context, which Playwright does not expose
+    (`context.browser` is None), so `browser_instance` callers work in both modes.
+    """
+
+    def __init__(self, context: BrowserContext):
+        self._context = context
+        self._connected = True
+        context.on("close", lambda _: setattr(self, "_connected", False))
+
+    @property
+    def contexts(self) -> list:
+        return [self._context] if self._connected else []
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def new_page(self, **kwargs) -> Page:
+        return await self._context.new_page()
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        raise RuntimeError("A persistent-profile browser has a single context; use browser_manager.context.")
+
+    async def close(self):
+        if self._connected:
+            await self._context.close()
+
+
 class BrowserManager:
     def __init__(self):
         self.playwright_instance = None
@@ -16,15 +65,44 @@ class BrowserManager:
         # The manager should not hold a single page, but a context
         self.context: Optional[BrowserContext] = None
         self.last_sent_screenshot_bytes: Optional[bytes] = None
+        # Last frame per page, used to avoid sending visually identical screenshots twice
+        self.frame_deduplicator = FrameDeduplicator()
         # Store a reference to the most recently opened page so other modules can access it easily
         self.page: Optional[Page] = None
+        # Profile directory in use when running with a persistent context
+        self.user_data_dir: Optional[str] = None
+        # Per-session clone of the profile, deleted when the browser closes
+        self.profile_clone_dir: Optional[str] = None
 
-    async def start_browser(self, headless: bool = True):
-        if self.browser_instance:
+    async def start_browser(
+        self,
+        headless: bool = True,
+        persistent: Optional[bool] = None,
+        profile_dir: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ):
+        """
+        Launches Chromium and creates the managed context.
+
+        Args:
+            headless: Run without a visible window.
+            persistent: Use a persistent profile instead of an ephemeral context.
+                Defaults to the BROWSER_PERSISTENT_PROFILE environment variable.
+            profile_dir: Profile directory for persistent mode (defaults to BROWSER_PROFILE_DIR).
+            session_id: In persistent mode, run on a per-session clone of the profile so
+                that concurrent sessions do not contend for the same directory. The
+                clone lives until close_browser(). Ignored when the browser is running.
+        """
+        if self.context:
             logger.info("Browser is already running.")
             return
 
-        logger.info(f"Initializing Playwright and launching browser (headless={headless})...")
+        if persistent is None:
+            persistent = PERSISTENT_PROFILE
+
+        logger.info(f"Initializing Playwright and launching browser (headless={headless}, persistent={persistent})...")
+        from playwright.async_api import async_playwright
+
         self.playwright_instance = await async_playwright().start()
         
         # Configure browser launch args for better VNC display
@@ -38,31 +116,89 @@ class BrowserManager:
                 '--disable-features=VizDisplayCompositor'
             ])
         
-        self.browser_instance = await self.playwright_instance.chromium.launch(
-            headless=headless,
-            args=launch_args
-        )
-        
         # Create a single, authenticated context if auth file exists
         auth_file_path = 'auth.json'
         context_options = {
             'viewport': {'width': 1280, 'height': 720} if not headless else None
         }
         
-        if os.path.exists(auth_file_path):
-            context_options['storage_state'] = auth_file_path
-            
-        self.context = await self.browser_instance.new_context(**context_options)
+        if persistent:
+            await self._start_persistent_context(headless, launch_args, context_options, auth_file_path, profile_dir, session_id)
+        else:
+            self.browser_instance = await self.playwright_instance.chromium.launch(
+                headless=headless,
+                args=launch_args
+            )
+
+            if os.path.exists(auth_file_path):
+                context_options['storage_state'] = auth_file_path
+
+            self.context = await self.browser_instance.new_context(**context_options)
         
+        # Highlights, teacher annotations and the teacher cursor are drawn by one injected runtime.
+        from aurora_agent.ui_tools.overlay_runtime import install_overlay
+        await install_overlay(self.context)
+
         logger.info("Browser and context started successfully.")
 
+    async def _start_persistent_context(
+        self,
+        headless: bool,
+        launch_args: list,
+        context_options: dict,
+        auth_file_path: str,
+        profile_dir: Optional[str],
+        session_id: Optional[str],
+    ):
+        """Launches Chromium on a persistent user data dir, pruning its cache first."""
+        user_data_dir = profile_dir or PROFILE_DIR
+        if session_id:
+            user_data_dir = await asyncio.to_thread(clone_profile, user_data_dir, session_id, PROFILE_CLONES_DIR)
+            self.profile_clone_dir = user_data_dir
+        os.makedirs(user_data_dir, exist_ok=True)
+
+        # The browser is not running yet, so this is the one safe moment to trim the cache.
+        prune_profile_cache(user_data_dir, PROFILE_CACHE_MAX_MB * 1024 * 1024)
+
+        self.context = await self.playwright_instance.chromium.launch_persistent_context(
+            user_data_dir,
+            headless=headless,
+            args=launch_args,
+            **context_options
+        )
+        # Persistent contexts have no owning Browser object; keep the attribute usable for callers.
+        self.browser_instance = _PersistentBrowser(self.context)
+        self.user_data_dir = user_data_dir
+
+        # storage_state is not accepted by persistent contexts, so replay the cookies instead.
+        if os.path.exists(auth_file_path):
+            try:
+                with open(auth_file_path) as f:
+                    cookies = json.load(f).get('cookies', [])
+                if cookies:
+                    await self.context.add_cookies(cookies)
+            except Exception as e:
+                logger.warning(f"Could not load cookies from {auth_file_path}: {e}")
+
+        # A persistent context always opens with one blank tab; reuse it as the first page.
+        if self.context.pages:
+            self.page = self.context.pages[0]
+
+        logger.info(f"Using persistent browser profile: {user_data_dir}")
+
     async def get_page(self, url: str) -> Page:
         """Gets a new, navigated page from the managed browser context."""
         if not self.context:
             raise Exception("Browser context not started. Call start_browser() first.")
         
-        page = await self.context.new_page()
-        await page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        # Reuse the initial blank tab of a persistent context instead of leaving it open.
+        if self.page and self.page.url == "about:blank" and not self.page.is_closed():
+            page = self.page
+        else:
+            page = await self.context.new_page()
+        # Return as soon as the application reports it is usable, not at a guessed time.
+        from .parsers.readiness import goto_and_wait_until_ready
+        await goto_and_wait_until_ready(page, url, timeout=60000)
         self.page = page
         return page
 
@@ -70,11 +206,56 @@ class BrowserManager:
         """Convenience: ensure browser is running and navigate to URL.
         Stores page on the manager for later access.
         """
-        if not self.browser_instance:
+        if not self.context:
             await self.start_browser(headless=headless)
         page = await self.get_page(url)
         return page
 
+    async def capture_changed_screenshot(
+        self,
+        page: Optional[Page] = None,
+        full_page: bool = False,
+        crop_to_change: bool = False,
+    ) -> Tuple[Optional[bytes], FrameDiff]:
+        """
+        Screenshots the page for the feedback/vision pipeline, skipping frames
+        where nothing visible changed since the last one sent for that page.
+
+        Returns:
+            The PNG to send (None if unchanged; only the changed region if
+            `crop_to_change` and the change is small) and the frame diff.
+        """
+        page = page or self.page
+        if not page:
+            raise Exception("No active page to screenshot.")
+        screenshot_bytes = await page.screenshot(full_page=full_page, type="png")
+        # Decoding and diffing a full-page PNG takes long enough to stall the event loop
+        diff = await asyncio.to_thread(self.frame_deduplicator.compare, page_key(page), screenshot_bytes)
+        if not diff.changed:
+            return None, diff
+
+        self.last_sent_screenshot_bytes = screenshot_bytes
+        if crop_to_change and should_send_crop(diff):
+            crop_bytes, _ = await asyncio.to_thread(crop_region, screenshot_bytes, diff.bbox)
+            return crop_bytes, diff
+        return screenshot_bytes, diff
+
+    async def start_screencast(self, send, **options):
+        """
+        Streams JPEG frames of the active page through `send` (an async callable taking
+        a JSON string), e.g. a WebSocket's send method. Works with headless Chromium.
+
+        Returns:
+            The running ScreencastSession; feed client `frame_ack` messages to it.
+        """
+        from .screencast import ScreencastSession
+
+        if not self.page:
+            raise Exception("No active page to stream. Navigate to a page first.")
+        session = ScreencastSession(self.page, send, **options)
+        await session.start()
+        return session
+
     async def close_browser(self):
         if self.context:
             await self.context.close()
@@ -85,12 +266,23 @@ class BrowserManager:
         
         self.browser_instance = None
         self.context = None
+        self.page = None
+        self.user_data_dir = None
+        # A clone is a full profile copy; keeping them would grow disk use without bound
+        if self.profile_clone_dir:
+            await asyncio.to_thread(remove_profile_clone, self.profile_clone_dir)
+            self.profile_clone_dir = None
         logger.info("Browser and context closed successfully.")
 
 # A new, separate function for executing code. It is no longer part of the manager.
 async def execute_interaction_on_page(page: Page, interaction_code: str) -> dict:
     """Executes a string of Playwright code on a given page object."""
     from aurora_agent.ui_tools.annotation_helpers import highlight_element, remove_annotations
+    from aurora_agent.ui_tools.interaction_plan import parse_interaction_code, execute_plan
+
+    plan = parse_interaction_code(interaction_code)
+    if plan is not None:
+        return await execute_plan(page, plan)
     
     try:
         exec_scope = {
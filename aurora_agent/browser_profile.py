@@ -0,0 +1,115 @@
+# File: session-bubble/aurora_agent/browser_profile.py
+"""
+Helpers for Chromium persistent profile directories.
+
+A persistent profile keeps the HTTP cache, the compiled code cache and
+registered service workers on disk, so warm navigations after a restart are
+served locally. These helpers clone a base profile for concurrent sessions
+(Chromium refuses to share one user data dir between processes) and keep the
+cache directories below a size budget.
+"""
+import logging
+import os
+import re
+import shutil
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cache directories inside a profile that are safe to prune while Chromium is closed.
+# Chromium rebuilds their indexes on the next start.
+CACHE_SUBDIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+    "GrShaderCache",
+    "ShaderCache",
+]
+
+# Process-lock files that must never be copied into a clone, otherwise the cloned
+# profile looks "in use" by the original browser process.
+SINGLETON_FILES = {"SingletonLock", "SingletonCookie", "SingletonSocket", "RunningChromeVersion"}
+
+
+def _ignore_singletons(directory: str, names: List[str]) -> List[str]:
+    return [name for name in names if name in SINGLETON_FILES]
+
+
+def clone_profile(base_dir: str, session_id: str, clones_root: Optional[str] = None) -> str:
+    """
+    Returns a profile directory dedicated to `session_id`, cloned from `base_dir`.
+
+    An existing clone is reused as-is so that each session keeps its own warm cache.
+    """
+    clones_root = clones_root or os.path.join(os.path.dirname(os.path.abspath(base_dir)), "playwright_profiles")
+    safe_session_id = re.sub(r"[^A-Za-z0-9_.-]", "_", session_id)
+    clone_dir = os.path.join(clones_root, safe_session_id)
+
+    if os.path.isdir(clone_dir):
+        logger.info(f"Reusing profile clone for session '{session_id}': {clone_dir}")
+        return clone_dir
+
+    os.makedirs(clones_root, exist_ok=True)
+    if os.path.isdir(base_dir):
+        logger.info(f"Cloning browser profile {base_dir} -> {clone_dir}")
+        shutil.copytree(base_dir, clone_dir, symlinks=True, ignore=_ignore_singletons)
+    else:
+        os.makedirs(clone_dir, exist_ok=True)
+    return clone_dir
+
+
+def remove_profile_clone(clone_dir: str) -> None:
+    """Deletes a cloned profile directory."""
+    shutil.rmtree(clone_dir, ignore_errors=True)
+    logger.info(f"Removed profile clone: {clone_dir}")
+
+
+def _cache_files(profile_dir: str) -> List[Tuple[float, int, str]]:
+    files = []
+    for subdir in CACHE_SUBDIRS:
+        root = os.path.join(profile_dir, subdir)
+        if not os.path.isdir(root):
+            continue
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.lstat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def get_profile_cache_size(profile_dir: str) -> int:
+    """Returns the total size in bytes of the cache directories of a profile."""
+    return sum(size for _, size, _ in _cache_files(profile_dir))
+
+
+def prune_profile_cache(profile_dir: str, max_bytes: int) -> int:
+    """
+    Deletes the least recently written cache files until the profile cache fits
+    in `max_bytes`. Must only be called while no browser is using the profile.
+
+    Returns:
+        The number of bytes freed.
+    """
+    files = _cache_files(profile_dir)
+    total = sum(size for _, size, _ in files)
+    if total <= max_bytes:
+        return 0
+
+    freed = 0
+    for _, size, path in sorted(files):
+        if total - freed <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            freed += size
+        except OSError as e:
+            logger.warning(f"Could not remove cache file {path}: {e}")
+
+    logger.info(f"Pruned {freed / (1024 * 1024):.1f} MB from profile cache {profile_dir}")
+    return freed
@@ -0,0 +1,200 @@
+# File: session-bubble/aurora_agent/frame_dedup.py
+# in aurora_agent/frame_dedup.py
+"""
+Perceptual deduplication of screenshots before they are sent to the feedback
+service or a vision model.
+
+For every frame we keep a difference hash (dHash) and compute the bounding box
+of the pixels that changed since the last frame of the same page. Frames where
+nothing visible changed (a failed click, a no-op scroll) can then be skipped,
+and small changes can be sent as a crop of the changed region only.
+"""
+import io
+import itertools
+import logging
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, Optional, Tuple
+
+from PIL import Image, ImageChops
+
+logger = logging.getLogger(__name__)
+
+HASH_SIZE = 8
+# Per-pixel grayscale difference below this is treated as encoder/antialiasing noise.
+PIXEL_THRESHOLD = 16
+# Fewer changed pixels than this count as unchanged. A typed digit or a caret move can
+# change only a few dozen pixels, so by default any change above the noise threshold counts.
+MIN_CHANGED_PIXELS = int(os.getenv("FRAME_MIN_CHANGED_PIXELS", "1"))
+# Hamming distance above which a frame is a scene change and is always sent whole.
+SCENE_CHANGE_DISTANCE = 10
+# Crops covering more than this fraction of the frame are not worth sending separately.
+MAX_CROP_FRACTION = 0.5
+CROP_PADDING = 16
+
+
+@dataclass
+class FrameDiff:
+    """How a frame differs from the previous frame of the same page."""
+    changed: bool
+    # Hamming distance between the dHashes; None for the first frame of a page.
+    distance: Optional[int]
+    # (left, top, right, bottom) of the changed pixels, None if nothing changed.
+    bbox: Optional[Tuple[int, int, int, int]]
+    changed_pixels: int
+    size: Tuple[int, int]
+
+    @property
+    def changed_fraction(self) -> float:
+        if not self.bbox:
+            return 0.0
+        left, top, right, bottom = self.bbox
+        return (right - left) * (bottom - top) / float(self.size[0] * self.size[1])
+
+    @property
+    def is_scene_change(self) -> bool:
+        return self.distance is None or self.distance > SCENE_CHANGE_DISTANCE
+
+    def to_dict(self) -> dict:
+        return {
+            "changed": self.changed,
+            "distance": self.distance,
+            "bbox": list(self.bbox) if self.bbox else None,
+            "changed_pixels": self.changed_pixels,
+            "changed_fraction": round(self.changed_fraction, 4),
+        }
+
+
+_page_keys: "weakref.WeakKeyDictionary[object, int]" = weakref.WeakKeyDictionary()
+_next_page_key = itertools.count(1)
+
+
+def page_key(page) -> int:
+    """A key for a page that, unlike id(page), is never reused by another page."""
+    key = _page_keys.get(page)
+    if key is None:
+        key = _page_keys[page] = next(_next_page_key)
+    return key
+
+
+@dataclass
+class _Frame:
+    data: bytes
+    gray: Image.Image
+    dhash: int
+
+
+def dhash(gray: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash of a grayscale image: one bit per horizontally adjacent pixel pair."""
+    small = gray.resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()  # One byte per pixel in mode "L"
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class FrameDeduplicator:
+    """Keeps the last frame per page and classifies new frames against it."""
+
+    def __init__(
+        self,
+        pixel_threshold: int = PIXEL_THRESHOLD,
+        min_changed_pixels: int = MIN_CHANGED_PIXELS,
+        max_pages: int = 16,
+    ):
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_pixels = min_changed_pixels
+        self.max_pages = max_pages
+        self._frames: "OrderedDict[Hashable, _Frame]" = OrderedDict()
+        # Callers decode frames in worker threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+        self.frames_seen = 0
+        self.frames_skipped = 0
+
+    def compare(self, key: Hashable, data: bytes) -> FrameDiff:
+        """
+        Compares `data` (an encoded image) with the last frame stored for `key`
+        and stores it as the new last frame if it changed. This decodes the
+        image, so async callers should run it in a thread.
+        """
+        with self._lock:
+            return self._compare(key, data)
+
+    def _compare(self, key: Hashable, data: bytes) -> FrameDiff:
+        self.frames_seen += 1
+        previous = self._frames.get(key)
+        if previous is not None and previous.data == data:
+            self._frames.move_to_end(key)
+            self.frames_skipped += 1
+            return FrameDiff(False, 0, None, 0, previous.gray.size)
+
+        gray = Image.open(io.BytesIO(data)).convert("L")
+        frame = _Frame(data=data, gray=gray, dhash=dhash(gray))
+
+        if previous is None or previous.gray.size != gray.size:
+            # First frame, or the page changed size (full-page screenshots grow with content).
+            self._store(key, frame)
+            distance = None if previous is None else bin(previous.dhash ^ frame.dhash).count("1")
+            return FrameDiff(True, distance, (0, 0) + gray.size, gray.size[0] * gray.size[1], gray.size)
+
+        mask = ImageChops.difference(previous.gray, gray).point(
+            lambda value: 255 if value > self.pixel_threshold else 0
+        )
+        changed_pixels = mask.histogram()[255]
+        distance = bin(previous.dhash ^ frame.dhash).count("1")
+        if changed_pixels < self.min_changed_pixels:
+            # Keep comparing against the old frame so slow drifts still add up.
+            self._frames.move_to_end(key)
+            self.frames_skipped += 1
+            return FrameDiff(False, distance, None, changed_pixels, gray.size)
+
+        self._store(key, frame)
+        return FrameDiff(True, distance, mask.getbbox(), changed_pixels, gray.size)
+
+    def _store(self, key: Hashable, frame: _Frame):
+        self._frames[key] = frame
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_pages:
+            self._frames.popitem(last=False)
+
+    def forget(self, key: Hashable):
+        """Drops the stored frame for a page (e.g. when it is closed)."""
+        with self._lock:
+            self._frames.pop(key, None)
+
+    def last_frame(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            frame = self._frames.get(key)
+        return frame.data if frame else None
+
+
+def should_send_crop(diff: FrameDiff) -> bool:
+    """Whether sending only the changed region is worthwhile for this diff."""
+    return diff.changed and diff.bbox is not None and not diff.is_scene_change \
+        and diff.changed_fraction <= MAX_CROP_FRACTION
+
+
+def crop_region(data: bytes, bbox: Tuple[int, int, int, int], padding: int = CROP_PADDING) -> Tuple[bytes, Tuple[int, int, int, int]]:
+    """
+    Crops an encoded image to `bbox` plus some context padding.
+
+    Returns:
+        The PNG-encoded crop and the padded box actually used.
+    """
+    image = Image.open(io.BytesIO(data))
+    left, top, right, bottom = bbox
+    box = (
+        max(0, left - padding),
+        max(0, top - padding),
+        min(image.width, right + padding),
+        min(image.height, bottom + padding),
+    )
+    buffer = io.BytesIO()
+    image.crop(box).save(buffer, format="PNG")
+    return buffer.getvalue(), box
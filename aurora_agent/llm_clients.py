@@ -0,0 +1,173 @@
+# File: session-bubble/aurora_agent/llm_clients.py
+# in aurora_agent/llm_clients.py
+"""
+Long-lived Gemini model clients with provider-side prompt caching.
+
+The interaction, code-generation and translation prompts start with a large
+static instruction block. Callers pass that block as `system_instruction`
+and only the per-call text as the prompt, so:
+
+  - the SDK is configured once and one GenerativeModel is kept per
+    (model, instruction) pair instead of being built on every call;
+  - an instruction long enough for Gemini's explicit context caching
+    (PROMPT_CACHE_MIN_TOKENS) is uploaded once as CachedContent and replaced
+    (the old one deleted) before its TTL runs out; shorter ones, and those the
+    provider refuses to cache, still form an identical prefix, which Gemini
+    2.5 models cache implicitly;
+  - every call records fresh vs cached input tokens from the response's
+    usage metadata, per purpose, in `usage_stats`.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+# Explicit caches below the provider's minimum size are rejected; 1024 tokens is the Gemini 2.5 Flash floor.
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+# Renew a cache this long before it expires so no call races the expiry.
+PROMPT_CACHE_RENEW_MARGIN = 120
+# After a transient failure to create a cache, calls go uncached for this long before retrying.
+PROMPT_CACHE_RETRY_SECONDS = 60
+
+_configured = False
+_models: Dict[Tuple[str, str], Any] = {}
+# (model, instruction) -> (model bound to the cache, CachedContent, expiry timestamp)
+_cached_contents: Dict[Tuple[str, str], Tuple[Any, Any, float]] = {}
+# (model, instruction) pairs the provider refused to cache explicitly
+_uncacheable: set = set()
+# (model, instruction) -> time after which creating a cache is retried
+_cache_retry_at: Dict[Tuple[str, str], float] = {}
+_cache_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+usage_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _genai():
+    global _configured
+    import google.generativeai as genai
+
+    if not _configured:
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        _configured = True
+    return genai
+
+
+def _key(model_name: str, system_instruction: Optional[str]) -> Tuple[str, str]:
+    digest = hashlib.sha1(system_instruction.encode()).hexdigest() if system_instruction else ""
+    return model_name, digest
+
+
+def _is_definitive_refusal(error: Exception) -> bool:
+    """Whether the provider rejected the cache itself (unsupported model, content too small)."""
+    from google.api_core import exceptions
+
+    return isinstance(error, (exceptions.InvalidArgument, exceptions.NotFound))
+
+
+def get_model(model_name: str, system_instruction: Optional[str] = None):
+    """Returns the shared GenerativeModel for a model name and static instruction."""
+    key = _key(model_name, system_instruction)
+    model = _models.get(key)
+    if model is None:
+        genai = _genai()
+        model = _models[key] = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+    return model
+
+
+async def _cached_model(model_name: str, system_instruction: str):
+    """Returns a model bound to a live CachedContent for the instruction, or None."""
+    key = _key(model_name, system_instruction)
+    if key in _uncacheable or _cache_retry_at.get(key, 0) > time.time():
+        return None
+    lock = _cache_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        entry = _cached_contents.get(key)
+        if entry and entry[2] - PROMPT_CACHE_RENEW_MARGIN > time.time():
+            return entry[0]
+        genai = _genai()
+        from google.generativeai import caching
+
+        try:
+            cached = await asyncio.to_thread(
+                caching.CachedContent.create,
+                model=model_name if model_name.startswith("models/") else f"models/{model_name}",
+                display_name=f"aurora-{key[1][:12]}",
+                system_instruction=system_instruction,
+                ttl=PROMPT_CACHE_TTL_SECONDS,
+            )
+        except Exception as e:
+            if _is_definitive_refusal(e):
+                _uncacheable.add(key)
+                logger.warning(f"Explicit prompt caching unavailable for {model_name}, relying on implicit caching: {e}")
+            else:
+                _cache_retry_at[key] = time.time() + PROMPT_CACHE_RETRY_SECONDS
+                logger.warning(f"Could not cache a static prompt for {model_name}, retrying in {PROMPT_CACHE_RETRY_SECONDS}s: {e}")
+            return None
+        _cache_retry_at.pop(key, None)
+        model = genai.GenerativeModel.from_cached_content(cached_content=cached)
+        _cached_contents[key] = (model, cached, time.time() + PROMPT_CACHE_TTL_SECONDS)
+        logger.info(f"Cached a static prompt for {model_name} as {cached.name} for {PROMPT_CACHE_TTL_SECONDS}s")
+        if entry:
+            # The superseded cache would otherwise be billed for storage until it expires
+            await _delete_cached_content(entry[1])
+        return model
+
+
+async def _delete_cached_content(cached) -> None:
+    try:
+        await asyncio.to_thread(cached.delete)
+    except Exception as e:
+        logger.warning(f"Could not delete cached prompt {cached.name}: {e}")
+
+
+def _record_usage(purpose: str, response) -> Dict[str, int]:
+    metadata = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(metadata, "prompt_token_count", 0) or 0
+    cached_tokens = getattr(metadata, "cached_content_token_count", 0) or 0
+    output_tokens = getattr(metadata, "candidates_token_count", 0) or 0
+    usage = {
+        "input_tokens": prompt_tokens,
+        "cached_input_tokens": cached_tokens,
+        "fresh_input_tokens": prompt_tokens - cached_tokens,
+        "output_tokens": output_tokens,
+    }
+    totals = usage_stats.setdefault(purpose, {"calls": 0, **{name: 0 for name in usage}})
+    totals["calls"] += 1
+    for name, value in usage.items():
+        totals[name] += value
+    logger.info(
+        f"LLM {purpose}: {prompt_tokens} input tokens ({cached_tokens} cached, "
+        f"{usage['fresh_input_tokens']} fresh), {output_tokens} output tokens"
+    )
+    return usage
+
+
+async def generate(model_name: str, prompt: str, system_instruction: Optional[str] = None,
+                   purpose: str = "default", **kwargs):
+    """
+    Generates content with a shared client. `system_instruction` is the static
+    part of the prompt; it is cached on the provider side when large enough.
+    Extra keyword arguments go to `generate_content_async`.
+    """
+    model = None
+    if (PROMPT_CACHE_ENABLED and system_instruction
+            and len(system_instruction) // 4 >= PROMPT_CACHE_MIN_TOKENS):
+        model = await _cached_model(model_name, system_instruction)
+    if model is None:
+        model = get_model(model_name, system_instruction)
+    response = await model.generate_content_async(prompt, **kwargs)
+    _record_usage(purpose, response)
+    return response
+
+
+async def clear_prompt_caches():
+    """Deletes the CachedContent resources created by this process."""
+    for key, (_, cached, _) in list(_cached_contents.items()):
+        await _delete_cached_content(cached)
+        _cached_contents.pop(key, None)
@@ -0,0 +1,109 @@
+# File: session-bubble/aurora_agent/mission_events.py
+# in aurora_agent/mission_events.py
+"""
+Typed, compact progress records for a running mission.
+
+`MissionEventTranslator` turns raw ADK events from `runner.run_async` into small
+JSON-serializable records that the frontend can render as they happen:
+
+    mission_started   {prompt}
+    tool_started      {tool, call_id, args}
+    tool_finished     {tool, call_id, duration_ms, ok, result}
+    model_text        {text, partial}              (streamed chunks, then the whole text)
+    screenshot        {ref, width, height, bbox}   (image served separately)
+    mission_finished  {status, result}
+
+Records are delivered over SSE (`format_sse`) or a WebSocket as plain JSON.
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAX_VALUE_CHARS = 500
+
+MISSION_STARTED = "mission_started"
+TOOL_STARTED = "tool_started"
+TOOL_FINISHED = "tool_finished"
+MODEL_TEXT = "model_text"
+SCREENSHOT = "screenshot"
+MISSION_FINISHED = "mission_finished"
+
+
+def compact(value: Any, limit: int = MAX_VALUE_CHARS) -> Any:
+    """Keeps small JSON values as they are and truncates anything large to a string."""
+    try:
+        text = json.dumps(value, default=str)
+    except (TypeError, ValueError):
+        text = str(value)
+    if len(text) <= limit:
+        return value if isinstance(value, (str, int, float, bool, type(None), list, dict)) else text
+    return text[:limit] + "..."
+
+
+def record(event_type: str, **data: Any) -> Dict[str, Any]:
+    return {"type": event_type, **data}
+
+
+class MissionEventTranslator:
+    """Converts ADK events into progress records, timing each tool call."""
+
+    def __init__(self):
+        # call_id -> (tool name, start time)
+        self._pending_calls: Dict[str, Tuple[str, float]] = {}
+
+    def translate(self, event) -> List[Dict[str, Any]]:
+        records = []
+        if event.partial:
+            # Streamed chunks only carry text; tool calls arrive once, in the final event.
+            text = self._text(event)
+            return [record(MODEL_TEXT, text=text, partial=True)] if text else []
+
+        for call in event.get_function_calls() or []:
+            call_id = call.id or call.name
+            self._pending_calls[call_id] = (call.name, time.monotonic())
+            records.append(record(TOOL_STARTED, tool=call.name, call_id=call_id, args=compact(call.args)))
+
+        for response in event.get_function_responses() or []:
+            call_id = response.id or response.name
+            name, started = self._pending_calls.pop(call_id, (response.name, None))
+            result = response.response or {}
+            result_text = str(result.get("result", result)) if isinstance(result, dict) else str(result)
+            records.append(record(
+                TOOL_FINISHED,
+                tool=name,
+                call_id=call_id,
+                duration_ms=round((time.monotonic() - started) * 1000) if started else None,
+                ok=not result_text.startswith("Error"),
+                result=compact(result_text),
+            ))
+
+        text = self._text(event)
+        if text:
+            records.append(record(MODEL_TEXT, text=text, partial=False))
+        return records
+
+    @staticmethod
+    def _text(event) -> str:
+        if event.author == "user" or not event.content or not event.content.parts:
+            return ""
+        return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+
+
+def final_text(event) -> Optional[str]:
+    """The agent's text in a complete (non-partial) model event, if any."""
+    if event.author == "user" or event.partial or not event.content or not event.content.parts:
+        return None
+    text = "".join(part.text for part in event.content.parts if part.text and not part.thought)
+    return text or None
+
+
+def format_sse(data: Dict[str, Any]) -> str:
+    """Formats a record as a Server-Sent Events message."""
+    lines = [f"event: {data.get('type', 'message')}"]
+    if "seq" in data:
+        lines.append(f"id: {data['seq']}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,290 @@
+# File: session-bubble/aurora_agent/mission_queue.py
+# in aurora_agent/mission_queue.py
+"""
+Asynchronous mission job queue.
+
+Missions are submitted as jobs and executed by a fixed pool of workers, one per
+available browser context, so a burst of requests queues up instead of holding
+HTTP requests open or running several agents against the same browser.
+Interactive jobs (a teacher waiting on the result) are served before background
+jobs; within a priority class jobs run in submission order.
+"""
+import asyncio
+import itertools
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .mission_events import MISSION_FINISHED
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITY_LEVELS = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 10}
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINAL_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+# One worker per browser context; the BrowserManager drives a single context today.
+MAX_CONCURRENT_MISSIONS = int(os.getenv("MAX_CONCURRENT_MISSIONS", "1"))
+MAX_QUEUED_MISSIONS = int(os.getenv("MAX_QUEUED_MISSIONS", "100"))
+# Finished jobs are kept this long so clients can still poll their status.
+FINISHED_JOB_TTL_SECONDS = int(os.getenv("FINISHED_JOB_TTL_SECONDS", "3600"))
+# Progress records kept per job so late subscribers can catch up.
+MAX_JOB_EVENTS = 500
+MAX_JOB_SCREENSHOTS = 20
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# executor(payload, session_id, on_event) -> result dict; session_id is None for an unnamed session
+MissionExecutor = Callable[[dict, Optional[str], Callable[[dict], None]], Awaitable[dict]]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+@dataclass
+class MissionJob:
+    id: str
+    payload: dict
+    session_id: Optional[str]
+    priority: str
+    sequence: int = 0
+    status: str = STATUS_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    events: List[dict] = field(default_factory=list, repr=False)
+    screenshots: Dict[int, bytes] = field(default_factory=dict, repr=False)
+    _subscribers: List[asyncio.Queue] = field(default_factory=list, repr=False)
+    _event_seq: int = field(default=0, repr=False)
+
+    def emit(self, data: dict):
+        """
+        Publishes a progress record to every subscriber. A record carrying raw
+        `image` bytes has them stored on the job and replaced by a reference.
+        """
+        self._event_seq += 1
+        image = data.pop("image", None)
+        if image is not None:
+            self.screenshots[self._event_seq] = image
+            while len(self.screenshots) > MAX_JOB_SCREENSHOTS:
+                self.screenshots.pop(min(self.screenshots))
+            data["ref"] = f"/missions/{self.id}/screenshots/{self._event_seq}"
+        data.update(job_id=self.id, seq=self._event_seq, ts=round(time.time(), 3))
+        self.events.append(data)
+        del self.events[:-MAX_JOB_EVENTS]
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()  # A slow subscriber loses its oldest record, not the stream
+            queue.put_nowait(data)
+
+    async def subscribe(self) -> AsyncIterator[dict]:
+        """Yields the records emitted so far, then live records until the job finishes."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        backlog = list(self.events)
+        self._subscribers.append(queue)
+        try:
+            for data in backlog:
+                yield data
+            if self.done.is_set():
+                return
+            while True:
+                data = await queue.get()
+                yield data
+                if data["type"] == MISSION_FINISHED:
+                    return
+        finally:
+            self._subscribers.remove(queue)
+
+    def to_dict(self, position: Optional[int] = None) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "session_id": self.session_id,
+            "priority": self.priority,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+        if position is not None:
+            data["queue_position"] = position
+        return data
+
+
+class MissionQueue:
+    """Priority job queue drained by a bounded pool of mission workers."""
+
+    def __init__(
+        self,
+        executor: Optional[MissionExecutor] = None,
+        workers: int = MAX_CONCURRENT_MISSIONS,
+        max_queued: int = MAX_QUEUED_MISSIONS,
+    ):
+        self.executor = executor
+        self.worker_count = max(1, workers)
+        self.max_queued = max_queued
+        self.jobs: Dict[str, MissionJob] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, executor: Optional[MissionExecutor] = None):
+        """Starts the worker pool. Must be called from the running event loop."""
+        if executor:
+            self.executor = executor
+        if self.running:
+            return
+        if self.executor is None:
+            raise RuntimeError("MissionQueue needs an executor before it can start.")
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [
+            asyncio.create_task(self._worker(index), name=f"mission-worker-{index}")
+            for index in range(self.worker_count)
+        ]
+        logger.info(f"Mission queue started with {self.worker_count} worker(s)")
+
+    async def stop(self):
+        """Cancels the workers and every job that has not finished."""
+        for job in self.jobs.values():
+            if job.status not in FINAL_STATUSES:
+                self._finish(job, STATUS_CANCELLED, error="Server shutting down")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Mission queue stopped")
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if job.status == STATUS_QUEUED)
+
+    def submit(self, payload: dict, session_id: Optional[str] = None, priority: str = PRIORITY_INTERACTIVE) -> MissionJob:
+        """
+        Enqueues a mission and returns its job immediately.
+
+        Raises:
+            ValueError: Unknown priority class.
+            QueueFullError: Too many jobs are already waiting.
+        """
+        if priority not in PRIORITY_LEVELS:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PRIORITY_LEVELS)}")
+        self._prune_finished()
+        if self.queued_count() >= self.max_queued:
+            raise QueueFullError(f"Mission queue is full ({self.max_queued} jobs waiting)")
+        if not self.running:
+            self.start()
+
+        job = MissionJob(
+            id=uuid.uuid4().hex, payload=payload, session_id=session_id,
+            priority=priority, sequence=next(self._sequence),
+        )
+        self.jobs[job.id] = job
+        self._queue.put_nowait((PRIORITY_LEVELS[priority], job.sequence, job.id))
+        logger.info(f"Queued mission job {job.id} ({priority}, session {session_id}); {self.queued_count()} waiting")
+        return job
+
+    async def run(self, payload: dict, session_id: Optional[str] = None, priority: str = PRIORITY_INTERACTIVE) -> dict:
+        """Submits a mission and waits for its result (used by the synchronous endpoint)."""
+        job = self.submit(payload, session_id, priority)
+        await job.done.wait()
+        if job.result is not None:
+            return job.result
+        return {"status": "ERROR", "result": job.error or f"Mission {job.status}"}
+
+    def get(self, job_id: str) -> Optional[MissionJob]:
+        return self.jobs.get(job_id)
+
+    def position(self, job: MissionJob) -> Optional[int]:
+        """1-based position among waiting jobs, in the order workers will pick them up."""
+        if job.status != STATUS_QUEUED:
+            return None
+        key = (PRIORITY_LEVELS[job.priority], job.sequence)
+        return 1 + sum(
+            1 for other in self.jobs.values()
+            if other.status == STATUS_QUEUED and (PRIORITY_LEVELS[other.priority], other.sequence) < key
+        )
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return job.to_dict(self.position(job)) if job else None
+
+    def cancel(self, job_id: str) -> Optional[MissionJob]:
+        """Cancels a queued or running job. Returns None if the job is unknown."""
+        job = self.jobs.get(job_id)
+        if not job or job.status in FINAL_STATUSES:
+            return job
+        if job.status == STATUS_RUNNING and job.task:
+            job.task.cancel()  # The worker records the cancellation
+        else:
+            # Still queued: the worker skips it when it reaches the head of the queue
+            self._finish(job, STATUS_CANCELLED, error="Cancelled before it started")
+        logger.info(f"Cancellation requested for mission job {job_id}")
+        return job
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                job = self.jobs.get(job_id)
+                if job is None or job.status != STATUS_QUEUED:
+                    continue
+                await self._execute(job, index)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job: MissionJob, index: int):
+        job.status = STATUS_RUNNING
+        job.started_at = time.time()
+        logger.info(f"Worker {index} running mission job {job.id} (waited {job.started_at - job.created_at:.1f}s)")
+        job.task = asyncio.create_task(self.executor(job.payload, job.session_id, job.emit))
+        try:
+            result = await job.task
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                raise  # The worker itself is being stopped
+            self._finish(job, STATUS_CANCELLED, error="Cancelled while running")
+        except Exception as e:
+            logger.error(f"Mission job {job.id} failed: {e}", exc_info=True)
+            self._finish(job, STATUS_FAILED, error=str(e))
+        else:
+            status = STATUS_SUCCEEDED if result.get("status") == "SUCCESS" else STATUS_FAILED
+            self._finish(job, status, result=result)
+        finally:
+            job.task = None
+
+    def _finish(self, job: MissionJob, status: str, result: Optional[dict] = None, error: Optional[str] = None):
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.emit({"type": MISSION_FINISHED, "status": status, "result": result, "error": error})
+        job.done.set()
+        duration = job.finished_at - (job.started_at or job.created_at)
+        logger.info(f"Mission job {job.id} {status} after {duration:.1f}s")
+
+    def _prune_finished(self):
+        cutoff = time.time() - FINISHED_JOB_TTL_SECONDS
+        for job_id in [job.id for job in self.jobs.values() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+
+# Global instance, started by the FastAPI app with its mission executor
+mission_queue = MissionQueue()
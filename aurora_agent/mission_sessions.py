@@ -0,0 +1,259 @@
+# File: session-bubble/aurora_agent/mission_sessions.py
+# in aurora_agent/mission_sessions.py
+"""
+Process-wide ADK runners and a persistent session store for browser missions.
+
+A Runner is stateless between invocations, so one is built per agent and
+reused for every request. Sessions live in the application database (see
+database.py) keyed by the caller's `session_id`, so a multi-turn teaching
+session keeps its conversation across requests and restarts.
+
+To keep each model call small, a session whose history exceeds the token
+budget is compacted before the next turn: older turns are folded into a short
+summary event and only the most recent turns are kept verbatim.
+
+A request without a `session_id` runs on a fresh in-memory session that is
+discarded afterwards; only sessions the caller named are persisted, so
+unrelated callers never share a conversation.
+"""
+import asyncio
+import logging
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, InMemorySessionService, Session
+from google.genai.types import Content, Part
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "aurora_agent"
+# Rough token budget for the stored history sent to the model on every call.
+HISTORY_TOKEN_BUDGET = int(os.getenv("MISSION_HISTORY_TOKEN_BUDGET", "8000"))
+# Number of most recent events kept verbatim when compacting.
+KEEP_RECENT_EVENTS = int(os.getenv("MISSION_KEEP_RECENT_EVENTS", "12"))
+SUMMARY_MAX_CHARS = 2000
+SUMMARY_LINE_CHARS = 200
+SUMMARY_STATE_KEY = "conversation_summary"
+SUMMARY_PREFIX = "Summary of the earlier conversation in this session:"
+# Suffix of the session a compacted history is written to before it replaces the original.
+STAGING_SUFFIX = "~compacted"
+EPHEMERAL_PREFIX = "ephemeral-"
+
+_session_service: Optional[BaseSessionService] = None
+_ephemeral_service: Optional[BaseSessionService] = None
+# (agent name, persistent) -> Runner
+_runners: Dict[Tuple[str, bool], Runner] = {}
+# (user_id, session_id) -> [lock, number of holders and waiters]; dropped when the count reaches 0.
+_session_locks: Dict[Tuple[str, str], list] = {}
+
+
+def get_session_service() -> BaseSessionService:
+    """Returns the shared ADK session service backed by the application database."""
+    global _session_service
+    if _session_service is None:
+        from .database import async_engine
+
+        _session_service = DatabaseSessionService(db_engine=async_engine)
+        logger.info(f"ADK session store initialized on {async_engine.url}")
+    return _session_service
+
+
+def _get_ephemeral_service() -> BaseSessionService:
+    global _ephemeral_service
+    if _ephemeral_service is None:
+        _ephemeral_service = InMemorySessionService()
+    return _ephemeral_service
+
+
+def get_runner(agent, persistent: bool = True) -> Runner:
+    """
+    Returns the cached Runner for an agent, creating it on first use. Persistent
+    runners use the database session store, the others the in-memory one.
+    """
+    key = (agent.name, persistent)
+    runner = _runners.get(key)
+    if runner is None or runner.agent is not agent:
+        service = get_session_service() if persistent else _get_ephemeral_service()
+        runner = Runner(agent=agent, app_name=APP_NAME, session_service=service)
+        _runners[key] = runner
+        logger.info(f"Created {'persistent' if persistent else 'ephemeral'} ADK runner for agent '{agent.name}'")
+    return runner
+
+
+@asynccontextmanager
+async def session_lock(user_id: str, session_id: str) -> AsyncIterator[None]:
+    """Serializes turns of the same session so concurrent requests do not interleave history."""
+    key = (user_id, session_id)
+    entry = _session_locks.get(key)
+    if entry is None:
+        entry = _session_locks[key] = [asyncio.Lock(), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        # Nobody holds or waits for the lock any more, so idle sessions cost nothing.
+        if entry[1] == 0:
+            _session_locks.pop(key, None)
+
+
+def _event_text(event: Event) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    chunks = []
+    for part in event.content.parts:
+        if part.text:
+            chunks.append(part.text)
+        elif part.function_call:
+            chunks.append(f"[called {part.function_call.name}({part.function_call.args})]")
+        elif part.function_response:
+            chunks.append(f"[{part.function_response.name} returned {part.function_response.response}]")
+    return " ".join(chunks)
+
+
+def estimate_tokens(events: List[Event]) -> int:
+    """Cheap token estimate (~4 characters per token) of the history the model will see."""
+    return sum(len(_event_text(event)) for event in events) // 4
+
+
+def _is_turn_start(event: Event) -> bool:
+    """A user message that is not a tool response; cutting here keeps tool call pairs intact."""
+    if event.author != "user" or not event.content or not event.content.parts:
+        return False
+    return not any(part.function_response for part in event.content.parts)
+
+
+def summarize_events(events: List[Event], previous_summary: str = "") -> str:
+    """
+    Builds an extractive summary of `events` without an extra model call: one
+    truncated line per message, newest lines kept when over the size limit.
+    """
+    lines = [previous_summary] if previous_summary else []
+    for event in events:
+        text = " ".join(_event_text(event).split())
+        if not text or text.startswith(SUMMARY_PREFIX):
+            continue
+        if len(text) > SUMMARY_LINE_CHARS:
+            text = text[:SUMMARY_LINE_CHARS] + "..."
+        lines.append(f"- {event.author}: {text}")
+    summary = "\n".join(lines)
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = "..." + summary[-SUMMARY_MAX_CHARS:]
+    return summary
+
+
+async def _write_session(service: BaseSessionService, template: Session, session_id: str,
+                         state: dict, events: List[Event]) -> Session:
+    session = await service.create_session(
+        app_name=template.app_name, user_id=template.user_id, session_id=session_id, state=state
+    )
+    for event in events:
+        await service.append_event(session, event)
+    return session
+
+
+async def _replace_from_staging(service: BaseSessionService, staging: Session, session_id: str) -> Session:
+    """Overwrites the session with its staged compacted copy, then drops the copy."""
+    await service.delete_session(app_name=staging.app_name, user_id=staging.user_id, session_id=session_id)
+    session = await _write_session(service, staging, session_id, dict(staging.state), staging.events)
+    await service.delete_session(app_name=staging.app_name, user_id=staging.user_id, session_id=staging.id)
+    return session
+
+
+async def _recover_compaction(service: BaseSessionService, user_id: str, session_id: str,
+                              session: Optional[Session]) -> Optional[Session]:
+    """
+    Finishes or discards a compaction that was interrupted. The staged copy is
+    complete once the original may have been deleted, so a missing original, or
+    one that is empty or a partial copy of the staging session (it starts with
+    the same summary event), is rebuilt from it; otherwise the original is
+    intact and the staged copy is dropped.
+    """
+    staging = await service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id + STAGING_SUFFIX)
+    if staging is None:
+        return session
+    restoring = session is None or not session.events or (
+        bool(staging.events) and session.events[0].id == staging.events[0].id
+    )
+    if restoring:
+        logger.warning(f"Completing an interrupted compaction of session {session_id}")
+        return await _replace_from_staging(service, staging, session_id)
+    logger.warning(f"Discarding an interrupted compaction of session {session_id}")
+    await service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=staging.id)
+    return session
+
+
+async def _compact_session(session: Session) -> Session:
+    events = session.events
+    cut = max(len(events) - KEEP_RECENT_EVENTS, 0)
+    while cut < len(events) and not _is_turn_start(events[cut]):
+        cut += 1
+    if cut == 0 or cut >= len(events):
+        return session
+
+    summary = summarize_events(events[:cut], session.state.get(SUMMARY_STATE_KEY, ""))
+    state = {key: value for key, value in session.state.items() if not key.startswith(("app:", "user:", "temp:"))}
+    state[SUMMARY_STATE_KEY] = summary
+    summary_event = Event(
+        author="user",
+        invocation_id=events[cut].invocation_id,
+        # Events are ordered by timestamp; the summary must come before the kept turns.
+        timestamp=events[cut].timestamp - 0.001,
+        content=Content(role="user", parts=[Part(text=f"{SUMMARY_PREFIX}\n{summary}")]),
+    )
+
+    # The compacted history is written in full before the original is deleted, so an
+    # interruption at any point leaves a complete copy (see _recover_compaction).
+    service = get_session_service()
+    staging = await _write_session(service, session, session.id + STAGING_SUFFIX, state, [summary_event] + events[cut:])
+    compacted = await _replace_from_staging(service, staging, session.id)
+
+    logger.info(f"Compacted session {session.id}: folded {cut} events into a summary, kept {len(events) - cut}")
+    return compacted
+
+
+async def prepare_session(user_id: str, session_id: str, token_budget: int = HISTORY_TOKEN_BUDGET) -> Session:
+    """
+    Loads the persistent session (creating it if needed) and compacts its
+    history when it exceeds `token_budget`. Call while holding `session_lock`.
+    """
+    service = get_session_service()
+    session = await service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    session = await _recover_compaction(service, user_id, session_id, session)
+    if session is None:
+        return await service.create_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+
+    tokens = estimate_tokens(session.events)
+    if tokens > token_budget:
+        logger.info(f"Session {session_id} history is ~{tokens} tokens (budget {token_budget}), compacting")
+        session = await _compact_session(session)
+    return session
+
+
+@asynccontextmanager
+async def mission_session(agent, user_id: str, session_id: Optional[str]) -> AsyncIterator[Tuple[Runner, str]]:
+    """
+    Yields the runner and session id for one mission turn. A named session is
+    locked, loaded and compacted (see prepare_session) and persists; without a
+    name the turn runs on a fresh in-memory session that is deleted afterwards.
+    """
+    if session_id:
+        runner = get_runner(agent)
+        async with session_lock(user_id, session_id):
+            await prepare_session(user_id, session_id)
+            yield runner, session_id
+        return
+
+    runner = get_runner(agent, persistent=False)
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, session_id=f"{EPHEMERAL_PREFIX}{uuid.uuid4().hex}"
+    )
+    try:
+        yield runner, session.id
+    finally:
+        await runner.session_service.delete_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
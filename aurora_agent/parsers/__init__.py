@@ -1,18 +1,30 @@
 # in aurora_agent/parsers/__init__.py
 from .base_parser import BaseParser
 from .generic_parser import GenericParser
-from .sheets_parser import SheetsParser
-from .docs_parser import DocsParser
 import re
 from urllib.parse import urlparse
 from .jupyter_parser import JupyterParser
+from .accessibility_parser import AccessibilityParser
+from .catalog_parser import CatalogParser, DocsParser, SheetsParser, load_catalog
+from .readiness import (
+    READINESS_REGISTRY,
+    ReadinessPredicate,
+    get_readiness_for_url,
+    goto_and_wait_until_ready,
+    wait_until_ready,
+)
 
 # The registry is a list of tuples: (url_keyword, parser_class)
 # The first parser that matches the URL will be used.
+# Readiness predicates for the same applications live in READINESS_REGISTRY (readiness.py).
 PARSER_REGISTRY = [
-    (re.compile(r"https://docs\.google\.com/spreadsheets/"), SheetsParser),
-    (re.compile(r"https://docs\.google\.com/document/"), DocsParser),
-    (re.compile(r"/lab$"), JupyterParser),
+    (re.compile(r"/lab(/|\?|$)"), JupyterParser),
+    # Sheets and Docs chrome comes from static catalogs; menus, dialogs, the grid selection
+    # and the document text are read live (see catalog_parser.py). AccessibilityParser is not
+    # registered for any URL: it is exported for callers that want the AX tree explicitly and
+    # serves as a baseline in benchmarks/parser_benchmark.py.
+    (re.compile(r"docs\.google\.com/spreadsheets/"), SheetsParser),
+    (re.compile(r"docs\.google\.com/document/"), DocsParser),
 ]
 DEFAULT_PARSER = GenericParser
 
@@ -0,0 +1,169 @@
+# File: session-bubble/aurora_agent/parsers/accessibility_parser.py
+# in aurora_agent/parsers/accessibility_parser.py
+"""
+Parser built on Chromium's accessibility tree.
+
+Google Sheets and Docs describe their menus and toolbars with rich ARIA, so the
+browser's own AX tree names controls more accurately than CSS selectors can.
+One `Accessibility.getFullAXTree` call plus one `DOMSnapshot.captureSnapshot`
+call (for layout bounds) replaces the per-element sweep of GenericParser.
+The tree is pruned to actionable nodes in or near the viewport, wrappers that
+repeat their parent's name are collapsed, and every record carries a
+`get_by_role` locator that `generate_playwright_code` can use verbatim.
+
+No URL in PARSER_REGISTRY selects this parser any more: Sheets and Docs use
+the catalog parsers, whose live part is incremental, while this one reads the
+whole tree on every call. It is kept for explicit use and as a benchmark baseline.
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import Page
+from .base_parser import BaseParser
+
+logger = logging.getLogger(__name__)
+
+# ARIA roles a user can act on; anything else is only kept as context.
+ACTIONABLE_ROLES = {
+    "button", "link", "menuitem", "menuitemcheckbox", "menuitemradio", "tab",
+    "checkbox", "radio", "switch", "textbox", "searchbox", "combobox", "listbox",
+    "option", "slider", "spinbutton", "treeitem",
+}
+# Named ancestors with these roles are reported as the element's context.
+CONTAINER_ROLES = {"menu", "menubar", "toolbar", "dialog", "alertdialog", "tablist", "listbox", "tree", "navigation"}
+# States copied into records when present.
+STATE_PROPERTIES = ("checked", "expanded", "selected", "pressed", "focused")
+
+# Nodes within this many viewport heights/widths of the visible area are kept.
+VIEWPORT_MARGIN = 0.5
+MAX_ELEMENTS = 400
+MAX_NAME_CHARS = 100
+
+Bounds = Tuple[float, float, float, float]
+
+
+def _value(field: Optional[Dict[str, Any]]) -> Any:
+    return field.get("value") if field else None
+
+
+def _properties(node: Dict[str, Any]) -> Dict[str, Any]:
+    return {prop["name"]: _value(prop.get("value")) for prop in node.get("properties", [])}
+
+
+def _layout_bounds(snapshot: Dict[str, Any]) -> Dict[int, Bounds]:
+    """Maps backend DOM node ids of the main document to their page-coordinate bounds."""
+    if not snapshot.get("documents"):
+        return {}
+    document = snapshot["documents"][0]
+    backend_ids = document["nodes"]["backendNodeId"]
+    layout = document["layout"]
+    return {
+        backend_ids[node_index]: tuple(bounds)
+        for node_index, bounds in zip(layout["nodeIndex"], layout["bounds"])
+    }
+
+
+def _in_viewport(bounds: Bounds, viewport: Bounds) -> bool:
+    x, y, width, height = bounds
+    vx, vy, vw, vh = viewport
+    mx, my = vw * VIEWPORT_MARGIN, vh * VIEWPORT_MARGIN
+    return (
+        width > 0 and height > 0
+        and x + width >= vx - mx and x <= vx + vw + mx
+        and y + height >= vy - my and y <= vy + vh + my
+    )
+
+
+def _locator(role: str, name: str, nth: Optional[int]) -> str:
+    locator = f"page.get_by_role({json.dumps(role)}, name={json.dumps(name)}, exact=True)"
+    return f"{locator}.nth({nth})" if nth is not None else locator
+
+
+class AccessibilityParser(BaseParser):
+    """
+    A parser that reads actionable elements from the browser's accessibility tree.
+    """
+    async def get_interactive_elements(self, page: Page) -> List[Dict[str, Any]]:
+        logger.info("Using AccessibilityParser to find interactive elements.")
+        started = time.perf_counter()
+        client = await page.context.new_cdp_session(page)
+        try:
+            ax_tree = await client.send("Accessibility.getFullAXTree")
+            snapshot = await client.send("DOMSnapshot.captureSnapshot", {"computedStyles": []})
+            metrics = await client.send("Page.getLayoutMetrics")
+        except Exception as e:
+            logger.warning(f"Could not read the accessibility tree: {e}")
+            return []
+        finally:
+            await client.detach()
+
+        visual = metrics["cssVisualViewport"]
+        viewport = (visual["pageX"], visual["pageY"], visual["clientWidth"], visual["clientHeight"])
+        elements = self._prune(ax_tree["nodes"], _layout_bounds(snapshot), viewport)
+        logger.info(
+            f"AccessibilityParser kept {len(elements)} of {len(ax_tree['nodes'])} AX nodes "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return elements
+
+    def _prune(self, nodes: List[Dict[str, Any]], bounds_by_id: Dict[int, Bounds], viewport: Bounds) -> List[Dict[str, Any]]:
+        by_id = {node["nodeId"]: node for node in nodes}
+        roots = [node for node in nodes if not node.get("parentId") or node["parentId"] not in by_id]
+
+        # Document-order walk. Duplicate role+name pairs are counted over the
+        # whole tree, because get_by_role().nth() counts off-screen matches too.
+        candidates = []
+        seen_names: Dict[Tuple[str, str], int] = {}
+        stack = [(root, None, None) for root in reversed(roots)]
+        while stack:
+            node, context, parent_name = stack.pop()
+            role = _value(node.get("role")) or ""
+            name = (_value(node.get("name")) or "").strip()
+            ignored = node.get("ignored", False)
+            child_context, child_parent_name = context, parent_name
+
+            if not ignored and role in CONTAINER_ROLES and name:
+                child_context = f"{role} '{name}'"
+            if not ignored and role in ACTIONABLE_ROLES:
+                properties = _properties(node)
+                key = (role, name)
+                nth = seen_names.get(key, 0)
+                seen_names[key] = nth + 1
+                # A focusable wrapper repeating its actionable parent's name is the same control
+                if not (name and name == parent_name):
+                    candidates.append((node, role, name, properties, context, key, nth))
+                child_parent_name = name
+
+            for child_id in reversed(node.get("childIds", [])):
+                child = by_id.get(child_id)
+                if child:
+                    stack.append((child, child_context, child_parent_name))
+
+        elements = []
+        for node, role, name, properties, context, key, nth in candidates:
+            bounds = bounds_by_id.get(node.get("backendDOMNodeId"))
+            if not bounds or not _in_viewport(bounds, viewport):
+                continue
+            if not name and role not in ("textbox", "searchbox", "combobox", "checkbox", "radio", "switch", "slider"):
+                continue  # An unnamed button or link cannot be targeted by role and name
+            x, y, width, height = bounds
+            record = {
+                "uid": f"ax-{len(elements)}",
+                "role": role,
+                "name": name[:MAX_NAME_CHARS] + ("..." if len(name) > MAX_NAME_CHARS else ""),
+                "bounds": {"x": round(x), "y": round(y), "width": round(width), "height": round(height)},
+                "visible": True,
+                "enabled": not properties.get("disabled", False),
+                "playwright_locator": _locator(role, name, nth if seen_names[key] > 1 else None),
+            }
+            states = {state: properties[state] for state in STATE_PROPERTIES if state in properties}
+            if states:
+                record["states"] = states
+            if context:
+                record["context"] = context
+            elements.append(record)
+            if len(elements) >= MAX_ELEMENTS:
+                break
+        return elements
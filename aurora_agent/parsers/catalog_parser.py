@@ -0,0 +1,266 @@
+# File: session-bubble/aurora_agent/parsers/catalog_parser.py
+# in aurora_agent/parsers/catalog_parser.py
+"""
+Parsers for Google Sheets and Docs built on static locator catalogs.
+
+The menu bar and toolbar of these apps are the same in every document, so
+their locators live in versioned YAML catalogs (parsers/catalogs/) that are
+read once per process. Only the parts that change while a student works
+(open menus, dialogs, pickers, sheet tabs) are parsed live, through the
+incremental element index. The state a student edits - the grid selection and
+active cell content in Sheets, the text on screen in Docs - is held in input
+values and canvas-backed views the index cannot observe, so it is read on every
+parse by one small evaluation running alongside the index update.
+
+A runtime validator checks, in one evaluation, that each catalog selector
+still matches exactly one element. It runs on the first parse of a document
+and then at most every CATALOG_REVALIDATE_SECONDS. An entry that stopped
+resolving is re-located by its role and name and the new selector is used
+for that page; the catalog itself is never rewritten at runtime. Elements it
+has to tag get their own attribute, so the element index's uids are untouched.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import Page
+from .base_parser import BaseParser
+from .element_index import element_index
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DIR = Path(__file__).parent / "catalogs"
+CATALOG_REVALIDATE_SECONDS = int(os.getenv("CATALOG_REVALIDATE_SECONDS", "600"))
+MAX_DYNAMIC_ELEMENTS = 200
+MAX_TEXT_CHARS = 100
+MAX_LIVE_CHARS = 500
+# Attribute the validator tags re-located controls with (value: the entry id).
+CATALOG_ATTRIBUTE = "data-aurora-catalog"
+
+# Arguments: [entries, catalogAttribute]; entries are [{id, role, name, selector}].
+# Returns {id: selector} for every entry whose selector no longer matches exactly
+# one element; the selector is null when nothing with that role and name exists.
+VALIDATE_SCRIPT = r"""
+([entries, ATTRIBUTE]) => {
+    const count = (selector) => {
+        try { return document.querySelectorAll(selector).length; } catch (e) { return 0; }
+    };
+    const cssString = (value) => value.replace(/\\/g, '\\\\').replace(/"/g, '\\"');
+    const implicit = {button: 'button', link: 'a[href]', textbox: 'input, textarea'};
+    const stale = {};
+    for (const entry of entries) {
+        if (count(entry.selector) === 1) continue;
+        const query = `[role="${entry.role}"]` + (implicit[entry.role] ? ', ' + implicit[entry.role] : '');
+        const wanted = entry.name.toLowerCase();
+        let match = null;
+        for (const el of document.querySelectorAll(query)) {
+            const name = (el.getAttribute('aria-label') || el.innerText || '').trim().toLowerCase();
+            const rect = el.getBoundingClientRect();
+            if (name.startsWith(wanted) && rect.width > 0 && rect.height > 0) { match = el; break; }
+        }
+        if (!match) { stale[entry.id] = null; continue; }
+        const label = match.getAttribute('aria-label');
+        if (match.id && /^[A-Za-z][\w-]*$/.test(match.id) && count('#' + match.id) === 1) {
+            stale[entry.id] = '#' + match.id;
+        } else if (label && count(`[aria-label="${cssString(label)}"]`) === 1) {
+            stale[entry.id] = `[aria-label="${cssString(label)}"]`;
+        } else {
+            match.setAttribute(ATTRIBUTE, entry.id);
+            stale[entry.id] = `[${ATTRIBUTE}="${entry.id}"]`;
+        }
+    }
+    return stale;
+}
+"""
+
+# Arguments: [fields, maxChars]; fields are [{id, selector, read}].
+# Returns {id: text} for every field whose selector matches.
+LIVE_STATE_SCRIPT = r"""
+([fields, maxChars]) => {
+    const clip = (value) => {
+        const text = (value || '').replace(/\s+/g, ' ').trim();
+        return text.length > maxChars ? text.slice(0, maxChars) + '...' : text;
+    };
+    const state = {};
+    for (const field of fields) {
+        if (field.read === 'visible_text') {
+            // Matches are in reading order: binary search for the first one on screen
+            const nodes = document.querySelectorAll(field.selector);
+            let low = 0, high = nodes.length;
+            while (low < high) {
+                const mid = (low + high) >> 1;
+                if (nodes[mid].getBoundingClientRect().bottom < 0) low = mid + 1; else high = mid;
+            }
+            const parts = [];
+            let length = 0;
+            for (let i = low; i < nodes.length && length < maxChars; i++) {
+                if (nodes[i].getBoundingClientRect().top > innerHeight) break;
+                const text = nodes[i].innerText.trim();
+                if (text) { parts.push(text); length += text.length; }
+            }
+            if (nodes.length) state[field.id] = clip(parts.join(' '));
+            continue;
+        }
+        const node = document.querySelector(field.selector);
+        if (node) state[field.id] = clip(field.read === 'value' ? node.value : node.innerText);
+    }
+    return state;
+}
+"""
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    """A static control of an application's chrome."""
+    id: str
+    role: str
+    name: str
+    selector: str
+    description: str = ""
+
+
+@dataclass(frozen=True)
+class LiveField:
+    """Live state of a catalog entry, read on every parse."""
+    entry: str
+    read: str  # "value", "text" or "visible_text"
+    # Defaults to the entry's selector
+    selector: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LocatorCatalog:
+    """The versioned locator catalog of one application."""
+    app: str
+    version: int
+    entries: List[CatalogEntry]
+    dynamic_selectors: List[str]
+    live_state: List[LiveField] = field(default_factory=list)
+
+
+@functools.lru_cache(maxsize=None)
+def load_catalog(name: str) -> LocatorCatalog:
+    """Reads parsers/catalogs/<name>.yaml; each catalog is parsed once per process."""
+    import yaml
+
+    with open(CATALOG_DIR / f"{name}.yaml", encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    catalog = LocatorCatalog(
+        app=data["app"],
+        version=data["version"],
+        entries=[CatalogEntry(**entry) for entry in data["entries"]],
+        dynamic_selectors=list(data.get("dynamic_selectors", [])),
+        live_state=[LiveField(**live) for live in data.get("live_state", [])],
+    )
+    logger.info(f"Loaded locator catalog '{catalog.app}' v{catalog.version} with {len(catalog.entries)} entries")
+    return catalog
+
+
+@dataclass
+class _PageCatalogState:
+    """Validation results of a catalog on one page."""
+    url: Optional[str] = None
+    validated_at: float = 0.0
+    # Entry id -> selector that replaces the catalog's, or None when the control is absent
+    overrides: Dict[str, Optional[str]] = field(default_factory=dict)
+
+
+class CatalogParser(BaseParser):
+    """
+    Lists an application's chrome from its locator catalog and parses only the
+    dynamic parts of the page live. Subclasses set CATALOG_NAME.
+    """
+    CATALOG_NAME: str = ""
+    _page_states: "weakref.WeakKeyDictionary[Page, _PageCatalogState]" = weakref.WeakKeyDictionary()
+
+    async def get_interactive_elements(self, page: Page) -> List[Dict[str, Any]]:
+        logger.info(f"--- Using {type(self).__name__} ---")
+        catalog = load_catalog(self.CATALOG_NAME)
+        state = self._page_states.get(page)
+        if state is None:
+            state = self._page_states[page] = _PageCatalogState()
+
+        url = page.url.split("#", 1)[0]
+        if state.url != url or time.monotonic() - state.validated_at > CATALOG_REVALIDATE_SECONDS:
+            await self._validate(page, catalog, state, url)
+
+        dynamic, live = await asyncio.gather(
+            element_index.get_elements(page, catalog.dynamic_selectors, MAX_DYNAMIC_ELEMENTS, MAX_TEXT_CHARS),
+            self._read_live_state(page, catalog, state),
+            return_exceptions=True,
+        )
+        if isinstance(dynamic, Exception):
+            logger.warning(f"Could not read the dynamic elements of {catalog.app}: {dynamic}")
+            dynamic = []
+        if isinstance(live, Exception):
+            logger.warning(f"Could not read the live state of {catalog.app}: {live}")
+            live = {}
+
+        elements = []
+        for entry in catalog.entries:
+            selector = state.overrides.get(entry.id, entry.selector)
+            if selector is None:
+                continue
+            record = {
+                "uid": f"catalog-{entry.id}",
+                "role": entry.role,
+                "name": entry.name,
+                "playwright_locator": f"page.locator({json.dumps(selector)})",
+            }
+            if entry.description:
+                record["description"] = entry.description
+            if live.get(entry.id):
+                record["value"] = live[entry.id]
+            elements.append(record)
+
+        logger.info(f"{type(self).__name__}: {len(elements)} catalog entries, {len(dynamic)} live elements")
+        # Open menus and dialogs are what the user is most likely acting on
+        return dynamic + elements
+
+    async def _read_live_state(self, page: Page, catalog: LocatorCatalog, state: _PageCatalogState) -> Dict[str, str]:
+        entries = {entry.id: entry for entry in catalog.entries}
+        fields = []
+        for live in catalog.live_state:
+            selector = live.selector or state.overrides.get(live.entry, entries[live.entry].selector)
+            if selector:
+                fields.append({"id": live.entry, "selector": selector, "read": live.read})
+        if not fields:
+            return {}
+        return await page.evaluate(LIVE_STATE_SCRIPT, [fields, MAX_LIVE_CHARS])
+
+    async def _validate(self, page: Page, catalog: LocatorCatalog, state: _PageCatalogState, url: str):
+        entries = [
+            {"id": entry.id, "role": entry.role, "name": entry.name, "selector": entry.selector}
+            for entry in catalog.entries
+        ]
+        try:
+            stale = await page.evaluate(VALIDATE_SCRIPT, [entries, CATALOG_ATTRIBUTE])
+        except Exception as e:
+            # Keep the previous results; the next parse tries again
+            logger.warning(f"Could not validate the {catalog.app} catalog: {e}")
+            return
+        state.overrides = stale
+        state.url = url
+        state.validated_at = time.monotonic()
+        if stale:
+            logger.warning(
+                f"Catalog '{catalog.app}' v{catalog.version}: {len(stale)} stale entries "
+                f"(refreshed: {sorted(k for k, v in stale.items() if v)}, missing: {sorted(k for k, v in stale.items() if not v)})"
+            )
+
+
+class SheetsParser(CatalogParser):
+    """Parser for Google Sheets, backed by catalogs/sheets.yaml."""
+    CATALOG_NAME = "sheets"
+
+
+class DocsParser(CatalogParser):
+    """Parser for Google Docs, backed by catalogs/docs.yaml."""
+    CATALOG_NAME = "docs"
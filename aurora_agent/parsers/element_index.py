@@ -0,0 +1,314 @@
+# File: session-bubble/aurora_agent/parsers/element_index.py
+# in aurora_agent/parsers/element_index.py
+"""
+Incrementally maintained index of a page's interactive elements.
+
+The first call on a document installs an in-page index that scans the DOM once
+and then keeps a MutationObserver running. Later calls only send back the
+records that were added, changed or removed since the epoch Python last saw,
+so back-to-back interactions on an unchanged screen cost one tiny round trip.
+Only dirty subtrees are rebuilt in full; every other record has its bounds and
+locator re-checked, because a change anywhere can move it or make its locator
+ambiguous.
+A navigation replaces the document (and with it the in-page index), which is
+the only time a full rescan happens.
+
+Elements without a unique test id, id or aria-label are tagged with a
+`data-aurora-uid` attribute so their `playwright_locator` stays valid however
+the rest of the page changes.
+"""
+import asyncio
+import logging
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+UID_ATTRIBUTE = "data-aurora-uid"
+
+# Attributes that can change an element's visibility, name, state or locator.
+_OBSERVED_ATTRIBUTES = [
+    "class", "style", "hidden", "disabled", "role", "id", "href", "type", "value",
+    "title", "placeholder", "alt", "data-testid",
+    "aria-label", "aria-labelledby", "aria-disabled", "aria-hidden",
+]
+
+# Arguments: [selectors, maxText, knownDocId, knownEpoch, observedAttributes]
+SYNC_SCRIPT = r"""
+([selectors, maxText, knownDocId, knownEpoch, observedAttributes]) => {
+    const UID = '""" + UID_ATTRIBUTE + r"""';
+    const selector = selectors.join(',');
+    const implicitRoles = {A: 'link', BUTTON: 'button', TEXTAREA: 'textbox', SELECT: 'combobox'};
+    const inputRoles = {checkbox: 'checkbox', radio: 'radio', button: 'button', submit: 'button',
+                        reset: 'button', image: 'button', range: 'slider', search: 'searchbox'};
+    const clean = (value) => {
+        const text = (value || '').replace(/\s+/g, ' ').trim();
+        return text.length > maxText ? text.slice(0, maxText) + '...' : text;
+    };
+    const roleOf = (el) => {
+        const explicit = el.getAttribute('role');
+        if (explicit) return explicit.split(' ')[0];
+        if (el.tagName === 'INPUT') return inputRoles[(el.type || '').toLowerCase()] || 'textbox';
+        return implicitRoles[el.tagName] || el.tagName.toLowerCase();
+    };
+    const nameOf = (el) => {
+        const label = el.getAttribute('aria-label');
+        if (label) return label;
+        const labelledBy = el.getAttribute('aria-labelledby');
+        if (labelledBy) {
+            const text = labelledBy.split(/\s+/).map(id => document.getElementById(id))
+                .filter(Boolean).map(node => node.textContent).join(' ');
+            if (text.trim()) return text;
+        }
+        if (el.labels && el.labels.length) return el.labels[0].textContent;
+        return el.getAttribute('title') || el.getAttribute('placeholder') || el.getAttribute('alt')
+            || el.innerText || el.value || '';
+    };
+    const isVisible = (el, rect) => {
+        if (rect.width === 0 || rect.height === 0) return false;
+        if (el.checkVisibility) return el.checkVisibility({visibilityProperty: true, opacityProperty: true});
+        const style = getComputedStyle(el);
+        return style.visibility !== 'hidden' && style.display !== 'none' && style.opacity !== '0';
+    };
+    const quote = (value) => JSON.stringify(value);
+    const cssString = (value) => value.replace(/\\/g, '\\\\').replace(/"/g, '\\"');
+    // One pass per attribute builds value counts, instead of one document query per element
+    const valueCounts = {};
+    const unique = (attribute, value) => {
+        if (!valueCounts[attribute]) {
+            const counts = valueCounts[attribute] = new Map();
+            for (const node of document.querySelectorAll(`[${attribute}]`)) {
+                const key = node.getAttribute(attribute);
+                counts.set(key, (counts.get(key) || 0) + 1);
+            }
+        }
+        return valueCounts[attribute].get(value) === 1;
+    };
+
+    let index = window.__auroraElementIndex;
+    if (!index) {
+        index = window.__auroraElementIndex = {
+            docId: Math.random().toString(36).slice(2),
+            epoch: 0,
+            nextRecord: 0,
+            nextTag: 0,
+            records: new Map(),   // element -> {uid, json, record}
+            dirty: new Set(),
+            allDirty: true,
+            removals: false,
+        };
+        const markDirty = (node) => {
+            if (node && node.nodeType === Node.ELEMENT_NODE) index.dirty.add(node);
+        };
+        new MutationObserver((mutations) => {
+            for (const m of mutations) {
+                if (m.type === 'childList') {
+                    markDirty(m.target);
+                    if (m.removedNodes.length) index.removals = true;
+                } else if (m.type === 'attributes') {
+                    markDirty(m.target);
+                } else {
+                    markDirty(m.target.parentElement);
+                }
+            }
+        }).observe(document, {subtree: true, childList: true, characterData: true,
+                              attributes: true, attributeFilter: observedAttributes});
+        // Bounds are in page coordinates, so only inner scroll containers and resizes move them
+        addEventListener('scroll', (e) => { if (e.target !== document) markDirty(e.target); },
+                         {capture: true, passive: true});
+        addEventListener('resize', () => { index.allDirty = true; }, {passive: true});
+    }
+
+    const locatorOf = (el) => {
+        const testId = el.getAttribute('data-testid');
+        const ariaLabel = el.getAttribute('aria-label');
+        if (testId && unique('data-testid', testId)) {
+            return `page.get_by_test_id(${quote(testId)})`;
+        } else if (el.id && /^[A-Za-z][\w-]*$/.test(el.id) && unique('id', el.id)) {
+            return `page.locator(${quote('#' + el.id)})`;
+        } else if (ariaLabel && unique('aria-label', ariaLabel)) {
+            return `page.locator(${quote(`[aria-label="${cssString(ariaLabel)}"]`)})`;
+        }
+        let uid = el.getAttribute(UID);
+        if (!uid) {
+            uid = 'el-' + (index.nextTag++);
+            el.setAttribute(UID, uid);
+        }
+        return `page.locator(${quote(`[${UID}="${uid}"]`)})`;
+    };
+    const boundsOf = (rect) => ({x: Math.round(rect.x + scrollX), y: Math.round(rect.y + scrollY),
+                                 width: Math.round(rect.width), height: Math.round(rect.height)});
+
+    const build = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (!el.isConnected || !isVisible(el, rect)) return null;
+        const role = roleOf(el);
+        const name = clean(nameOf(el));
+        const text = clean(el.innerText);
+        return {
+            role,
+            name,
+            text: text && text !== name ? text : '',
+            bounds: boundsOf(rect),
+            visible: true,
+            enabled: !(el.disabled || el.getAttribute('aria-disabled') === 'true'),
+            playwright_locator: locatorOf(el),
+        };
+    };
+
+    const full = index.docId !== knownDocId || index.epoch !== knownEpoch || index.allDirty;
+    if (!full && !index.dirty.size && !index.removals) {
+        return {doc_id: index.docId, epoch: index.epoch, unchanged: true};
+    }
+
+    const upserts = [];
+    const removed = [];
+    const update = (el) => {
+        const entry = index.records.get(el);
+        const record = build(el);
+        if (!record) {
+            if (entry) {
+                index.records.delete(el);
+                removed.push(entry.uid);
+            }
+            return;
+        }
+        const uid = entry ? entry.uid : 'r' + (index.nextRecord++);
+        record.uid = uid;
+        const json = JSON.stringify(record);
+        if (entry && entry.json === json) return;
+        index.records.set(el, {uid, json, record});
+        upserts.push(record);
+    };
+    // Re-reads only what a change elsewhere on the page can invalidate: the position
+    // (an inserted banner shifts every control below it) and locator uniqueness (a
+    // duplicate id or aria-label may have appeared). Name and text stay cached.
+    const relayout = (el, entry) => {
+        const rect = el.getBoundingClientRect();
+        if (!isVisible(el, rect)) {
+            index.records.delete(el);
+            removed.push(entry.uid);
+            return;
+        }
+        const record = {...entry.record, bounds: boundsOf(rect), playwright_locator: locatorOf(el)};
+        const json = JSON.stringify(record);
+        if (json === entry.json) return;
+        index.records.set(el, {uid: entry.uid, json, record});
+        upserts.push(record);
+    };
+
+    let scanned = 0;
+    if (full) {
+        index.records.clear();
+        for (const el of document.querySelectorAll(selector)) { update(el); scanned++; }
+    } else {
+        if (index.removals) {
+            for (const [el, entry] of index.records) {
+                if (!el.isConnected) { index.records.delete(el); removed.push(entry.uid); }
+            }
+        }
+        // Skip dirty nodes inside another dirty node; the outer subtree scan covers them
+        const roots = [...index.dirty].filter(node => node.isConnected);
+        const rootSet = new Set(roots);
+        const seen = new Set();
+        for (const root of roots) {
+            let parent = root.parentElement;
+            while (parent && !rootSet.has(parent)) parent = parent.parentElement;
+            if (parent) continue;
+            const targets = [...root.querySelectorAll(selector)];
+            // A text or label change inside a control changes the control's own record
+            const owner = root.closest(selector);
+            if (owner) targets.push(owner);
+            for (const el of targets) {
+                if (!seen.has(el)) { seen.add(el); update(el); scanned++; }
+            }
+        }
+        for (const [el, entry] of [...index.records]) {
+            if (seen.has(el)) continue;
+            if (el.isConnected) relayout(el, entry);
+            else { index.records.delete(el); removed.push(entry.uid); }
+        }
+    }
+    index.dirty.clear();
+    index.allDirty = false;
+    index.removals = false;
+    index.epoch++;
+    return {doc_id: index.docId, epoch: index.epoch, full, upserts, removed, scanned};
+}
+"""
+
+
+class PageElementIndex:
+    """Python-side mirror of one page's in-page element index."""
+
+    def __init__(self):
+        self.doc_id: Optional[str] = None
+        self.epoch = -1
+        self.selectors: Optional[List[str]] = None
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.lock = asyncio.Lock()
+
+    async def sync(self, page: Page, selectors: Sequence[str], max_text: int) -> Dict[str, Any]:
+        if list(selectors) != self.selectors:
+            # Diffs only hold for the selectors that built the index; a new set forces a rescan
+            self.selectors = list(selectors)
+            self.doc_id = None
+        result = await page.evaluate(
+            SYNC_SCRIPT, [list(selectors), max_text, self.doc_id, self.epoch, _OBSERVED_ATTRIBUTES]
+        )
+        if result.get("unchanged"):
+            return result
+        if result["full"]:
+            self.records.clear()
+        else:
+            for uid in result["removed"]:
+                self.records.pop(uid, None)
+        for record in result["upserts"]:
+            self.records[record["uid"]] = record
+        self.doc_id = result["doc_id"]
+        self.epoch = result["epoch"]
+        return result
+
+
+class ElementIndex:
+    """Keeps one PageElementIndex per open page."""
+
+    def __init__(self):
+        self._pages: "weakref.WeakKeyDictionary[Page, PageElementIndex]" = weakref.WeakKeyDictionary()
+
+    async def get_elements(
+        self, page: Page, selectors: Sequence[str], max_elements: int, max_text: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the page's visible interactive elements in reading order,
+        fetching only what changed since the previous call.
+        """
+        index = self._pages.get(page)
+        if index is None:
+            index = self._pages[page] = PageElementIndex()
+
+        started = time.perf_counter()
+        async with index.lock:
+            result = await index.sync(page, selectors, max_text)
+            records = sorted(index.records.values(), key=lambda r: (r["bounds"]["y"], r["bounds"]["x"]))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if result.get("unchanged"):
+            logger.info(f"Element index unchanged at epoch {index.epoch}: {len(records)} elements in {elapsed_ms:.0f}ms")
+        else:
+            logger.info(
+                f"Element index {'rebuilt' if result['full'] else 'updated'} to epoch {index.epoch}: "
+                f"{len(result['upserts'])} upserted, {len(result['removed'])} removed, {result['scanned']} scanned, "
+                f"{len(records)} elements in {elapsed_ms:.0f}ms"
+            )
+        return records[:max_elements]
+
+    def forget(self, page: Page):
+        self._pages.pop(page, None)
+
+
+# Global instance shared by every parser call
+element_index = ElementIndex()
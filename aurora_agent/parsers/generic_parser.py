@@ -3,49 +3,43 @@
 from playwright.async_api import Page
 from typing import List, Dict, Any
 from .base_parser import BaseParser
+from .element_index import element_index
 import logging
 
 logger = logging.getLogger(__name__)
 
+INTERACTIVE_SELECTORS = [
+    'button',
+    'a[href]',
+    'input:not([type="hidden"])',
+    'textarea',
+    'select',
+    '[role="button"]',
+    '[role="link"]',
+    '[role="menuitem"]',
+    '[role="tab"]',
+    '[role="checkbox"]',
+    '[role="radio"]'
+]
+
+# Upper bound on records returned, to keep the LLM prompt bounded on huge pages.
+MAX_ELEMENTS = 400
+MAX_TEXT_CHARS = 100
+
 class GenericParser(BaseParser):
     """
     A generic parser for finding common interactive elements on a webpage.
     """
     async def get_interactive_elements(self, page: Page) -> List[Dict[str, Any]]:
         """
-        Finds all common interactive elements on the page.
+        Finds all visible common interactive elements on the page. Each record
+        carries the element's role, accessible name, text, bounds, enabled state
+        and a stable `playwright_locator`. The page's element index is kept up
+        to date in the page, so repeat calls only transfer what changed.
         """
         logger.info("Using GenericParser to find interactive elements.")
-        elements = []
-        selectors = [
-            'button',
-            'a[href]',
-            'input:not([type="hidden"])',
-            'textarea',
-            'select',
-            '[role="button"]',
-            '[role="link"]',
-            '[role="menuitem"]',
-            '[role="tab"]',
-            '[role="checkbox"]',
-            '[role="radio"]'
-        ]
-
-        for selector in selectors:
-            try:
-                locators = await page.locator(selector).all()
-                for i, locator in enumerate(locators):
-                    if await locator.is_visible() and await locator.is_enabled():
-                        uid = f"generic-{selector}-{i}"
-                        elements.append({
-                            "uid": uid,
-                            "selector": selector,
-                            "text": await locator.inner_text(),
-                            "aria_label": await locator.get_attribute('aria-label'),
-                            "role": await locator.get_attribute('role'),
-                            "locator": locator
-                        })
-            except Exception as e:
-                logger.warning(f"Could not find elements for selector '{selector}': {e}")
-
-        return elements
+        try:
+            return await element_index.get_elements(page, INTERACTIVE_SELECTORS, MAX_ELEMENTS, MAX_TEXT_CHARS)
+        except Exception as e:
+            logger.warning(f"Could not extract interactive elements: {e}")
+            return []
@@ -1,59 +1,176 @@
 # File: session-bubble/aurora_agent/parsers/jupyter_parser.py
 # in aurora_agent/parsers/jupyter_parser.py
+import json
 import logging
 from playwright.async_api import Page
 from .base_parser import BaseParser
 
 logger = logging.getLogger(__name__)
 
+MAX_SOURCE_CHARS = 200
+
+# Commands offered to the model. Those on the toolbar get a locator; the rest
+# are run through the command registry.
+NOTEBOOK_COMMANDS = [
+    "notebook:run-cell-and-select-next",
+    "runmenu:run",
+    "notebook:run-all-cells",
+    "notebook:insert-cell-below",
+    "notebook:delete-cell",
+    "notebook:change-cell-to-code",
+    "notebook:change-cell-to-markdown",
+    "notebook:interrupt-kernel",
+    "notebook:restart-kernel",
+    "docmanager:save",
+]
+
+# Scrolls JupyterLab's (possibly windowed) notebook so that a cell is rendered.
+SCROLL_TO_CELL_SCRIPT = (
+    "async (i) => { const nb = window.jupyterapp.shell.currentWidget.content; "
+    "if (nb.scrollToItem) { await nb.scrollToItem(i, 'center'); } else { nb.scrollToCell(nb.widgets[i]); } }"
+)
+
+# Reads cells, commands and kernel state from the JupyterLab application model in
+# one evaluation. Cells that windowing has not rendered are still in the model.
+READ_NOTEBOOK_SCRIPT = """
+([commandIds, maxSource]) => {
+    const app = window.jupyterapp;
+    const result = {model: !!(app && app.shell), notebook: null, kernel: null, cells: [], commands: []};
+    const visible = (node) => !!node && node.isConnected && node.getBoundingClientRect().height > 0;
+    const toolbarButton = (id) => document.querySelector(`.jp-NotebookPanel-toolbar [data-command="${id}"]`);
+
+    if (!result.model) {
+        // Application object not exposed: fall back to the toolbar buttons and cells in the DOM
+        for (const id of commandIds) {
+            const button = toolbarButton(id);
+            if (!visible(button)) continue;
+            result.commands.push({id, label: button.getAttribute('title') || button.getAttribute('aria-label') || id,
+                                  enabled: !button.disabled && button.getAttribute('aria-disabled') !== 'true',
+                                  in_toolbar: true});
+        }
+        document.querySelectorAll('.jp-Notebook .jp-Cell').forEach((node, index) => {
+            const editor = node.querySelector('.jp-InputArea-editor');
+            result.cells.push({
+                index,
+                type: node.classList.contains('jp-MarkdownCell') ? 'markdown' : 'code',
+                source: (editor ? editor.textContent : '').slice(0, maxSource),
+                rendered: visible(node),
+                window_index: node.getAttribute('data-windowed-list-index'),
+            });
+        });
+        return result;
+    }
+
+    for (const id of commandIds) {
+        if (!app.commands.hasCommand(id)) continue;
+        result.commands.push({id, label: app.commands.label(id) || id, enabled: app.commands.isEnabled(id),
+                              in_toolbar: visible(toolbarButton(id))});
+    }
+
+    const panel = app.shell.currentWidget;
+    const notebook = panel && panel.content;
+    if (!notebook || !notebook.model) return result;
+
+    result.notebook = {path: panel.context ? panel.context.path : null, active_cell: notebook.activeCellIndex};
+    const sessionContext = panel.sessionContext;
+    if (sessionContext) {
+        const kernel = sessionContext.session && sessionContext.session.kernel;
+        result.kernel = {name: sessionContext.kernelDisplayName, status: kernel ? kernel.status : 'no kernel'};
+    }
+
+    const cells = notebook.model.cells;
+    for (let index = 0; index < cells.length; index++) {
+        const cell = cells.get(index);
+        const source = cell.sharedModel ? cell.sharedModel.getSource() : cell.value.text;
+        const widget = notebook.widgets[index];
+        result.cells.push({
+            index,
+            type: cell.type,
+            source: source.slice(0, maxSource),
+            lines: source.split('\\n').length,
+            execution_count: cell.executionCount === undefined ? null : cell.executionCount,
+            outputs: cell.outputs ? cell.outputs.length : 0,
+            rendered: !!widget && visible(widget.node),
+            window_index: widget && widget.node.getAttribute('data-windowed-list-index'),
+        });
+    }
+    return result;
+}
+"""
+
 class JupyterParser(BaseParser):
     """
     A specialized parser that understands the HTML structure of a standard
     JupyterLab interface.
+
+    The notebook is read from the `jupyterapp` model in a single evaluation, so
+    parsing costs one round trip however long the notebook is, and cells that
+    JupyterLab's windowing has not rendered are still listed. Such cells carry a
+    `scroll_into_view` statement that renders them before their locator is used.
+    Without the model, the rendered cells and toolbar buttons are read from the DOM.
+
+    Every locator is a single `page.locator(...)` call: generated code that also
+    runs `page.evaluate` statements is executed through the legacy sanitizer,
+    which would turn a chained `.locator(...)` into a page-wide `page.locator(...)`.
     """
     async def get_interactive_elements(self, page: Page) -> list[dict]:
         logger.info("--- Using JupyterParser ---")
-        search_scope = page.locator(scope_selector) if scope_selector else page
-        run_button = search_scope.locator("[data-command='runmenu:run']")
-        # ... and so on for all your other selectors ...
-        # ...
-        
-        # Example for finding code cells within the scope:
-        code_cells = await search_scope.locator("div.jp-Cell-inputWrapper div.cm-content").all()
-        elements_info = []
-
-        # 1. Find all visible code cells' editable areas
         try:
-            # The '.cm-content' class is common for CodeMirror 6, used by modern JupyterLab
-            cell_editors = await page.locator("div.jp-Cell-inputWrapper div.cm-content").all()
-            for i, editor in enumerate(cell_editors):
-                if await editor.is_visible():
-                    elements_info.append({
-                        "element_id": f"jupyter-code-cell-{i}",
-                        "description": f"Code cell #{i+1}, ready for input.",
-                        "playwright_locator": f"page.locator(\"div.jp-Cell-inputWrapper div.cm-content\").nth({i})"
-                    })
+            state = await page.evaluate(READ_NOTEBOOK_SCRIPT, [NOTEBOOK_COMMANDS, MAX_SOURCE_CHARS])
         except Exception as e:
-            logger.warning(f"Could not find Jupyter code cells: {e}")
+            logger.warning(f"Could not read the Jupyter notebook: {e}")
+            return []
+        if not state["model"]:
+            logger.info("window.jupyterapp is not exposed; only rendered cells are listed")
 
-        # 2. Find key toolbar buttons using reliable 'data-command' attributes
-        try:
-            run_button = page.locator("[data-command='runmenu:run']")
-            if await run_button.is_visible():
-                elements_info.append({
-                    "element_id": "jupyter-run-button",
-                    "description": "The 'Run selected cells and advance' button in the toolbar.",
-                    "playwright_locator": "page.locator(\"[data-command='runmenu:run']\")"
-                })
-
-            add_cell_button = page.locator("[data-command='notebook:insert-cell-below']")
-            if await add_cell_button.is_visible():
-                elements_info.append({
-                    "element_id": "jupyter-add-cell-button",
-                    "description": "The 'Insert a cell below' button in the toolbar.",
-                    "playwright_locator": "page.locator(\"[data-command='notebook:insert-cell-below']\")"
-                })
-        except Exception as e:
-            logger.warning(f"Could not find Jupyter toolbar buttons: {e}")
+        elements_info = []
+        if state["kernel"]:
+            kernel = state["kernel"]
+            elements_info.append({
+                "element_id": "jupyter-kernel",
+                "description": f"Kernel '{kernel['name']}' is {kernel['status']}.",
+            })
+
+        for command in state["commands"]:
+            element = {
+                "element_id": f"jupyter-command-{command['id'].split(':', 1)[1]}",
+                "description": f"The '{command['label']}' command" + ("" if command["enabled"] else " (currently disabled)") + ".",
+                "enabled": command["enabled"],
+            }
+            if command["in_toolbar"]:
+                element["playwright_locator"] = f"page.locator(\".jp-NotebookPanel-toolbar [data-command='{command['id']}']\")"
+            else:
+                element["run_command"] = f"await page.evaluate(\"(id) => window.jupyterapp.commands.execute(id)\", {json.dumps(command['id'])})"
+            elements_info.append(element)
+
+        active = state["notebook"]["active_cell"] if state["notebook"] else None
+        # Windowed notebooks tag rendered cells with their index; otherwise every cell is rendered in order
+        windowed = any(cell["window_index"] is not None for cell in state["cells"])
+        for cell in state["cells"]:
+            i = cell["index"]
+            if windowed:
+                cell_selector = f".jp-Notebook .jp-Cell[data-windowed-list-index='{i}'] .jp-InputArea-editor"
+            else:
+                cell_selector = f".jp-Notebook .jp-Cell >> nth={i} >> .jp-InputArea-editor"
+            description = f"{cell['type'].capitalize()} cell #{i+1}"
+            if cell.get("execution_count"):
+                description += f" [{cell['execution_count']}]"
+            if cell.get("outputs"):
+                description += f", {cell['outputs']} output(s)"
+            if i == active:
+                description += ", active"
+            element = {
+                "element_id": f"jupyter-cell-{i}",
+                "description": description + ".",
+                "source": cell["source"],
+                "playwright_locator": f"page.locator(\"{cell_selector}\")",
+            }
+            if not cell["rendered"] and state["model"]:
+                element["scroll_into_view"] = f"await page.evaluate({json.dumps(SCROLL_TO_CELL_SCRIPT)}, {i})"
+            elements_info.append(element)
 
-        return elements_info
\ No newline at end of file
+        logger.info(
+            f"JupyterParser read {len(state['cells'])} cells "
+            f"({sum(1 for cell in state['cells'] if not cell['rendered'])} off-screen) and {len(state['commands'])} commands"
+        )
+        return elements_info
@@ -0,0 +1,131 @@
+# File: session-bubble/aurora_agent/parsers/readiness.py
+# in aurora_agent/parsers/readiness.py
+"""
+Application-aware readiness predicates.
+
+Instead of waiting for `domcontentloaded` and then sleeping for a guessed amount
+of time, navigation waits for an in-page predicate that describes when the
+application is actually usable (JupyterLab shell restored with an idle kernel,
+Sheets grid rendered, Docs editor editable, ...). Each predicate is evaluated
+inside the page by a single `page.wait_for_function` call.
+"""
+import logging
+import re
+import time
+from dataclasses import dataclass
+from playwright.async_api import Page, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READY_TIMEOUT_MS = 60000
+
+
+@dataclass(frozen=True)
+class ReadinessPredicate:
+    """A named JavaScript predicate that returns truthy once the app is usable."""
+    name: str
+    expression: str
+    # The navigation milestone to wait for before evaluating the predicate.
+    wait_until: str = "commit"
+
+
+JUPYTERLAB_READY = ReadinessPredicate(
+    name="jupyterlab",
+    expression="""() => {
+        if (document.getElementById('jupyterlab-splash')) return false;
+        if (!document.querySelector('.jp-LabShell')) return false;
+        const app = window.jupyterapp;
+        const widget = app && app.shell && app.shell.currentWidget;
+        const sessionContext = widget && widget.sessionContext;
+        if (sessionContext) {
+            const kernel = sessionContext.session && sessionContext.session.kernel;
+            return !kernel || kernel.status === 'idle';
+        }
+        const indicator = document.querySelector('.jp-Notebook-ExecutionIndicator');
+        if (indicator && indicator.dataset.status) return indicator.dataset.status === 'idle';
+        return true;
+    }""",
+)
+
+SHEETS_READY = ReadinessPredicate(
+    name="google-sheets",
+    expression="""() => {
+        if (!document.querySelector('#docs-menubar [role="menuitem"]')) return false;
+        const grid = document.querySelector('#waffle-grid-container');
+        if (!grid || grid.getBoundingClientRect().height === 0) return false;
+        return !!grid.querySelector('canvas, table');
+    }""",
+)
+
+DOCS_READY = ReadinessPredicate(
+    name="google-docs",
+    expression="""() => {
+        if (!document.querySelector('#docs-menubar [role="menuitem"]')) return false;
+        if (!document.querySelector('.kix-appview-editor')) return false;
+        const target = document.querySelector('.docs-texteventtarget-iframe');
+        const body = target && target.contentDocument && target.contentDocument.body;
+        return !!body && body.isContentEditable;
+    }""",
+)
+
+DOM_READY = ReadinessPredicate(
+    name="dom",
+    expression="() => document.readyState !== 'loading'",
+    wait_until="domcontentloaded",
+)
+
+# The registry mirrors PARSER_REGISTRY: (url_pattern, predicate), first match wins.
+READINESS_REGISTRY = [
+    (re.compile(r"https://docs\.google\.com/spreadsheets/"), SHEETS_READY),
+    (re.compile(r"https://docs\.google\.com/document/"), DOCS_READY),
+    (re.compile(r"/lab(/|\?|$)"), JUPYTERLAB_READY),
+]
+DEFAULT_READINESS = DOM_READY
+
+
+def get_readiness_for_url(url: str) -> ReadinessPredicate:
+    """Returns the readiness predicate registered for a URL."""
+    for url_pattern, predicate in READINESS_REGISTRY:
+        if url_pattern.search(url):
+            return predicate
+    return DEFAULT_READINESS
+
+
+async def wait_until_ready(page: Page, timeout: int = DEFAULT_READY_TIMEOUT_MS) -> bool:
+    """
+    Waits until the application on the page reports that it is usable.
+
+    Returns:
+        True if the predicate was satisfied, False if it timed out. A timeout is
+        logged rather than raised, since the page is usually still usable.
+    """
+    predicate = get_readiness_for_url(page.url)
+    deadline = time.monotonic() + timeout / 1000
+    started = time.monotonic()
+
+    while True:
+        remaining_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+        try:
+            await page.wait_for_function(predicate.expression, timeout=remaining_ms)
+            logger.info(f"Page ready ({predicate.name}) after {time.monotonic() - started:.2f}s: {page.url}")
+            return True
+        except PlaywrightTimeoutError:
+            logger.warning(f"Readiness predicate '{predicate.name}' timed out after {timeout}ms on {page.url}")
+            return False
+        except PlaywrightError as e:
+            # The document can be replaced while we wait (redirects, SPA boot); retry on the new one.
+            if "context was destroyed" not in str(e) or time.monotonic() >= deadline:
+                raise
+            predicate = get_readiness_for_url(page.url)
+
+
+async def goto_and_wait_until_ready(page: Page, url: str, timeout: int = DEFAULT_READY_TIMEOUT_MS) -> bool:
+    """
+    Navigates to `url` and returns as soon as the target application is usable.
+    `timeout` bounds the navigation and the readiness wait together.
+    """
+    predicate = get_readiness_for_url(url)
+    deadline = time.monotonic() + timeout / 1000
+    await page.goto(url, wait_until=predicate.wait_until, timeout=timeout)
+    remaining_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+    return await wait_until_ready(page, timeout=remaining_ms)
@@ -0,0 +1,238 @@
+# File: session-bubble/aurora_agent/screencast.py
+"""
+CDP screencast streaming of the active page.
+
+A lighter alternative to running Xvfb + openbox + x11vnc just to show the
+browser: Chromium (headless works) encodes JPEG frames of the page itself via
+`Page.startScreencast`, and we forward them to WebSocket clients.
+
+Flow control is driven by client acknowledgements. Chromium only produces
+more frames once we ack the ones it sent, so every received frame is queued
+for an ack and acked exactly once: a single pump acks the queue in order while
+the client has fewer than `max_in_flight` unacknowledged frames and the FPS cap
+allows it. Frames the client never acks are written off after
+LOST_FRAME_SECONDS (checked on a timer as well, so a silent client cannot
+stall the stream). JPEG quality follows the client's ack round-trip time: it
+drops quickly when the client falls behind and recovers slowly when it keeps up.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+from playwright.async_api import CDPSession, Page
+
+logger = logging.getLogger(__name__)
+
+# Ack round-trip thresholds (seconds) that drive quality changes.
+SLOW_ACK_SECONDS = 0.25
+FAST_ACK_SECONDS = 0.08
+QUALITY_STEP = 10
+FAST_FRAMES_BEFORE_UPGRADE = 30
+# Frames the client has not acked within this window are considered lost.
+LOST_FRAME_SECONDS = 2.0
+
+
+class ScreencastSession:
+    """Streams JPEG frames of one page to one client."""
+
+    def __init__(
+        self,
+        page: Page,
+        send: Callable[[str], Awaitable[None]],
+        max_fps: float = 15,
+        quality: int = 70,
+        min_quality: int = 30,
+        max_width: int = 1280,
+        max_height: int = 720,
+        max_in_flight: int = 2,
+    ):
+        self.page = page
+        self.send = send
+        self.max_fps = max_fps
+        self.max_quality = quality
+        self.min_quality = min_quality
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.max_in_flight = max_in_flight
+
+        self.cdp: Optional[CDPSession] = None
+        self.running = False
+        self.seq = 0
+        self.sent_at: Dict[int, float] = {}
+        self.fast_acks = 0
+        self.frames_sent = 0
+        self.frames_dropped = 0
+
+        self._last_ack_to_browser = 0.0
+        # CDP session ids of received frames, in arrival order, not acked to Chromium yet.
+        self._pending_acks: Deque[int] = deque()
+        # Newest frame withheld from a client that was behind; sent once it catches up.
+        self._held_frame: Optional[dict] = None
+        self._ack_wakeup = asyncio.Event()
+        self._ack_task: Optional[asyncio.Task] = None
+        self._restarting = False
+
+    async def start(self):
+        """Attaches to the page and starts the screencast."""
+        self.cdp = await self.page.context.new_cdp_session(self.page)
+        self.cdp.on("Page.screencastFrame", self._on_frame)
+        self.running = True
+        self._ack_task = asyncio.create_task(self._ack_pump())
+        await self._start_cdp_screencast()
+        logger.info(f"Screencast started on {self.page.url} (quality={self.quality}, max_fps={self.max_fps})")
+
+    async def _start_cdp_screencast(self):
+        await self.cdp.send("Page.startScreencast", {
+            "format": "jpeg",
+            "quality": self.quality,
+            "maxWidth": self.max_width,
+            "maxHeight": self.max_height,
+            "everyNthFrame": 1,
+        })
+
+    async def stop(self):
+        """Stops the screencast and detaches from the page."""
+        self.running = False
+        if self._ack_task and self._ack_task is not asyncio.current_task():
+            self._ack_task.cancel()
+        self._ack_task = None
+        # Acks only matter to the CDP session being torn down.
+        self._pending_acks.clear()
+        self._held_frame = None
+        if self.cdp:
+            try:
+                await self.cdp.send("Page.stopScreencast")
+                await self.cdp.detach()
+            except Exception as e:
+                logger.debug(f"Screencast CDP session already gone: {e}")
+            self.cdp = None
+        logger.info(f"Screencast stopped: {self.frames_sent} frames sent, {self.frames_dropped} dropped")
+
+    async def switch_page(self, page: Page):
+        """Follows the active tab: restarts the screencast on another page."""
+        if page is self.page:
+            return
+        await self.stop()
+        self.page = page
+        self.sent_at.clear()
+        await self.start()
+
+    async def _on_frame(self, params: dict):
+        if not self.running:
+            return
+        # Every frame is acked to Chromium exactly once, whether or not the client gets it.
+        self._pending_acks.append(params["sessionId"])
+        self._prune_lost_frames()
+        if len(self.sent_at) >= self.max_in_flight:
+            # Client is behind: keep only the newest frame until it catches up.
+            if self._held_frame is not None:
+                self.frames_dropped += 1
+            self._held_frame = params
+        else:
+            await self._send_frame(params)
+        self._ack_wakeup.set()
+
+    async def _send_frame(self, params: dict):
+        self.seq += 1
+        self.sent_at[self.seq] = time.monotonic()
+        metadata = params.get("metadata", {})
+        message = json.dumps({
+            "type": "frame",
+            "seq": self.seq,
+            "format": "jpeg",
+            "quality": self.quality,
+            "data": params["data"],  # Already base64 encoded by Chromium
+            "metadata": {
+                "width": metadata.get("deviceWidth"),
+                "height": metadata.get("deviceHeight"),
+                "timestamp": metadata.get("timestamp"),
+            },
+        })
+        try:
+            await self.send(message)
+            self.frames_sent += 1
+        except Exception as e:
+            logger.warning(f"Screencast client send failed, stopping: {e}")
+            await self.stop()
+
+    def _prune_lost_frames(self):
+        """Writes off frames the client has not acked within LOST_FRAME_SECONDS."""
+        now = time.monotonic()
+        for lost in [s for s, sent in self.sent_at.items() if now - sent > LOST_FRAME_SECONDS]:
+            self.sent_at.pop(lost)
+
+    async def _ack_pump(self):
+        """Acks queued frames to Chromium in order, as client room and the FPS cap allow."""
+        while self.running:
+            try:
+                # The timeout keeps pruning lost frames when neither Chromium nor the client sends anything.
+                await asyncio.wait_for(self._ack_wakeup.wait(), timeout=LOST_FRAME_SECONDS / 2)
+            except asyncio.TimeoutError:
+                pass
+            self._ack_wakeup.clear()
+            self._prune_lost_frames()
+
+            if self._held_frame is not None and len(self.sent_at) < self.max_in_flight:
+                held, self._held_frame = self._held_frame, None
+                await self._send_frame(held)
+
+            while self.running and self.cdp and self._pending_acks and len(self.sent_at) < self.max_in_flight:
+                delay = self._last_ack_to_browser + 1.0 / self.max_fps - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                session_id = self._pending_acks.popleft()
+                self._last_ack_to_browser = time.monotonic()
+                try:
+                    await self.cdp.send("Page.screencastFrameAck", {"sessionId": session_id})
+                except Exception as e:
+                    logger.debug(f"Could not ack screencast frame: {e}")
+
+    async def handle_client_ack(self, seq: int):
+        """Processes a `frame_ack` from the client and adapts quality to its latency."""
+        sent = self.sent_at.pop(seq, None)
+        # Anything older than the acked frame is implicitly acknowledged too.
+        for stale in [s for s in self.sent_at if s < seq]:
+            self.sent_at.pop(stale)
+        self._prune_lost_frames()
+        # Room for more frames: let the pump release the held frame and the queued acks.
+        self._ack_wakeup.set()
+        if sent is None:
+            return
+
+        await self._adapt_quality(time.monotonic() - sent)
+
+    async def _adapt_quality(self, ack_rtt: float):
+        new_quality = self.quality
+        if ack_rtt > SLOW_ACK_SECONDS:
+            self.fast_acks = 0
+            new_quality = max(self.min_quality, self.quality - QUALITY_STEP)
+        elif ack_rtt < FAST_ACK_SECONDS:
+            self.fast_acks += 1
+            if self.fast_acks >= FAST_FRAMES_BEFORE_UPGRADE:
+                self.fast_acks = 0
+                new_quality = min(self.max_quality, self.quality + QUALITY_STEP // 2)
+
+        if new_quality != self.quality and not self._restarting:
+            logger.info(f"Screencast quality {self.quality} -> {new_quality} (ack rtt {ack_rtt * 1000:.0f}ms)")
+            self.quality = new_quality
+            self._restarting = True
+            try:
+                # startScreencast is not re-entrant; restart it to apply the new quality.
+                await self.cdp.send("Page.stopScreencast")
+                await self._start_cdp_screencast()
+            finally:
+                self._restarting = False
+
+    async def handle_client_message(self, raw: str):
+        """Dispatches a control message from the client (`frame_ack`, `set_fps`)."""
+        message = json.loads(raw)
+        message_type = message.get("type")
+        if message_type == "frame_ack":
+            await self.handle_client_ack(int(message["seq"]))
+        elif message_type == "set_fps":
+            self.max_fps = max(1.0, float(message["fps"]))
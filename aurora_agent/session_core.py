@@ -0,0 +1,646 @@
+# File: session-bubble/aurora_agent/session_core.py
+# in aurora_agent/session_core.py
+"""
+Verification sessions: capture -> translate -> verify -> push.
+
+Each stage runs as its own task and hands work to the next through a bounded
+queue, so a burst of interactions applies backpressure instead of piling up
+model and API calls:
+
+1. Capture: a script in the teacher's Sheets tab reports raw interactions
+   (cell commits, toolbar/menu clicks) through an exposed binding. Clients can
+   also submit raw events over the session WebSocket.
+2. Translate: raw events are micro-batched per time window and each batch is
+   translated into candidate actions with a single model call.
+3. Verify: candidate actions are collected per window and checked with one
+   coalesced Sheets `values:batchGet` read per render option (typed values
+   against the formatted cell text, formulas against the formula).
+4. Push: verified actions are sent to the session WebSocket in one message
+   per verification batch.
+
+`VERIFICATION_BACKEND=local` swaps the model and the Sheets API for local
+stand-ins so the whole pipeline runs offline. The local reader serves a fixed
+grid loaded from VERIFICATION_LOCAL_GRID, never the submitted edits, so a
+wrong expected value still fails verification.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from . import llm_clients
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_BACKEND = os.getenv("VERIFICATION_BACKEND", "live")  # "live" or "local"
+# JSON file of {sheet: {cell: value}} served by the local backend
+LOCAL_GRID_PATH = os.getenv("VERIFICATION_LOCAL_GRID")
+TRANSLATION_MODEL = os.getenv("VERIFICATION_MODEL", "gemini-2.5-flash")
+
+BATCH_WINDOW_SECONDS = float(os.getenv("VERIFICATION_BATCH_WINDOW", "1.5"))
+MAX_BATCH_EVENTS = 50
+VERIFY_WINDOW_SECONDS = float(os.getenv("VERIFICATION_VERIFY_WINDOW", "0.5"))
+MAX_VERIFY_ACTIONS = 100
+RAW_QUEUE_SIZE = 1000
+TRANSLATE_QUEUE_SIZE = 20
+VERIFY_QUEUE_SIZE = 200
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+Sender = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_event_ids = itertools.count(1)
+
+CAPTURE_SCRIPT = """
+(() => {
+    if (window.__auroraCaptureInstalled) return;
+    window.__auroraCaptureInstalled = true;
+
+    const text = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? (el.value !== undefined ? el.value : el.textContent || '').trim() : '';
+    };
+    const context = () => ({
+        sheet: text('.docs-sheet-active-tab .docs-sheet-tab-name'),
+        cell: text('#t-name-box'),
+    });
+    const report = (payload) => {
+        if (!window.__auroraCapture) return;
+        window.__auroraCapture(Object.assign({timestamp: Date.now() / 1000}, context(), payload));
+    };
+
+    document.addEventListener('keydown', (e) => {
+        if (e.key !== 'Enter' && e.key !== 'Tab') return;
+        const editor = e.target.closest && e.target.closest('.cell-input, #t-formula-bar-input');
+        if (!editor) return;
+        // Read before the key commits the edit and moves the selection.
+        report({kind: 'edit', value: (editor.innerText || '').replace(/\\n$/, ''), key: e.key});
+    }, true);
+
+    document.addEventListener('click', (e) => {
+        const control = e.target.closest && e.target.closest('[role="button"], [role="menuitem"], [role="option"], [role="tab"]');
+        if (!control) return;
+        const label = control.getAttribute('aria-label') || control.getAttribute('data-tooltip') || (control.textContent || '').trim();
+        report({kind: 'click', target: label.slice(0, 120), role: control.getAttribute('role')});
+    }, true);
+})();
+"""
+
+
+@dataclass
+class RawEvent:
+    kind: str  # "edit" or "click"
+    timestamp: float
+    sheet: str = ""
+    cell: str = ""
+    value: Optional[str] = None
+    target: Optional[str] = None
+    id: int = field(default_factory=lambda: next(_event_ids))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RawEvent":
+        return cls(
+            kind=data.get("kind", "edit"),
+            timestamp=float(data.get("timestamp") or time.time()),
+            sheet=data.get("sheet") or "",
+            cell=(data.get("cell") or "").upper(),
+            value=data.get("value"),
+            target=data.get("target"),
+        )
+
+
+@dataclass
+class CandidateAction:
+    action_type: str  # "edit_cell", "enter_formula" or "ui_action"
+    description: str
+    sheet: str = ""
+    cell: str = ""
+    expected_value: Optional[str] = None
+    event_ids: List[int] = field(default_factory=list)
+
+    @property
+    def verifiable(self) -> bool:
+        return self.expected_value is not None and parse_a1(self.cell) is not None
+
+
+@dataclass
+class VerifiedAction:
+    action: CandidateAction
+    # True/False once checked against the sheet, None when the action has no checkable cell value.
+    verified: Optional[bool]
+    actual_value: Optional[str] = None
+    verified_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self.action)
+        data.update(verified=self.verified, actual_value=self.actual_value, verified_at=self.verified_at)
+        return data
+
+
+# --- A1 notation helpers ---
+
+_A1_PATTERN = re.compile(r"^\$?([A-Z]+)\$?(\d+)$")
+
+
+def parse_a1(cell: str) -> Optional[Tuple[int, int]]:
+    """'B12' -> (1, 11): zero-based column and row, or None if not a single cell."""
+    match = _A1_PATTERN.match(cell.upper())
+    if not match:
+        return None
+    column = 0
+    for char in match.group(1):
+        column = column * 26 + ord(char) - ord("A") + 1
+    return column - 1, int(match.group(2)) - 1
+
+
+def to_a1(column: int, row: int) -> str:
+    letters = ""
+    column += 1
+    while column:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return f"{letters}{row + 1}"
+
+
+def quote_sheet(sheet: str) -> str:
+    return "'" + sheet.replace("'", "''") + "'" if sheet else ""
+
+
+def _bounding_box(positions) -> Tuple[int, int, int, int]:
+    columns = [column for column, _ in positions]
+    rows = [row for _, row in positions]
+    return min(columns), min(rows), max(columns), max(rows)
+
+
+def _is_dense(positions) -> bool:
+    left, top, right, bottom = _bounding_box(positions)
+    return (right - left + 1) * (bottom - top + 1) <= 4 * len(positions)
+
+
+def coalesce_ranges(cells: List[Tuple[str, str]]) -> List[Tuple[str, str, Tuple[int, int]]]:
+    """
+    Groups (sheet, cell) pairs into as few A1 ranges as is reasonable. Cells on
+    a sheet are read as one bounding box when it is dense enough, otherwise per
+    column (edits usually run down a column), and stray cells individually.
+
+    Returns:
+        (a1_range, sheet, (origin_column, origin_row)) for each range to read.
+    """
+    by_sheet: Dict[str, set] = {}
+    for sheet, cell in cells:
+        position = parse_a1(cell)
+        if position:
+            by_sheet.setdefault(sheet, set()).add(position)
+
+    ranges = []
+    for sheet, positions in by_sheet.items():
+        prefix = f"{quote_sheet(sheet)}!" if sheet else ""
+        if _is_dense(positions):
+            groups = [positions]
+        else:
+            by_column: Dict[int, set] = {}
+            for position in positions:
+                by_column.setdefault(position[0], set()).add(position)
+            groups = []
+            for column_positions in by_column.values():
+                if _is_dense(column_positions):
+                    groups.append(column_positions)
+                else:
+                    groups.extend({position} for position in column_positions)
+
+        for group in sorted(groups, key=min):
+            left, top, right, bottom = _bounding_box(group)
+            a1_range = to_a1(left, top) if len(group) == 1 else f"{to_a1(left, top)}:{to_a1(right, bottom)}"
+            ranges.append((f"{prefix}{a1_range}", sheet, (left, top)))
+    return ranges
+
+
+# --- Translation backends ---
+
+class LocalActionTranslator:
+    """
+    Offline stand-in for the model: the last committed value per cell becomes
+    an edit (or formula) action and each control click a UI action.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def translate(self, batch: List[RawEvent]) -> List[CandidateAction]:
+        self.calls += 1
+        actions: List[CandidateAction] = []
+        edits: Dict[Tuple[str, str], CandidateAction] = {}
+        for event in batch:
+            if event.kind == "edit" and event.cell:
+                value = event.value or ""
+                key = (event.sheet, event.cell)
+                if key in edits:
+                    edits[key].expected_value = value
+                    edits[key].event_ids.append(event.id)
+                    continue
+                is_formula = value.startswith("=")
+                edits[key] = CandidateAction(
+                    action_type="enter_formula" if is_formula else "edit_cell",
+                    description=f"{'Entered formula' if is_formula else 'Typed'} {value!r} in {event.cell}",
+                    sheet=event.sheet,
+                    cell=event.cell,
+                    expected_value=value,
+                    event_ids=[event.id],
+                )
+                actions.append(edits[key])
+            elif event.kind == "click" and event.target:
+                actions.append(CandidateAction(
+                    action_type="ui_action", description=f"Clicked {event.target}", sheet=event.sheet, event_ids=[event.id],
+                ))
+        return actions
+
+
+class GeminiActionTranslator:
+    """Translates a whole batch of raw events with one model call."""
+
+    PROMPT = (
+        "You turn raw Google Sheets interaction events into the meaningful actions a teacher performed.\n"
+        "Return a JSON list; each item has: action_type (edit_cell, enter_formula or ui_action), "
+        "description, sheet, cell (A1, empty for ui_action), expected_value (the final cell content, "
+        "null for ui_action) and event_ids (ids of the raw events it came from). "
+        "Merge events that belong to the same action. The events are sent as a JSON list."
+    )
+
+    def __init__(self, model_name: str = TRANSLATION_MODEL):
+        self.model_name = model_name
+        self.fallback = LocalActionTranslator()
+        self.calls = 0
+
+    async def translate(self, batch: List[RawEvent]) -> List[CandidateAction]:
+        self.calls += 1
+        events = [asdict(event) for event in batch]
+        try:
+            response = await llm_clients.generate(
+                self.model_name, json.dumps(events, default=str), system_instruction=self.PROMPT,
+                purpose="translation", generation_config={"response_mime_type": "application/json"},
+            )
+            items = json.loads(response.text)
+            return [
+                CandidateAction(
+                    action_type=item.get("action_type", "ui_action"),
+                    description=item.get("description", ""),
+                    sheet=item.get("sheet") or "",
+                    cell=(item.get("cell") or "").upper(),
+                    expected_value=item.get("expected_value"),
+                    event_ids=list(item.get("event_ids") or []),
+                )
+                for item in items if isinstance(item, dict)
+            ]
+        except Exception as e:
+            logger.warning(f"Model translation failed for a batch of {len(batch)} events, using heuristics: {e}")
+            return await self.fallback.translate(batch)
+
+
+# --- Sheets backends ---
+
+class LocalSheetsReader:
+    """
+    Offline stand-in for the Sheets API. It serves batched reads from a fixed
+    grid, e.g. the known end state of a recorded exercise, and deliberately
+    never learns from the events under verification.
+    """
+
+    def __init__(self, grid: Optional[Dict[str, Dict[str, str]]] = None):
+        self.grid: Dict[str, Dict[str, str]] = grid or {}
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: Optional[str]) -> "LocalSheetsReader":
+        """Loads a {sheet: {cell: value}} JSON grid; no path gives an empty sheet."""
+        if not path:
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
+
+    async def batch_get(self, spreadsheet_id: str, ranges: List[Tuple[str, str, Tuple[int, int]]],
+                        value_render_option: str = "FORMATTED_VALUE") -> Dict[str, List[List[str]]]:
+        # The fixture holds one value per cell, served for both render options.
+        self.calls += 1
+        result = {}
+        for a1_range, sheet, (left, top) in ranges:
+            cells = a1_range.split("!")[-1].split(":")
+            right, bottom = parse_a1(cells[-1])
+            values = self.grid.get(sheet, {})
+            result[a1_range] = [
+                [values.get(to_a1(column, row), "") for column in range(left, right + 1)]
+                for row in range(top, bottom + 1)
+            ]
+        return result
+
+
+class GoogleSheetsReader:
+    """Reads all ranges of a verification batch with one `values:batchGet` request."""
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.calls = 0
+
+    async def batch_get(self, spreadsheet_id: str, ranges: List[Tuple[str, str, Tuple[int, int]]],
+                        value_render_option: str = "FORMATTED_VALUE") -> Dict[str, List[List[str]]]:
+        """
+        `value_render_option` is FORMATTED_VALUE (the text the cell shows, e.g. "50%"
+        or "1,000") or FORMULA (formulas for formula cells, raw values for the rest).
+        """
+        import aiohttp
+        from .auth import get_valid_access_token
+        from .database import AsyncSessionLocal
+
+        self.calls += 1
+        async with AsyncSessionLocal() as db:
+            token = await get_valid_access_token(db, self.user_id)
+        if not token:
+            raise Exception(f"No valid Google access token for {self.user_id}")
+
+        query = "&".join(f"ranges={quote(a1_range)}" for a1_range, _, _ in ranges)
+        url = f"{SHEETS_API_URL}/{spreadsheet_id}/values:batchGet?{query}&valueRenderOption={value_render_option}"
+        async with aiohttp.ClientSession() as session:
+            async with session.get(
+                url, headers={"Authorization": f"Bearer {token}"}, timeout=aiohttp.ClientTimeout(total=15)
+            ) as response:
+                if response.status != 200:
+                    raise Exception(f"Sheets batchGet returned {response.status}: {await response.text()}")
+                payload = await response.json()
+
+        value_ranges = payload.get("valueRanges", [])
+        return {a1_range: value_range.get("values", []) for (a1_range, _, _), value_range in zip(ranges, value_ranges)}
+
+
+def _read_cell(values: List[List[Any]], origin: Tuple[int, int], position: Tuple[int, int]) -> str:
+    row = position[1] - origin[1]
+    column = position[0] - origin[0]
+    if row < len(values) and column < len(values[row]):
+        return str(values[row][column])
+    return ""
+
+
+_NUMBER_DECORATIONS = re.compile(r"[,\s$€£¥]")
+
+
+def _as_number(text: str) -> Optional[float]:
+    """Reads "1,000", "$12.50" or "50%" as a number, or None for anything else."""
+    text = _NUMBER_DECORATIONS.sub("", text)
+    scale = 1.0
+    if text.endswith("%"):
+        text, scale = text[:-1], 0.01
+    try:
+        return float(text) * scale
+    except ValueError:
+        return None
+
+
+def values_match(actual: str, expected: str, formula: bool = False) -> bool:
+    """
+    Whether a cell read back from Sheets holds what the teacher entered. Formulas
+    compare case- and whitespace-insensitively (Sheets upper-cases function names);
+    values compare as text, or as numbers when the cell format added separators.
+    """
+    actual, expected = actual.strip(), expected.strip()
+    if formula:
+        return "".join(actual.split()).upper() == "".join(expected.split()).upper()
+    if actual == expected:
+        return True
+    actual_number, expected_number = _as_number(actual), _as_number(expected)
+    return actual_number is not None and expected_number is not None \
+        and abs(actual_number - expected_number) <= 1e-9 * max(1.0, abs(expected_number))
+
+
+def spreadsheet_id_from_url(url: str) -> Optional[str]:
+    match = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", url)
+    return match.group(1) if match else None
+
+
+# --- The session ---
+
+class VerificationSession:
+    """One teacher's capture -> translate -> verify -> push pipeline."""
+
+    def __init__(self, user_id: str, websocket=None, send: Optional[Sender] = None,
+                 translator=None, sheets_reader=None, capture: Optional[bool] = None):
+        local = VERIFICATION_BACKEND == "local"
+        self.user_id = user_id
+        self.websocket = websocket
+        self.send: Optional[Sender] = send or (websocket.send_json if websocket else None)
+        self.translator = translator or (LocalActionTranslator() if local else GeminiActionTranslator())
+        self.sheets_reader = sheets_reader or (LocalSheetsReader.from_file(LOCAL_GRID_PATH) if local else GoogleSheetsReader(user_id))
+        # Browser capture is off for the offline backend; events then come from the client.
+        self.capture = (not local) if capture is None else capture
+
+        self.active = False
+        self.spreadsheet_url: Optional[str] = None
+        self.spreadsheet_id: Optional[str] = None
+        self.page = None
+        self.raw_queue: asyncio.Queue = asyncio.Queue(maxsize=RAW_QUEUE_SIZE)
+        self.translate_queue: asyncio.Queue = asyncio.Queue(maxsize=TRANSLATE_QUEUE_SIZE)
+        self.verify_queue: asyncio.Queue = asyncio.Queue(maxsize=VERIFY_QUEUE_SIZE)
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {
+            "raw_events": 0, "raw_dropped": 0, "batches": 0, "candidate_actions": 0,
+            "verified": 0, "failed": 0, "unverifiable": 0, "sheet_reads": 0,
+        }
+
+    async def start_session(self, spreadsheet_url: str) -> Dict[str, Any]:
+        if self.active:
+            return {"success": True, "message": "Session already running"}
+        self.spreadsheet_url = spreadsheet_url
+        self.spreadsheet_id = spreadsheet_id_from_url(spreadsheet_url)
+        if not self.spreadsheet_id:
+            return {"success": False, "message": f"Not a Google Sheets URL: {spreadsheet_url}"}
+
+        if self.capture:
+            try:
+                await self._start_capture(spreadsheet_url)
+            except Exception as e:
+                logger.error(f"Could not start browser capture for {self.user_id}: {e}", exc_info=True)
+                return {"success": False, "message": f"Browser capture failed: {e}"}
+
+        self.active = True
+        self._tasks = [
+            asyncio.create_task(self._batch_stage(), name=f"verification-batch-{self.user_id}"),
+            asyncio.create_task(self._translate_stage(), name=f"verification-translate-{self.user_id}"),
+            asyncio.create_task(self._verify_stage(), name=f"verification-verify-{self.user_id}"),
+        ]
+        logger.info(f"Verification session started for {self.user_id} on {self.spreadsheet_id}")
+        return {"success": True, "message": "Session started", "capture": self.capture}
+
+    async def _start_capture(self, spreadsheet_url: str):
+        from .browser_manager import browser_manager
+
+        await browser_manager.start_browser()
+        self.page = await browser_manager.get_page(spreadsheet_url)
+        await self.page.expose_binding("__auroraCapture", lambda source, data: self.submit_raw_event(data))
+        await self.page.add_init_script(CAPTURE_SCRIPT)
+        await self.page.evaluate(CAPTURE_SCRIPT)
+
+    async def stop_session(self) -> Dict[str, Any]:
+        self.active = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.page:
+            await self._stop_capture()
+        logger.info(f"Verification session stopped for {self.user_id}: {self.stats}")
+        return {"success": True, "message": "Session stopped", "stats": dict(self.stats)}
+
+    async def _stop_capture(self):
+        from .browser_manager import browser_manager
+
+        page, self.page = self.page, None
+        if browser_manager.page is page:
+            browser_manager.page = None
+        try:
+            await page.close()
+        except Exception as e:
+            logger.debug(f"Capture page for {self.user_id} already closed: {e}")
+
+    async def get_session_status(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "user_id": self.user_id,
+            "spreadsheet_id": self.spreadsheet_id,
+            "capture": self.capture,
+            "queues": {
+                "raw": self.raw_queue.qsize(),
+                "translate": self.translate_queue.qsize(),
+                "verify": self.verify_queue.qsize(),
+            },
+            "stats": dict(self.stats),
+        }
+
+    def submit_raw_event(self, data: Dict[str, Any]) -> bool:
+        """Stage 1 entry point. Drops the oldest raw event when the pipeline is saturated."""
+        if not self.active:
+            return False
+        event = RawEvent.from_dict(data)
+        if self.raw_queue.full():
+            self.raw_queue.get_nowait()
+            self.stats["raw_dropped"] += 1
+        self.raw_queue.put_nowait(event)
+        self.stats["raw_events"] += 1
+        return True
+
+    @staticmethod
+    async def _collect(queue: asyncio.Queue, window: float, limit: int) -> list:
+        """Waits for one item, then gathers more until the window closes or the batch is full."""
+        items = [await queue.get()]
+        deadline = time.monotonic() + window
+        while len(items) < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _batch_stage(self):
+        while True:
+            batch = await self._collect(self.raw_queue, BATCH_WINDOW_SECONDS, MAX_BATCH_EVENTS)
+            self.stats["batches"] += 1
+            await self.translate_queue.put(batch)  # Blocks when translation is behind
+
+    async def _translate_stage(self):
+        while True:
+            batch = await self.translate_queue.get()
+            try:
+                actions = await self.translator.translate(batch)
+            except Exception as e:
+                logger.error(f"Translation failed for {self.user_id}: {e}", exc_info=True)
+                continue
+            self.stats["candidate_actions"] += len(actions)
+            for action in actions:
+                await self.verify_queue.put(action)
+
+    async def _verify_stage(self):
+        while True:
+            actions = await self._collect(self.verify_queue, VERIFY_WINDOW_SECONDS, MAX_VERIFY_ACTIONS)
+            try:
+                results = await self.verify_batch(actions)
+            except Exception as e:
+                logger.error(f"Verification failed for {self.user_id}: {e}", exc_info=True)
+                results = [VerifiedAction(action, verified=None) for action in actions]
+            await self._push(results)
+
+    async def verify_batch(self, actions: List[CandidateAction]) -> List[VerifiedAction]:
+        """Checks every verifiable action of a batch with one coalesced read per render option."""
+        checkable = [action for action in actions if action.verifiable]
+        formulas = await self._read_cells([a for a in checkable if a.action_type == "enter_formula"], "FORMULA")
+        values = await self._read_cells([a for a in checkable if a.action_type != "enter_formula"], "FORMATTED_VALUE")
+
+        results = []
+        for action in actions:
+            if not action.verifiable:
+                results.append(VerifiedAction(action, verified=None))
+                self.stats["unverifiable"] += 1
+                continue
+            formula = action.action_type == "enter_formula"
+            actual = (formulas if formula else values).get((action.sheet, action.cell))
+            verified = actual is not None and values_match(actual, action.expected_value or "", formula=formula)
+            self.stats["verified" if verified else "failed"] += 1
+            results.append(VerifiedAction(action, verified=verified, actual_value=actual))
+        return results
+
+    async def _read_cells(self, actions: List[CandidateAction], value_render_option: str) -> Dict[Tuple[str, str], str]:
+        """Reads the cells of `actions` with a single batchGet; returns (sheet, cell) -> text."""
+        ranges = coalesce_ranges([(action.sheet, action.cell) for action in actions])
+        if not ranges:
+            return {}
+        values_by_range = await self.sheets_reader.batch_get(self.spreadsheet_id, ranges, value_render_option=value_render_option)
+        self.stats["sheet_reads"] += 1
+
+        cells = {}
+        for action in actions:
+            position = parse_a1(action.cell)
+            for a1_range, sheet, origin in ranges:
+                if sheet != action.sheet:
+                    continue
+                end = parse_a1(a1_range.split("!")[-1].split(":")[-1])
+                if origin[0] <= position[0] <= end[0] and origin[1] <= position[1] <= end[1]:
+                    cells[(action.sheet, action.cell)] = _read_cell(values_by_range.get(a1_range, []), origin, position)
+                    break
+        return cells
+
+    async def _push(self, results: List[VerifiedAction]):
+        if not results or not self.send:
+            return
+        try:
+            await self.send({
+                "type": "VERIFIED_ACTIONS",
+                "user_id": self.user_id,
+                "actions": [result.to_dict() for result in results],
+            })
+        except Exception as e:
+            logger.warning(f"Could not push verified actions to {self.user_id}: {e}")
+
+
+active_sessions: Dict[str, VerificationSession] = {}
+
+
+async def get_or_create_session(user_id: str, websocket) -> VerificationSession:
+    session = active_sessions.get(user_id)
+    if session is None:
+        session = VerificationSession(user_id, websocket)
+        active_sessions[user_id] = session
+    else:
+        # Reconnect: results go to the newest socket
+        session.websocket = websocket
+        session.send = websocket.send_json
+    return session
+
+
+async def cleanup_session(user_id: str):
+    session = active_sessions.pop(user_id, None)
+    if session and session.active:
+        await session.stop_session()
@@ -0,0 +1,296 @@
+# File: session-bubble/aurora_agent/spatial_index.py
+# in aurora_agent/spatial_index.py
+"""
+Cached spatial index of on-screen elements.
+
+Coordinate lookups ("which cell is at this point", "what is near this
+region") used to evaluate `elementFromPoint` and `closest()` in the page for
+every query. The index instead keeps the bounds of the elements of a few
+named layers (notebook cells, interactive controls) in a uniform grid in
+Python, so queries are answered without a browser round trip.
+
+Bounds are stored in page coordinates, so scrolling the window only moves the
+viewport origin. The page notifies Python through a binding the first time
+something invalidates the index after a refresh: a window scroll, a resize,
+a scroll inside an inner container, or a DOM mutation. The next query then
+refreshes with one evaluation (only the scroll offset when the window merely
+scrolled). While nothing changes, queries never touch the browser.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+SPATIAL_GRID_CELL_SIZE = int(os.getenv("SPATIAL_GRID_CELL_SIZE", "128"))
+MAX_SPATIAL_ELEMENTS = 2000
+BINDING_NAME = "__auroraSpatialDirty"
+
+
+@dataclass(frozen=True)
+class SpatialLayer:
+    """A named set of elements to index, with extra fields read from each element."""
+    name: str
+    selector: str
+    # JavaScript expression over `el` that returns the record's extra JSON fields
+    fields: str = "({})"
+
+
+JUPYTER_CELLS = SpatialLayer(
+    name="jupyter-cells",
+    selector=".jp-Notebook .jp-Cell",
+    fields="""({
+        type: el.classList.contains('jp-MarkdownCell') ? 'markdown' : 'code',
+        execution_count: (() => {
+            const prompt = el.querySelector('.jp-InputPrompt');
+            const match = prompt && prompt.textContent.match(/\\[(\\d+)\\]/);
+            return match ? parseInt(match[1]) : null;
+        })(),
+        window_index: el.getAttribute('data-windowed-list-index'),
+        has_output: !!el.querySelector('.jp-Cell-outputArea .jp-OutputArea-child'),
+        active: el.classList.contains('jp-mod-active'),
+    })""",
+)
+
+INTERACTIVE_CONTROLS = SpatialLayer(
+    name="controls",
+    selector="button, a[href], input:not([type='hidden']), textarea, select, "
+             "[role='button'], [role='link'], [role='menuitem'], [role='tab'], [role='checkbox'], [role='option']",
+    fields="""({
+        role: el.getAttribute('role') || el.tagName.toLowerCase(),
+        name: (el.getAttribute('aria-label') || el.getAttribute('title') || el.innerText || el.value || '')
+            .replace(/\\s+/g, ' ').trim().slice(0, 100),
+    })""",
+)
+
+DEFAULT_LAYERS = (JUPYTER_CELLS, INTERACTIVE_CONTROLS)
+
+# Installed on every document of the page. Calls the binding once per
+# invalidation; `layout` means bounds changed, otherwise only the window scrolled.
+OBSERVER_SCRIPT = r"""
+(() => {
+    if (window.__auroraSpatial) return;
+    const state = window.__auroraSpatial = {dirty: true, layout: true};
+    const notify = (layout) => {
+        state.layout = state.layout || layout;
+        if (state.dirty) return;
+        state.dirty = true;
+        if (window.""" + BINDING_NAME + r""") window.""" + BINDING_NAME + r"""({layout});
+    };
+    const start = () => new MutationObserver(() => notify(true)).observe(document.documentElement, {
+        subtree: true, childList: true, characterData: true, attributes: true,
+        attributeFilter: ['class', 'style', 'hidden', 'aria-label', 'role'],
+    });
+    if (document.documentElement) start(); else document.addEventListener('DOMContentLoaded', start);
+    addEventListener('scroll', (e) => notify(e.target !== document), {capture: true, passive: true});
+    addEventListener('resize', () => notify(true), {passive: true});
+})()
+"""
+
+# Arguments: [layers, maxElements, full]; layers are [{name, selector}]. The
+# observer (for documents that predate the init script) and the layers' field
+# extractors are spliced in by PageSpatialIndex.
+REFRESH_TEMPLATE = r"""
+([layers, maxElements, full]) => {
+    /*OBSERVER*/;
+    const state = window.__auroraSpatial;
+    const result = {scroll_x: scrollX, scroll_y: scrollY, viewport: [innerWidth, innerHeight], full: full || state.layout};
+    if (result.full) {
+        result.items = [];
+        const extractors = [/*FIELDS*/];
+        layers.forEach((layer, i) => {
+            for (const el of document.querySelectorAll(layer.selector)) {
+                if (result.items.length >= maxElements) break;
+                const rect = el.getBoundingClientRect();
+                if (rect.width === 0 || rect.height === 0) continue;
+                result.items.push(Object.assign(extractors[i](el), {
+                    layer: layer.name,
+                    bounds: [rect.x + scrollX, rect.y + scrollY, rect.width, rect.height],
+                }));
+            }
+        });
+    }
+    state.dirty = false;
+    state.layout = false;
+    return result;
+}
+"""
+
+Bounds = Tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """A uniform grid over item bounds; each item is bucketed in every cell it overlaps."""
+
+    def __init__(self, items: Sequence[Dict[str, Any]], cell_size: int = SPATIAL_GRID_CELL_SIZE):
+        self.items = list(items)
+        self.cell_size = cell_size
+        self.buckets: Dict[Tuple[int, int], List[int]] = {}
+        for i, item in enumerate(self.items):
+            for key in self._cells(item["bounds"]):
+                self.buckets.setdefault(key, []).append(i)
+
+    def _cells(self, bounds: Bounds) -> Iterable[Tuple[int, int]]:
+        x, y, width, height = bounds
+        size = self.cell_size
+        for cx in range(math.floor(x / size), math.floor((x + width) / size) + 1):
+            for cy in range(math.floor(y / size), math.floor((y + height) / size) + 1):
+                yield cx, cy
+
+    def at(self, x: float, y: float, layer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items containing the point, innermost (smallest) first."""
+        key = (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+        hits = []
+        for i in self.buckets.get(key, ()):
+            item = self.items[i]
+            bx, by, width, height = item["bounds"]
+            if (layer is None or item["layer"] == layer) and bx <= x <= bx + width and by <= y <= by + height:
+                hits.append(item)
+        return sorted(hits, key=lambda item: item["bounds"][2] * item["bounds"][3])
+
+    def near(self, region: Bounds, radius: float = 0, layer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items within `radius` of the region, closest first."""
+        x, y, width, height = region
+        search = (x - radius, y - radius, width + 2 * radius, height + 2 * radius)
+        seen, hits = set(), []
+        for key in self._cells(search):
+            for i in self.buckets.get(key, ()):
+                if i in seen:
+                    continue
+                seen.add(i)
+                item = self.items[i]
+                distance = _distance(item["bounds"], region)
+                if (layer is None or item["layer"] == layer) and distance <= radius:
+                    hits.append((distance, i, item))
+        return [item for _, _, item in sorted(hits, key=lambda hit: hit[:2])]
+
+
+def _distance(a: Bounds, b: Bounds) -> float:
+    """Gap between two rectangles (0 when they overlap)."""
+    dx = max(b[0] - (a[0] + a[2]), a[0] - (b[0] + b[2]), 0)
+    dy = max(b[1] - (a[1] + a[3]), a[1] - (b[1] + b[3]), 0)
+    return math.hypot(dx, dy)
+
+
+class PageSpatialIndex:
+    """The spatial index of one page, refreshed only after the page reports a change."""
+
+    def __init__(self, page: Page, layers: Sequence[SpatialLayer]):
+        # Weak, so the index (and the binding that calls into it) does not keep the page alive
+        self._page = weakref.ref(page)
+        self.layers = list(layers)
+        self.grid = SpatialGrid([])
+        self.scroll = (0.0, 0.0)
+        self.viewport = (0, 0)
+        self.dirty = True
+        self.layout_dirty = True
+        self.refreshes = 0
+        self.lock = asyncio.Lock()
+        self._installed = False
+        self._script = REFRESH_TEMPLATE.replace("/*OBSERVER*/", OBSERVER_SCRIPT.strip()).replace(
+            "/*FIELDS*/", ", ".join(f"(el) => ({layer.fields})" for layer in self.layers)
+        )
+
+    @property
+    def page(self) -> Page:
+        page = self._page()
+        if page is None:
+            raise RuntimeError("The page of this spatial index no longer exists")
+        return page
+
+    def _on_change(self, source, payload: Dict[str, Any]):
+        self.dirty = True
+        self.layout_dirty = self.layout_dirty or bool(payload.get("layout"))
+
+    def _on_navigated(self, frame):
+        page = self._page()
+        if page is not None and frame == page.main_frame:
+            self.dirty = self.layout_dirty = True
+
+    async def _install(self):
+        page = self.page
+        await page.expose_binding(BINDING_NAME, self._on_change)
+        await page.add_init_script(OBSERVER_SCRIPT)
+        page.on("framenavigated", self._on_navigated)
+        self._installed = True
+
+    async def ensure_fresh(self):
+        if not self.dirty:
+            return
+        async with self.lock:
+            if not self.dirty:
+                return
+            if not self._installed:
+                await self._install()
+            started = time.perf_counter()
+            # Clear first: a change reported during the evaluation must trigger another refresh
+            full, self.dirty, self.layout_dirty = self.layout_dirty, False, False
+            try:
+                result = await self.page.evaluate(
+                    self._script, [[{"name": l.name, "selector": l.selector} for l in self.layers], MAX_SPATIAL_ELEMENTS, full]
+                )
+            except Exception:
+                self.dirty = self.layout_dirty = True
+                raise
+            self.scroll = (result["scroll_x"], result["scroll_y"])
+            self.viewport = tuple(result["viewport"])
+            if result["full"]:
+                self.grid = SpatialGrid(result["items"])
+            self.refreshes += 1
+            logger.info(
+                f"Spatial index {'rebuilt' if result['full'] else 'scrolled'}: {len(self.grid.items)} elements "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+            )
+
+    def to_page(self, x: float, y: float) -> Tuple[float, float]:
+        return x + self.scroll[0], y + self.scroll[1]
+
+    def at(self, x: float, y: float, layer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items at viewport point (x, y), innermost first."""
+        return self.grid.at(*self.to_page(x, y), layer=layer)
+
+    def near(self, region: Bounds, radius: float = 0, layer: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items within `radius` of a viewport region (x, y, width, height), closest first."""
+        x, y = self.to_page(region[0], region[1])
+        return self.grid.near((x, y, region[2], region[3]), radius, layer=layer)
+
+
+class SpatialIndex:
+    """Keeps one PageSpatialIndex per open page."""
+
+    def __init__(self, layers: Sequence[SpatialLayer] = DEFAULT_LAYERS):
+        self.layers = layers
+        self._pages: "weakref.WeakKeyDictionary[Page, PageSpatialIndex]" = weakref.WeakKeyDictionary()
+
+    async def for_page(self, page: Page) -> PageSpatialIndex:
+        index = self._pages.get(page)
+        if index is None:
+            index = self._pages[page] = PageSpatialIndex(page, self.layers)
+            page.on("close", self._forget)
+        await index.ensure_fresh()
+        return index
+
+    def _forget(self, page: Page):
+        self._pages.pop(page, None)
+
+    async def element_at(self, page: Page, x: float, y: float, layer: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The innermost indexed element at viewport point (x, y), or None."""
+        hits = (await self.for_page(page)).at(x, y, layer)
+        return hits[0] if hits else None
+
+    async def elements_near(
+        self, page: Page, region: Bounds, radius: float = 0, layer: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Indexed elements within `radius` of a viewport region, closest first."""
+        return (await self.for_page(page)).near(region, radius, layer)
+
+
+# Global instance
+spatial_index = SpatialIndex()
@@ -5,9 +5,14 @@
 import logging
 import asyncio
 from ...browser_manager import browser_manager
+from ...ui_tools.overlay_runtime import annotate_locator, clear as clear_overlay, move_cursor
+from ...spatial_index import JUPYTER_CELLS, spatial_index
 
 logger = logging.getLogger(__name__)
 
+# Pixels from a cell within which a position still counts as pointing at it
+CELL_SNAP_RADIUS = 40
+
 async def annotate_and_click_cell_n(cell_execution_count: int, annotation_color: str = "red", annotation_text: str = None) -> str:
     """
     Finds a Jupyter cell, highlights it with annotation, and makes it active.
@@ -30,56 +35,9 @@ async def annotate_and_click_cell_n(cell_execution_count: int, annotation_color:
         # Get the cell container
         cell_container = prompt_locator.locator("xpath=ancestor::div[contains(@class, 'jp-CodeCell')]").first
         
-        # Scroll the cell into view if needed
-        await cell_container.scroll_into_view_if_needed()
-        await asyncio.sleep(0.5)  # Brief pause for smooth scrolling
-        
-        # Add visual annotation using CSS injection
-        annotation_style = f"""
-        border: 3px solid {annotation_color} !important;
-        box-shadow: 0 0 10px {annotation_color} !important;
-        background-color: {annotation_color}10 !important;
-        transition: all 0.3s ease !important;
-        """
-        
-        # Apply the annotation style
-        await page.evaluate(f"""
-        (element) => {{
-            element.style.cssText += `{annotation_style}`;
-            element.setAttribute('data-teacher-annotation', 'true');
-            element.setAttribute('data-annotation-color', '{annotation_color}');
-        }}
-        """, await cell_container.element_handle())
-        
-        # Add text annotation if provided
-        if annotation_text:
-            await page.evaluate(f"""
-            (element) => {{
-                // Remove existing annotation if present
-                const existingAnnotation = element.querySelector('.teacher-annotation-text');
-                if (existingAnnotation) existingAnnotation.remove();
-                
-                // Create new annotation
-                const annotation = document.createElement('div');
-                annotation.className = 'teacher-annotation-text';
-                annotation.style.cssText = `
-                    position: absolute;
-                    top: -25px;
-                    left: 0;
-                    background: {annotation_color};
-                    color: white;
-                    padding: 4px 8px;
-                    border-radius: 4px;
-                    font-size: 12px;
-                    font-weight: bold;
-                    z-index: 1000;
-                    box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-                `;
-                annotation.textContent = `{annotation_text}`;
-                element.style.position = 'relative';
-                element.appendChild(annotation);
-            }}
-            """, await cell_container.element_handle())
+        # One overlay command scrolls the cell into view and (re-)applies the annotation.
+        # Re-annotating replaces the previous color and label instead of stacking styles.
+        await annotate_locator(cell_container, annotation_color, annotation_text)
         
         # Click the input area to make the cell active
         input_area = cell_container.locator(".jp-Cell-inputWrapper .cm-content")
@@ -100,23 +58,7 @@ async def clear_all_annotations() -> str:
     if not page: return "Error: Browser not available."
     
     try:
-        await page.evaluate("""
-        () => {
-            // Remove all annotation styles
-            const annotatedCells = document.querySelectorAll('[data-teacher-annotation="true"]');
-            annotatedCells.forEach(cell => {
-                cell.style.border = '';
-                cell.style.boxShadow = '';
-                cell.style.backgroundColor = '';
-                cell.removeAttribute('data-teacher-annotation');
-                cell.removeAttribute('data-annotation-color');
-                
-                // Remove text annotations
-                const textAnnotations = cell.querySelectorAll('.teacher-annotation-text');
-                textAnnotations.forEach(annotation => annotation.remove());
-            });
-        }
-        """)
+        await clear_overlay(page)
         
         logger.info("Successfully cleared all annotations.")
         return "Success: All annotations cleared"
@@ -125,6 +67,28 @@ async def clear_all_annotations() -> str:
         logger.error(f"Error clearing annotations: {e}")
         return f"Error: Could not clear annotations."
 
+async def point_teacher_cursor(x_percent: float, y_percent: float, label: str = None) -> str:
+    """
+    Move the teacher cursor to a viewport position, optionally with a label.
+    
+    Args:
+        x_percent: X position as percentage of viewport width (0-100)
+        y_percent: Y position as percentage of viewport height (0-100)
+        label: Optional text shown next to the cursor
+    """
+    page = browser_manager.page
+    if not page: return "Error: Browser not available."
+    
+    try:
+        viewport_size = page.viewport_size or await page.evaluate("() => ({width: innerWidth, height: innerHeight})")
+        x = viewport_size['width'] * x_percent / 100
+        y = viewport_size['height'] * y_percent / 100
+        await move_cursor(page, x, y, label)
+        return f"Success: Teacher cursor moved to ({x_percent}%, {y_percent}%)"
+    except Exception as e:
+        logger.error(f"Error moving teacher cursor: {e}")
+        return "Error: Could not move teacher cursor."
+
 async def get_cell_at_viewport_position(x_percent: float = 50, y_percent: float = 50) -> str:
     """
     Identify which cell is at a specific viewport position.
@@ -139,39 +103,19 @@ async def get_cell_at_viewport_position(x_percent: float = 50, y_percent: float
     if not page: return "Error: Browser not available."
     
     try:
-        # Get viewport dimensions and calculate actual coordinates
-        viewport_size = page.viewport_size
-        x = int(viewport_size['width'] * x_percent / 100)
-        y = int(viewport_size['height'] * y_percent / 100)
-        
-        # Find the element at the specified position
-        element_info = await page.evaluate(f"""
-        () => {{
-            const element = document.elementFromPoint({x}, {y});
-            if (!element) return null;
-            
-            // Find the closest cell container
-            const cell = element.closest('.jp-CodeCell');
-            if (!cell) return null;
-            
-            // Find the execution number
-            const prompt = cell.querySelector('.jp-InputPrompt');
-            if (!prompt) return null;
-            
-            const promptText = prompt.textContent.trim();
-            const match = promptText.match(/\\[(\\d+)\\]/);
-            
-            return {{
-                executionNumber: match ? parseInt(match[1]) : null,
-                cellType: 'code',
-                hasOutput: !!cell.querySelector('.jp-Cell-outputArea'),
-                isActive: cell.classList.contains('jp-mod-active')
-            }};
-        }}
-        """)
-        
-        if element_info and element_info['executionNumber']:
-            execution_num = element_info['executionNumber']
+        # Cell bounds come from the spatial index, which only goes back to the page after it changed
+        index = await spatial_index.for_page(page)
+        width, height = index.viewport
+        x = width * x_percent / 100
+        y = height * y_percent / 100
+        
+        cells = index.at(x, y, layer=JUPYTER_CELLS.name)
+        if not cells:
+            # A point in the gap between two cells means the nearer one
+            cells = index.near((x, y, 0, 0), CELL_SNAP_RADIUS, layer=JUPYTER_CELLS.name)
+        
+        if cells and cells[0]['execution_count']:
+            execution_num = cells[0]['execution_count']
             logger.info(f"Found cell {execution_num} at position ({x_percent}%, {y_percent}%)")
             return f"Success: Cell {execution_num} found at position"
         else:
@@ -1,5 +1,6 @@
 # File: session-bubble/aurora_agent/tools/jupyter/screenshot_feedback.py
 
+import asyncio
 import logging
 import base64
 import json
@@ -8,14 +9,26 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import os
 
+from aurora_agent.frame_dedup import FrameDeduplicator, crop_region, page_key, should_send_crop
+
 logger = logging.getLogger(__name__)
 
 class ScreenshotFeedbackSystem:
     """System to capture screenshots after actions and send them to LangGraph for feedback"""
     
-    def __init__(self, langgraph_url: str = "http://host.docker.internal:8080"):
+    def __init__(
+        self,
+        langgraph_url: str = "http://host.docker.internal:8080",
+        # Opt-in: an unchanged screenshot is then reported without "data", which consumers must handle
+        skip_unchanged: bool = os.getenv("SCREENSHOT_SKIP_UNCHANGED", "false").lower() == "true",
+        send_changed_region: bool = os.getenv("SCREENSHOT_SEND_CHANGED_REGION", "false").lower() == "true",
+    ):
         self.langgraph_url = langgraph_url
         self.feedback_endpoint = f"{langgraph_url}/screenshot_feedback"
+        self.skip_unchanged = skip_unchanged
+        self.send_changed_region = send_changed_region
+        # Last frame per page, so that redundant screenshots are not shipped again
+        self.deduplicator = FrameDeduplicator()
         
     async def capture_and_send_feedback(
         self, 
@@ -38,11 +51,48 @@ class ScreenshotFeedbackSystem:
         """
         try:
             # Capture screenshot
-            screenshot_data = await self._capture_screenshot(page)
-            if not screenshot_data:
+            screenshot_bytes = await self._capture_screenshot(page)
+            if not screenshot_bytes:
                 logger.warning("Failed to capture screenshot")
                 return False
             
+            if not (self.skip_unchanged or self.send_changed_region):
+                # Nothing uses the diff, so do not pay for decoding the frame
+                diff = None
+            else:
+                # Decoding and diffing a full-page PNG takes long enough to stall the event loop
+                diff = await asyncio.to_thread(self.deduplicator.compare, page_key(page), screenshot_bytes)
+
+            if diff is None:
+                screenshot = {
+                    "data": base64.b64encode(screenshot_bytes).decode('utf-8'),
+                    "format": "png",
+                    "encoding": "base64"
+                }
+            elif not diff.changed and self.skip_unchanged:
+                # Nothing visible changed: report the action without re-sending the same image
+                screenshot = {"unchanged": True, "format": "png", "encoding": "base64", "diff": diff.to_dict()}
+                logger.info(f"Screenshot unchanged after {action_name}, not re-sending it")
+            elif self.send_changed_region and should_send_crop(diff):
+                crop_bytes, box = await asyncio.to_thread(crop_region, screenshot_bytes, diff.bbox)
+                screenshot = {
+                    "data": base64.b64encode(crop_bytes).decode('utf-8'),
+                    "format": "png",
+                    "encoding": "base64",
+                    "region": {"x": box[0], "y": box[1], "width": box[2] - box[0], "height": box[3] - box[1]},
+                    "full_size": {"width": diff.size[0], "height": diff.size[1]},
+                    "unchanged": False,
+                    "diff": diff.to_dict()
+                }
+            else:
+                screenshot = {
+                    "data": base64.b64encode(screenshot_bytes).decode('utf-8'),
+                    "format": "png",
+                    "encoding": "base64",
+                    "unchanged": not diff.changed,
+                    "diff": diff.to_dict()
+                }
+            
             # Prepare feedback payload
             feedback_payload = {
                 "timestamp": datetime.now().isoformat(),
@@ -51,11 +101,7 @@ class ScreenshotFeedbackSystem:
                     "result": action_result,
                     "parameters": parameters or {}
                 },
-                "screenshot": {
-                    "data": screenshot_data,
-                    "format": "png",
-                    "encoding": "base64"
-                },
+                "screenshot": screenshot,
                 "page_info": await self._get_page_info(page)
             }
             
@@ -73,8 +119,8 @@ class ScreenshotFeedbackSystem:
             logger.error(f"Error in screenshot feedback system: {e}", exc_info=True)
             return False
     
-    async def _capture_screenshot(self, page) -> Optional[str]:
-        """Capture a screenshot and return as base64 string"""
+    async def _capture_screenshot(self, page) -> Optional[bytes]:
+        """Capture a screenshot and return the PNG bytes"""
         try:
             # Capture screenshot as bytes
             screenshot_bytes = await page.screenshot(
@@ -82,11 +128,8 @@ class ScreenshotFeedbackSystem:
                 type='png'
             )
             
-            # Convert to base64
-            screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
-            
-            logger.debug(f"Captured screenshot: {len(screenshot_base64)} characters")
-            return screenshot_base64
+            logger.debug(f"Captured screenshot: {len(screenshot_bytes)} bytes")
+            return screenshot_bytes
             
         except Exception as e:
             logger.error(f"Error capturing screenshot: {e}")
@@ -2,13 +2,20 @@
 # in aurora_agent/tools/ui_interaction/code_generator
 import logging
 import os
-import google.generativeai as genai
 
 # Import the shared browser_manager to interact with the browser
 from aurora_agent.browser_manager import browser_manager
+from aurora_agent import llm_clients
 
 logger = logging.getLogger(__name__)
 
+CODE_GEN_MODEL = os.getenv("CODE_GEN_MODEL", "gemini-1.5-flash")
+CODE_GEN_INSTRUCTION = (
+    "You are an expert Python data scientist. "
+    "Your ONLY job is to write the Python code for the following task. "
+    "Do not include explanations, markdown, or comments. Just the raw code."
+)
+
 async def generate_and_type_python_code(prompt_for_code_gen: str) -> str:
     """
     Generates Python code based on a prompt and types it into the active
@@ -22,17 +29,10 @@ async def generate_and_type_python_code(prompt_for_code_gen: str) -> str:
     try:
         # 1. Generate the Code String with an LLM
         # This part happens invisibly on the server.
-        code_gen_prompt = (
-            "You are an expert Python data scientist. "
-            "Your ONLY job is to write the Python code for the following task. "
-            "Do not include explanations, markdown, or comments. Just the raw code.\n\n"
-            f"Task: {prompt_for_code_gen}"
+        response = await llm_clients.generate(
+            CODE_GEN_MODEL, f"Task: {prompt_for_code_gen}", system_instruction=CODE_GEN_INSTRUCTION, purpose="code_gen"
         )
         
-        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = await model.generate_content_async(code_gen_prompt)
-        
         generated_code = response.text.strip().replace("```python", "").replace("```", "").strip()
         logger.info(f"CODE-GEN TOOL: Generated code to be typed:\n---\n{generated_code}\n---")
         
@@ -0,0 +1,268 @@
+# File: session-bubble/aurora_agent/ui_tools/code_cache.py
+# in aurora_agent/ui_tools/code_cache.py
+"""
+Cache of LLM-generated Playwright code.
+
+Classroom tasks repeat ("create a chart via Insert menu"), so code that ran
+successfully is reused for the same request on the same application screen
+instead of asking the model again. Entries are keyed by application,
+normalized request and a signature of the screen's element locators, and are
+looked up in three tiers:
+
+  1. exact: same application, request and screen signature
+  2. request: same application and request on a screen that has changed
+  3. similar (opt-in): a request whose embedding is close to a cached one and
+     that mentions the same literals (cell references, numbers, quoted text)
+
+Scripts that target per-load `data-aurora-uid` tags are only reused through
+the exact tier: on another screen the same tag names an unrelated element.
+Before a cached script is reused, the locators it acts on first are checked
+against the page; a script whose first targets no longer resolve to exactly
+one element is dropped.
+Only code that parses into an interaction plan is cached, since those are
+the scripts whose locators can be checked. Code enters the cache after it
+executed successfully and leaves it when a reuse fails. The cache is bounded
+(LRU) and persisted as JSON so it survives restarts.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from playwright.async_api import Page
+
+from ..parsers.element_index import UID_ATTRIBUTE
+from .interaction_plan import parse_interaction_code, resolve_locator
+
+logger = logging.getLogger(__name__)
+
+CODE_CACHE_PATH = os.getenv("CODE_CACHE_PATH", "/tmp/aurora_code_cache.json")
+CODE_CACHE_MAX_ENTRIES = int(os.getenv("CODE_CACHE_MAX_ENTRIES", "500"))
+# Similarity lookups cost one embedding call per new request, so they are opt-in.
+CODE_CACHE_EMBEDDINGS = os.getenv("CODE_CACHE_EMBEDDINGS", "false").lower() == "true"
+CODE_CACHE_SIMILARITY = float(os.getenv("CODE_CACHE_SIMILARITY", "0.93"))
+MAX_PENDING = 50
+
+# Actions after which later locators may only exist on the next screen (open menus, dialogs).
+_STATE_CHANGING_ACTIONS = {
+    "click", "dblclick", "fill", "type", "press", "press_sequentially", "check", "uncheck", "select_option", "clear",
+}
+_LITERAL = re.compile(r"'[^']*'|\"[^\"]*\"|\b[a-z]*\d+[a-z\d]*\b")
+_PUNCTUATION = re.compile(r"[^\w\s'\"]")
+
+
+def app_for_url(url: str) -> str:
+    """A stable name for the application a page belongs to."""
+    if "docs.google.com/spreadsheets" in url:
+        return "google-sheets"
+    if "docs.google.com/document" in url:
+        return "google-docs"
+    if re.search(r"/lab(/|\?|$)", url):
+        return "jupyterlab"
+    return urlparse(url).netloc or "unknown"
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercases and collapses whitespace and punctuation, keeping quoted text."""
+    return " ".join(_PUNCTUATION.sub(" ", prompt.lower()).split())
+
+
+def screen_signature(elements: List[Dict[str, Any]]) -> str:
+    """A hash of the locators on screen; the same screen gives the same signature."""
+    locators = sorted({str(element["playwright_locator"]) for element in elements if element.get("playwright_locator")})
+    return hashlib.sha1("\n".join(locators).encode()).hexdigest()[:16]
+
+
+def _screen_local(code: str) -> bool:
+    """Whether the script targets element tags assigned on one page load only."""
+    return UID_ATTRIBUTE in code
+
+
+def _literals(prompt: str) -> List[str]:
+    return sorted(_LITERAL.findall(prompt))
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    norm = (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))) or 1.0
+    return sum(x * y for x, y in zip(a, b)) / norm
+
+
+@dataclass
+class CachedCode:
+    app: str
+    prompt: str
+    signature: str
+    code: str
+    embedding: Optional[List[float]] = None
+    created_at: float = field(default_factory=time.time)
+    hits: int = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.app}|{self.signature}|{self.prompt}"
+
+
+class CodeCache:
+    """LRU cache of generated interaction code, persisted to CODE_CACHE_PATH."""
+
+    def __init__(self, path: str = CODE_CACHE_PATH, max_entries: int = CODE_CACHE_MAX_ENTRIES,
+                 use_embeddings: bool = CODE_CACHE_EMBEDDINGS):
+        self.path = path
+        self.max_entries = max_entries
+        self.use_embeddings = use_embeddings
+        self._entries: "OrderedDict[str, CachedCode]" = OrderedDict()
+        # Generated or reused code waiting for its execution result, by code text
+        self._pending: "OrderedDict[str, CachedCode]" = OrderedDict()
+        self._loaded = False
+        self._save_lock = asyncio.Lock()
+        self.stats = {"exact_hits": 0, "request_hits": 0, "similar_hits": 0, "misses": 0, "stale": 0, "evicted": 0}
+
+    def _load(self):
+        self._loaded = True
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable code cache {self.path}: {e}")
+            return
+        for item in data.get("entries", [])[-self.max_entries:]:
+            entry = CachedCode(**item)
+            self._entries[entry.key] = entry
+        logger.info(f"Loaded {len(self._entries)} cached interaction scripts from {self.path}")
+
+    async def _save(self):
+        snapshot = {"entries": [asdict(entry) for entry in self._entries.values()]}
+
+        def write():
+            temporary = f"{self.path}.tmp"
+            with open(temporary, "w") as f:
+                json.dump(snapshot, f)
+            os.replace(temporary, self.path)
+
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(write)
+            except OSError as e:
+                logger.warning(f"Could not persist the code cache to {self.path}: {e}")
+
+    async def _embed(self, prompt: str) -> Optional[List[float]]:
+        from .element_context import embed_texts
+
+        try:
+            return (await asyncio.to_thread(embed_texts, [prompt]))[0]
+        except Exception as e:
+            logger.warning(f"Code cache embeddings unavailable: {e}")
+            return None
+
+    async def _still_resolves(self, page: Page, code: str) -> bool:
+        """Checks that the locators the script acts on before it changes the page each match one element."""
+        plan = parse_interaction_code(code)
+        if plan is None:
+            return False
+        checked = set()
+        for step in plan.steps:
+            if step.kind == "keyboard":
+                break
+            if step.kind != "element":
+                continue
+            if step.target not in checked:
+                checked.add(step.target)
+                if await resolve_locator(page, step.chain).count() != 1:
+                    logger.info(f"Cached interaction target no longer resolves to one element: {step.target}")
+                    return False
+            if step.action in _STATE_CHANGING_ACTIONS:
+                break
+        return True
+
+    async def lookup(self, page: Page, prompt: str, elements: List[Dict[str, Any]]) -> Optional[str]:
+        """Returns cached code for the request on this screen, or None."""
+        if not self._loaded:
+            self._load()
+        query = CachedCode(app=app_for_url(page.url), prompt=normalize_prompt(prompt),
+                           signature=screen_signature(elements), code="")
+
+        exact = self._entries.get(query.key)
+        candidates = [("exact_hits", exact)] if exact else []
+        candidates += [("request_hits", entry) for entry in reversed(self._entries.values())
+                       if entry.app == query.app and entry.prompt == query.prompt and entry is not exact
+                       and not _screen_local(entry.code)]
+        code = await self._first_valid(page, query, candidates)
+        if code is None and self.use_embeddings:
+            query.embedding = await self._embed(query.prompt)
+            if query.embedding:
+                literals = _literals(query.prompt)
+                scored = [
+                    (_cosine(query.embedding, entry.embedding), entry) for entry in self._entries.values()
+                    if entry.app == query.app and entry.prompt != query.prompt and entry.embedding
+                    and _literals(entry.prompt) == literals and not _screen_local(entry.code)
+                ]
+                similar = [("similar_hits", entry) for score, entry in sorted(scored, key=lambda s: -s[0])
+                           if score >= CODE_CACHE_SIMILARITY]
+                code = await self._first_valid(page, query, similar[:3])
+        if code is None:
+            self.stats["misses"] += 1
+        return code
+
+    async def _first_valid(self, page: Page, query: CachedCode, candidates) -> Optional[str]:
+        for tier, entry in candidates:
+            if not await self._still_resolves(page, entry.code):
+                self.stats["stale"] += 1
+                self._entries.pop(entry.key, None)
+                continue
+            self.stats[tier] += 1
+            entry.hits += 1
+            self._entries.move_to_end(entry.key)
+            # Once it runs successfully again, the script is also cached under this request and screen
+            self._remember(CachedCode(app=query.app, prompt=query.prompt, signature=query.signature, code=entry.code,
+                                      embedding=query.embedding or entry.embedding, hits=entry.hits))
+            logger.info(f"Code cache {tier.split('_')[0]} hit for '{query.prompt}' ({query.app}, used {entry.hits} times)")
+            return entry.code
+        return None
+
+    def _remember(self, entry: CachedCode):
+        self._pending[entry.code] = entry
+        self._pending.move_to_end(entry.code)
+        while len(self._pending) > MAX_PENDING:
+            self._pending.popitem(last=False)
+
+    def remember(self, url: str, prompt: str, elements: List[Dict[str, Any]], code: str):
+        """Registers freshly generated code; it is cached once it executes successfully."""
+        if parse_interaction_code(code) is None:
+            return
+        self._remember(CachedCode(app=app_for_url(url), prompt=normalize_prompt(prompt),
+                                  signature=screen_signature(elements), code=code))
+
+    async def record_result(self, code: str, success: bool):
+        """Caches code that ran successfully; drops cached code that failed."""
+        entry = self._pending.pop(code, None)
+        if entry is None:
+            return
+        if not success:
+            for key in [key for key, cached in self._entries.items() if cached.code == code]:
+                del self._entries[key]
+                self.stats["stale"] += 1
+            return
+        if not self._loaded:
+            self._load()
+        if self.use_embeddings and entry.embedding is None:
+            entry.embedding = await self._embed(entry.prompt)
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evicted"] += 1
+        await self._save()
+
+
+# Global instance
+code_cache = CodeCache()
@@ -0,0 +1,199 @@
+# File: session-bubble/aurora_agent/ui_tools/element_context.py
+# in aurora_agent/ui_tools/element_context.py
+"""
+Builds the element context that generate_playwright_code sends to the model.
+
+Parsers can return hundreds of elements, some duplicated and some carrying
+objects that only serialize as a repr. The builder keeps JSON-native fields,
+drops duplicates, ranks elements by how well they match the user request
+(lexically, and optionally by embedding similarity) and keeps the best ones
+that fit in a token budget.
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ELEMENT_CONTEXT_TOKEN_BUDGET = int(os.getenv("ELEMENT_CONTEXT_TOKEN_BUDGET", "2000"))
+# Embedding similarity costs one embedding call per new element text, so it is opt-in.
+ELEMENT_CONTEXT_EMBEDDINGS = os.getenv("ELEMENT_CONTEXT_EMBEDDINGS", "false").lower() == "true"
+EMBEDDING_MODEL = os.getenv("ELEMENT_CONTEXT_EMBEDDING_MODEL", "models/text-embedding-004")
+LEXICAL_WEIGHT = 0.6
+EMBEDDING_WEIGHT = 0.4
+MAX_CACHED_EMBEDDINGS = 5000
+
+# Fields that describe an element to the model, in the order they are emitted.
+_TEXT_FIELDS = ("name", "text", "aria_label", "description", "context", "role")
+_WORD = re.compile(r"[a-z0-9]+")
+
+_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return len(text) // 4
+
+
+# Marks a value that is not JSON data (a Locator, a handle, ...).
+_NOT_JSON = object()
+
+
+def _json_native(value: Any) -> Any:
+    """
+    Returns the JSON data in `value`, or _NOT_JSON for a value that has none.
+    Containers keep their JSON items (including nulls) and lose only the rest.
+    """
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        items = (_json_native(item) for item in value)
+        return [item for item in items if item is not _NOT_JSON]
+    if isinstance(value, dict):
+        items = ((key, _json_native(item)) for key, item in value.items() if isinstance(key, str))
+        return {key: item for key, item in items if item is not _NOT_JSON}
+    return _NOT_JSON
+
+
+def sanitize_element(element: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps JSON-native, informative fields; drops Locator objects, empty values and default states."""
+    clean = {}
+    for key, value in element.items():
+        value = _json_native(value)
+        if value is _NOT_JSON or value is None or value == "" or value == [] or value == {}:
+            continue
+        if (key == "visible" and value is True) or (key == "enabled" and value is True):
+            continue
+        clean[key] = value
+    return clean
+
+
+def _dedupe_key(element: Dict[str, Any]) -> str:
+    locator = element.get("playwright_locator")
+    if locator:
+        return locator
+    return json.dumps([element.get(field) for field in ("role", "name", "text", "selector", "bounds")], sort_keys=True)
+
+
+def _element_text(element: Dict[str, Any]) -> str:
+    return " ".join(str(element[field]) for field in _TEXT_FIELDS if element.get(field))
+
+
+def _lexical_scores(request: str, texts: List[str], names: List[str]) -> List[float]:
+    """BM25-style term overlap between the request and each element, normalized to 0..1."""
+    query = set(_WORD.findall(request.lower()))
+    documents = [_WORD.findall(text.lower()) for text in texts]
+    if not query or not documents:
+        return [0.0] * len(texts)
+    document_frequency = Counter(term for words in documents for term in set(words))
+    average_length = sum(len(words) for words in documents) / len(documents) or 1
+    scores = []
+    for words, name in zip(documents, names):
+        counts = Counter(words)
+        score = 0.0
+        for term in query & counts.keys():
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            tf = counts[term]
+            score += idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * len(words) / average_length))
+        # A control named verbatim in the request ("click Insert") is almost certainly the target
+        if len(name) > 2 and name.lower() in request.lower():
+            score += 1.0
+        scores.append(score)
+    top = max(scores)
+    return [score / top for score in scores] if top > 0 else scores
+
+
+def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embeds texts with EMBEDDING_MODEL (blocking; run it in a thread)."""
+    import google.generativeai as genai
+
+    result = genai.embed_content(model=EMBEDDING_MODEL, content=texts)
+    return result["embedding"]
+
+
+async def _embedding_scores(request: str, texts: List[str]) -> Optional[List[float]]:
+    """Cosine similarity of each element text to the request; element embeddings are cached."""
+    missing = list(dict.fromkeys(text for text in texts if text not in _embedding_cache))
+    try:
+        vectors = await asyncio.to_thread(embed_texts, [request] + missing)
+    except Exception as e:
+        logger.warning(f"Element embeddings unavailable, ranking lexically: {e}")
+        return None
+    query, new_vectors = vectors[0], vectors[1:]
+    for text, vector in zip(missing, new_vectors):
+        _embedding_cache[text] = vector
+    while len(_embedding_cache) > MAX_CACHED_EMBEDDINGS:
+        _embedding_cache.popitem(last=False)
+
+    query_norm = math.sqrt(sum(x * x for x in query)) or 1.0
+    scores = []
+    for text in texts:
+        vector = _embedding_cache.get(text)
+        if vector is None:
+            scores.append(0.0)
+            continue
+        _embedding_cache.move_to_end(text)
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        scores.append(max(0.0, sum(a * b for a, b in zip(query, vector)) / (query_norm * norm)))
+    return scores
+
+
+async def build_element_context(
+    user_request: str,
+    elements: List[Dict[str, Any]],
+    token_budget: int = ELEMENT_CONTEXT_TOKEN_BUDGET,
+    use_embeddings: bool = ELEMENT_CONTEXT_EMBEDDINGS,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Returns the element context as a JSON array (most relevant first, within
+    `token_budget`) and statistics including the tokens saved compared with
+    dumping the raw element list.
+    """
+    raw_tokens = estimate_tokens(json.dumps(elements, default=str))
+
+    unique: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    for element in elements:
+        clean = sanitize_element(element)
+        unique.setdefault(_dedupe_key(clean), clean)
+    candidates = list(unique.values())
+
+    texts = [_element_text(element) for element in candidates]
+    scores = _lexical_scores(user_request, texts, [str(element.get("name", "")) for element in candidates])
+    similarities = None
+    if use_embeddings and candidates:
+        similarities = await _embedding_scores(user_request, texts)
+        if similarities:
+            scores = [LEXICAL_WEIGHT * lexical + EMBEDDING_WEIGHT * similarity
+                      for lexical, similarity in zip(scores, similarities)]
+    # Stable sort: equally relevant elements keep page order
+    ranked = [candidates[i] for i in sorted(range(len(candidates)), key=lambda i: -scores[i])]
+
+    kept, used = [], 2  # The surrounding brackets
+    for element in ranked:
+        serialized = json.dumps(element, separators=(",", ":"))
+        cost = estimate_tokens(serialized) + 1
+        if used + cost > token_budget:
+            continue  # A smaller, less relevant element may still fit
+        kept.append(serialized)
+        used += cost
+
+    context = "[" + ",".join(kept) + "]"
+    stats = {
+        "elements_in": len(elements),
+        "duplicates": len(elements) - len(candidates),
+        "elements_kept": len(kept),
+        "tokens_before": raw_tokens,
+        "tokens_after": estimate_tokens(context),
+        "tokens_saved": max(0, raw_tokens - estimate_tokens(context)),
+        "embeddings": similarities is not None,
+    }
+    logger.info(
+        f"Element context: kept {stats['elements_kept']} of {stats['elements_in']} elements "
+        f"({stats['duplicates']} duplicates), ~{stats['tokens_after']} tokens, saved ~{stats['tokens_saved']}"
+    )
+    return context, stats
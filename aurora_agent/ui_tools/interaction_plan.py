@@ -0,0 +1,328 @@
+# File: session-bubble/aurora_agent/ui_tools/interaction_plan.py
+# in aurora_agent/ui_tools/interaction_plan.py
+"""
+A small intermediate representation (IR) for LLM-generated Playwright code.
+
+The generated scripts follow a fixed shape: `highlight_element` -> action ->
+`remove_annotations`, repeated per step. Executed verbatim, each step costs a
+`wait_for`, an `element_handle`, two `evaluate`s and the action itself. Parsing
+the code into a plan lets us fuse the annotation with the action that follows it
+on the same element, drop redundant waits and clear the overlay only once, so a
+step costs two browser round trips instead of five.
+
+Code that uses anything outside the supported subset is not parsed; callers
+fall back to executing it as-is.
+"""
+import ast
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from playwright.async_api import Page
+
+from .overlay_runtime import clear_highlights, highlight_locator
+
+logger = logging.getLogger(__name__)
+
+# Locator-producing methods and properties that may appear in a target expression.
+LOCATOR_METHODS = {
+    "locator", "get_by_role", "get_by_text", "get_by_label", "get_by_placeholder",
+    "get_by_title", "get_by_test_id", "get_by_alt_text", "nth", "filter", "frame_locator",
+}
+LOCATOR_PROPERTIES = {"first", "last"}
+# LLMs regularly invent this one; Playwright calls it get_by_label.
+METHOD_ALIASES = {"get_by_aria_label": "get_by_label"}
+
+# Element actions an action step may perform.
+ELEMENT_ACTIONS = {
+    "click", "dblclick", "fill", "type", "press", "press_sequentially", "hover", "check",
+    "uncheck", "select_option", "focus", "clear", "scroll_into_view_if_needed", "wait_for",
+}
+KEYBOARD_ACTIONS = {"press", "type", "down", "up", "insert_text"}
+
+# (name, args, kwargs) for a method call, or (name, None, None) for a property access.
+ChainLink = Tuple[str, Optional[list], Optional[dict]]
+
+
+class UnsupportedInteraction(Exception):
+    """Raised when generated code falls outside the subset the IR understands."""
+
+
+@dataclass
+class PlanStep:
+    """One browser-side operation of an interaction plan."""
+    kind: str  # "element", "keyboard" or "wait"
+    action: str
+    target: Optional[str] = None
+    chain: List[ChainLink] = field(default_factory=list)
+    args: list = field(default_factory=list)
+    kwargs: dict = field(default_factory=dict)
+    annotate: bool = False
+    duration_ms: Optional[float] = None
+
+    @property
+    def round_trips(self) -> int:
+        if self.kind == "wait":
+            return 0
+        return 2 if self.annotate else 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "action": self.action,
+            "target": self.target,
+            "args": self.args,
+            "kwargs": self.kwargs,
+            "annotate": self.annotate,
+            "duration_ms": self.duration_ms,
+        }
+
+
+@dataclass
+class InteractionPlan:
+    """An ordered list of steps plus the bookkeeping needed to report on them."""
+    steps: List[PlanStep] = field(default_factory=list)
+    clear_annotations: bool = False
+    # Round trips the original code would have made when executed verbatim.
+    original_round_trips: int = 0
+    total_ms: Optional[float] = None
+
+    @property
+    def round_trips(self) -> int:
+        return sum(step.round_trips for step in self.steps) + (1 if self.clear_annotations else 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "steps": [step.to_dict() for step in self.steps],
+            "round_trips": self.round_trips,
+            "original_round_trips": self.original_round_trips,
+            "total_ms": self.total_ms,
+        }
+
+
+# --- Parsing ---
+
+def _literal(node: ast.AST) -> Any:
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError):
+        raise UnsupportedInteraction(f"Non-literal argument: {ast.unparse(node)}")
+
+
+def _call_arguments(call: ast.Call) -> Tuple[list, dict]:
+    if any(kw.arg is None for kw in call.keywords):
+        raise UnsupportedInteraction("**kwargs are not supported")
+    return [_literal(arg) for arg in call.args], {kw.arg: _literal(kw.value) for kw in call.keywords}
+
+
+def _locator_chain(node: ast.AST, variables: Dict[str, List[ChainLink]]) -> List[ChainLink]:
+    """Turns `page.get_by_role(...).first` (or a variable bound to one) into a chain."""
+    if isinstance(node, ast.Name):
+        if node.id in variables:
+            return list(variables[node.id])
+        raise UnsupportedInteraction(f"Unknown locator variable: {node.id}")
+    if isinstance(node, ast.Attribute) and node.attr in LOCATOR_PROPERTIES:
+        return _locator_chain(node.value, variables) + [(node.attr, None, None)]
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        method = METHOD_ALIASES.get(node.func.attr, node.func.attr)
+        if method in LOCATOR_METHODS:
+            args, kwargs = _call_arguments(node)
+            owner = node.func.value
+            base = [] if isinstance(owner, ast.Name) and owner.id == "page" else _locator_chain(owner, variables)
+            return base + [(method, args, kwargs)]
+    raise UnsupportedInteraction(f"Unsupported locator expression: {ast.unparse(node)}")
+
+
+def _describe_chain(chain: List[ChainLink]) -> str:
+    parts = ["page"]
+    for name, args, kwargs in chain:
+        if args is None:
+            parts.append(name)
+            continue
+        rendered = [repr(a) for a in args] + [f"{k}={v!r}" for k, v in kwargs.items()]
+        parts.append(f"{name}({', '.join(rendered)})")
+    return ".".join(parts)
+
+
+def _awaited_call(stmt: ast.stmt) -> Optional[ast.Call]:
+    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Await) and isinstance(stmt.value.value, ast.Call):
+        return stmt.value.value
+    return None
+
+
+def parse_interaction_code(code: str) -> Optional[InteractionPlan]:
+    """
+    Parses generated Playwright code into an InteractionPlan.
+
+    Returns:
+        The fused plan, or None when the code uses constructs the IR does not
+        support and should be executed verbatim instead.
+    """
+    try:
+        tree = compile(code, "<interaction>", "exec", flags=ast.PyCF_ONLY_AST | ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+        return _build_plan(tree.body)
+    except (SyntaxError, UnsupportedInteraction) as e:
+        logger.info(f"Interaction code not representable as a plan, executing verbatim: {e}")
+        return None
+
+
+def _build_plan(statements: List[ast.stmt]) -> InteractionPlan:
+    plan = InteractionPlan()
+    variables: Dict[str, List[ChainLink]] = {}
+    pending_highlight: Optional[List[ChainLink]] = None
+
+    for stmt in statements:
+        # `target = page.get_by_role(...)` binds a locator; it costs nothing in the browser.
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name):
+            variables[stmt.targets[0].id] = _locator_chain(stmt.value, variables)
+            continue
+        # Docstrings and bare constants.
+        if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant):
+            continue
+
+        call = _awaited_call(stmt)
+        if call is None:
+            raise UnsupportedInteraction(f"Unsupported statement: {ast.unparse(stmt)}")
+        func = call.func
+
+        if isinstance(func, ast.Name) and func.id == "highlight_element":
+            if len(call.args) != 2:
+                raise UnsupportedInteraction("highlight_element expects (page, locator)")
+            pending_highlight = _locator_chain(call.args[1], variables)
+            plan.original_round_trips += 3  # wait_for + element_handle + evaluate
+            continue
+
+        if isinstance(func, ast.Name) and func.id == "remove_annotations":
+            # A highlight that no action consumed is still drawn before it is removed.
+            if pending_highlight is not None:
+                plan.steps.append(_highlight_step(pending_highlight))
+                pending_highlight = None
+            # Intermediate removals are unnecessary (the next highlight replaces the box);
+            # only the one after the last highlight is kept, as a single final clear.
+            plan.clear_annotations = any(step.annotate for step in plan.steps)
+            plan.original_round_trips += 1
+            continue
+
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "asyncio" and func.attr == "sleep":
+            args, _ = _call_arguments(call)
+            plan.steps.append(PlanStep(kind="wait", action="sleep", args=[float(args[0]) * 1000]))
+            continue
+
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "page" and func.attr == "wait_for_timeout":
+            args, _ = _call_arguments(call)
+            plan.steps.append(PlanStep(kind="wait", action="sleep", args=[float(args[0])]))
+            continue
+
+        if (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Attribute)
+                and isinstance(func.value.value, ast.Name) and func.value.value.id == "page"
+                and func.value.attr == "keyboard" and func.attr in KEYBOARD_ACTIONS):
+            args, kwargs = _call_arguments(call)
+            plan.steps.append(PlanStep(kind="keyboard", action=func.attr, target="page.keyboard", args=args, kwargs=kwargs))
+            plan.original_round_trips += 1
+            continue
+
+        if isinstance(func, ast.Attribute) and func.attr in ELEMENT_ACTIONS:
+            chain = _locator_chain(func.value, variables)
+            args, kwargs = _call_arguments(call)
+            step = PlanStep(kind="element", action=func.attr, target=_describe_chain(chain), chain=chain, args=args, kwargs=kwargs)
+            step.annotate = pending_highlight == chain
+            if pending_highlight is not None and not step.annotate:
+                # A highlight for a different element than the one acted on: keep it as its own step.
+                plan.steps.append(_highlight_step(pending_highlight))
+                plan.clear_annotations = False
+            pending_highlight = None
+            plan.steps.append(step)
+            if step.annotate:
+                plan.clear_annotations = False
+            plan.original_round_trips += 1
+            continue
+
+        raise UnsupportedInteraction(f"Unsupported call: {ast.unparse(call)}")
+
+    if pending_highlight is not None:
+        plan.steps.append(_highlight_step(pending_highlight))
+        plan.clear_annotations = False
+
+    plan.steps = _fuse_waits(plan.steps)
+    return plan
+
+
+def _highlight_step(chain: List[ChainLink]) -> PlanStep:
+    return PlanStep(kind="element", action="highlight", target=_describe_chain(chain), chain=chain, annotate=True)
+
+
+def _fuse_waits(steps: List[PlanStep]) -> List[PlanStep]:
+    """
+    Drops `wait_for()` steps that are immediately followed by another action on the
+    same element: Playwright actions (and the annotation evaluate) already wait for
+    their target, so the separate wait only adds a round trip.
+    """
+    fused = []
+    for i, step in enumerate(steps):
+        following = steps[i + 1] if i + 1 < len(steps) else None
+        if (step.kind == "element" and step.action == "wait_for" and step.kwargs.get("state", "visible") not in ("hidden", "detached")
+                and following is not None and following.kind == "element" and following.chain == step.chain):
+            continue
+        fused.append(step)
+    return fused
+
+
+# --- Execution ---
+
+def resolve_locator(page: Page, chain: List[ChainLink]):
+    target = page
+    for name, args, kwargs in chain:
+        target = getattr(target, name) if args is None else getattr(target, name)(*args, **kwargs)
+    return target
+
+
+async def _run_step(page: Page, step: PlanStep) -> None:
+    if step.kind == "wait":
+        await asyncio.sleep(step.args[0] / 1000)
+        return
+    if step.kind == "keyboard":
+        await getattr(page.keyboard, step.action)(*step.args, **step.kwargs)
+        return
+
+    locator = resolve_locator(page, step.chain)
+    if step.annotate:
+        # One overlay command both waits for the element and draws the box (replacing the previous one).
+        # A failed highlight is cosmetic and must not abort the interaction.
+        try:
+            await highlight_locator(locator)
+        except Exception as e:
+            logger.warning(f"Could not highlight {step.target}: {e}")
+    if step.action != "highlight":
+        await getattr(locator, step.action)(*step.args, **step.kwargs)
+
+
+async def execute_plan(page: Page, plan: InteractionPlan) -> Dict[str, Any]:
+    """
+    Executes a plan step by step, recording per-step timings.
+
+    Returns:
+        The same result shape as `execute_interaction`, with the executed plan
+        under the "plan" key.
+    """
+    started = time.perf_counter()
+    try:
+        for step in plan.steps:
+            step_started = time.perf_counter()
+            try:
+                await _run_step(page, step)
+            finally:
+                step.duration_ms = round((time.perf_counter() - step_started) * 1000, 1)
+        if plan.clear_annotations:
+            await clear_highlights(page)
+    except Exception as e:
+        plan.total_ms = round((time.perf_counter() - started) * 1000, 1)
+        error_message = f"An error occurred during UI interaction: {e}"
+        logger.error(error_message, exc_info=True)
+        return {"success": False, "error": error_message, "plan": plan.to_dict()}
+
+    plan.total_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Executed interaction plan: {len(plan.steps)} steps, {plan.round_trips} round trips "
+                f"(verbatim: {plan.original_round_trips}) in {plan.total_ms}ms")
+    return {"success": True, "message": "Interaction executed successfully.", "plan": plan.to_dict()}
@@ -7,11 +7,16 @@ import logging
 import platform
 from playwright.async_api import Page
 from .annotation_helpers import highlight_element, remove_annotations
-import google.generativeai as genai
+from .interaction_plan import parse_interaction_code, execute_plan
+from .element_context import build_element_context
+from .code_cache import code_cache
+from .. import llm_clients
 import os
 
 logger = logging.getLogger(__name__)
 
+INTERACTION_MODEL = os.getenv("INTERACTION_MODEL", "gemini-2.5-flash")
+
 # --- The "Brain" is now a simple function, not an Agent ---
 
 BASE_INTERACT_PROMPT = """
@@ -27,6 +32,8 @@ You are an expert Playwright script writer. Your ONLY job is to generate a Pytho
 
 **RULES:**
 - Use the exact `playwright_locator` string provided in the element information. Do not create your own.
+- If an element has a `scroll_into_view` statement, run it before using the element's locator.
+- If an element has a `run_command` statement instead of a locator, run that statement to perform it.
 - Your output must be **only** the Python code. Do not include any explanations or markdown like ```python.
 """
 
@@ -66,10 +73,10 @@ SHEETS_INTERACT_PROMPT = BASE_INTERACT_PROMPT + """
 **GOOGLE SHEETS EXAMPLES:**
 
 *User Request:* "Create a chart via Insert menu"
-*Element Info:* `[..., {{"playwright_locator": "page.get_by_role('menuitem', name='Insert')", ...}}, {{"playwright_locator": "page.get_by_role('menuitem', name='Chart')", ...}}]`
+*Element Info:* `[..., {{"name": "Insert", "playwright_locator": "page.locator('#docs-insert-menu')", ...}}, {{"name": "Chart", "playwright_locator": "page.get_by_role('menuitem', name='Chart')", ...}}]`
 *Generated Code:*
 # Step 1: Click Insert menu
-insert_menu = page.get_by_role('menuitem', name='Insert')
+insert_menu = page.locator("#docs-insert-menu")
 await highlight_element(page, insert_menu)
 await insert_menu.click()
 await remove_annotations(page)
@@ -94,23 +101,30 @@ async def generate_playwright_code(page: Page, user_prompt: str, element_info_li
     """
     Selects the correct prompt, formats it with context, and calls the LLM.
     """
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    model = genai.GenerativeModel("gemini-2.5-flash")
-    
-    # 1. Select the specialized prompt template based on the current page URL
+    # 0. Reuse code that already worked for this request on this screen
+    cached_code = await code_cache.lookup(page, user_prompt, element_info_list)
+    if cached_code:
+        return cached_code
+
+    # 1. Select the specialized prompt template based on the current page URL.
+    #    It is the static part of the prompt, sent as a (provider-cached) system instruction.
     prompt_template = get_prompt_for_application(page.url)
 
-    # 2. Format the template with the dynamic data. This is now safe.
-    full_prompt_for_llm = (
-        prompt_template +
-        f"\n\n--- CURRENT TASK ---\n" +
+    # 2. Keep only the deduplicated elements most relevant to the request, within the token budget
+    element_context, _ = await build_element_context(user_prompt, element_info_list)
+
+    # 3. Only the task itself changes from call to call
+    task_prompt = (
+        f"--- CURRENT TASK ---\n" +
         f"User Request: {user_prompt}\n\n" +
-        f"Element Info:\n{json.dumps(element_info_list, default=str)}"
+        f"Element Info:\n{element_context}"
     )
 
     try:
-        response = await model.generate_content_async(full_prompt_for_llm)
+        response = await llm_clients.generate(INTERACTION_MODEL, task_prompt, system_instruction=prompt_template,
+                                              purpose="interaction")
         cleaned_code = response.text.strip().replace("```python", "").replace("```", "").strip()
+        code_cache.remember(page.url, user_prompt, element_info_list, cleaned_code)
         return cleaned_code
     except Exception as e:
         logger.error(f"Error calling Gemini in generate_playwright_code: {e}")
@@ -125,6 +139,19 @@ async def execute_interaction(page: Page, interaction_code: str):
     if not page:
         return {"success": False, "error": "Execution failed: Browser page is not available."}
 
+    # 0. Fast path: run the code as a fused interaction plan (fewer browser round trips).
+    #    The plan parser only accepts awaited calls on `page` locators, `highlight_element`,
+    #    `remove_annotations` and sleeps with literal arguments, so everything the sanitizer
+    #    below guards against (asyncio.run, function definitions, bare `locator(`/`element`
+    #    names, page.evaluate, `page.page.`) is rejected and takes the sanitized path instead;
+    #    the one rewrite it would apply, get_by_aria_label -> get_by_label, is a plan alias.
+    #    tests/test_interaction_plan.py pins this down.
+    plan = parse_interaction_code(interaction_code)
+    if plan is not None:
+        result = await execute_plan(page, plan)
+        await code_cache.record_result(interaction_code, result["success"])
+        return result
+
     try:
         # 1. Sanitize the code: Fix common LLM errors and undefined variables
         sanitized_code = []
@@ -0,0 +1,317 @@
+# File: session-bubble/aurora_agent/ui_tools/overlay_runtime.py
+# in aurora_agent/ui_tools/overlay_runtime.py
+"""
+The in-page overlay runtime used for highlights, teacher annotations and the
+teacher cursor.
+
+The runtime is injected once per document (as a context init script) and owns a
+single fixed overlay layer plus one stylesheet. Python drives it with compact
+commands such as `highlight`, `annotate` and `clear`, so every call is one small
+`evaluate` and re-annotating an element replaces its state instead of appending
+more inline styles.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+from playwright.async_api import BrowserContext, Locator, Page
+
+logger = logging.getLogger(__name__)
+
+OVERLAY_VERSION = 1
+_MISSING = "__aurora_overlay_missing__"
+
+OVERLAY_RUNTIME_SCRIPT = """
+(() => {
+    const VERSION = %(version)d;
+    if (window.__auroraOverlay && window.__auroraOverlay.version >= VERSION) return;
+    if (window.__auroraOverlay) window.__auroraOverlay.clear();
+
+    const CSS = `
+        .aurora-overlay-layer { position: fixed; inset: 0; pointer-events: none; z-index: 2147483646; }
+        .aurora-highlight { position: fixed; box-sizing: border-box; border: 3px solid red; pointer-events: none; }
+        .aurora-label {
+            position: fixed; pointer-events: none; padding: 4px 8px; border-radius: 4px;
+            background: var(--aurora-color, red); color: white; font: bold 12px sans-serif;
+            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.2); white-space: nowrap;
+        }
+        .aurora-cursor {
+            position: fixed; width: 18px; height: 18px; margin: -9px 0 0 -9px; border-radius: 50%%;
+            background: rgba(255, 140, 0, 0.85); border: 2px solid white; pointer-events: none;
+            transition: left 0.15s ease, top 0.15s ease;
+        }
+        .aurora-cursor[hidden] { display: none; }
+        .aurora-cursor .aurora-label { position: absolute; left: 20px; top: -4px; }
+        .aurora-annotated {
+            outline: 3px solid var(--aurora-color, red) !important;
+            box-shadow: 0 0 10px var(--aurora-color, red) !important;
+            background-color: color-mix(in srgb, var(--aurora-color, red) 6%%, transparent) !important;
+            transition: all 0.3s ease !important;
+        }
+    `;
+
+    let layer = null;
+    let cursor = null;
+    let highlights = [];            // [{el, box}]
+    const annotations = new Map();  // el -> {color, label}
+    let framePending = false;
+
+    function ensureLayer() {
+        if (layer && layer.isConnected) return layer;
+        if (!document.getElementById('aurora-overlay-style')) {
+            const style = document.createElement('style');
+            style.id = 'aurora-overlay-style';
+            style.textContent = CSS;
+            (document.head || document.documentElement).appendChild(style);
+        }
+        layer = document.createElement('div');
+        layer.className = 'aurora-overlay-layer';
+        layer.setAttribute('data-aurora-version', String(VERSION));
+        (document.body || document.documentElement).appendChild(layer);
+        return layer;
+    }
+
+    function resolve(target) {
+        if (!target) return null;
+        if (target instanceof Element) return target;
+        try { return document.querySelector(target); } catch (e) { return null; }
+    }
+
+    function place(node, el, offsetTop) {
+        const rect = el.getBoundingClientRect();
+        node.style.left = rect.left + 'px';
+        node.style.top = (rect.top + (offsetTop || 0)) + 'px';
+        if (offsetTop === undefined) {
+            node.style.width = rect.width + 'px';
+            node.style.height = rect.height + 'px';
+        }
+    }
+
+    function reposition() {
+        framePending = false;
+        highlights = highlights.filter(({el, box}) => {
+            if (!el.isConnected) { box.remove(); return false; }
+            place(box, el);
+            return true;
+        });
+        for (const [el, state] of annotations) {
+            if (!el.isConnected) { state.label && state.label.remove(); annotations.delete(el); continue; }
+            if (state.label) place(state.label, el, -25);
+        }
+    }
+
+    function schedule() {
+        if (framePending || (!highlights.length && !annotations.size)) return;
+        framePending = true;
+        requestAnimationFrame(reposition);
+    }
+    window.addEventListener('scroll', schedule, {capture: true, passive: true});
+    window.addEventListener('resize', schedule, {passive: true});
+
+    function clearHighlights() {
+        highlights.forEach(({box}) => box.remove());
+        highlights = [];
+    }
+
+    function highlight(targets) {
+        clearHighlights();
+        const root = ensureLayer();
+        for (const target of targets || []) {
+            const el = resolve(target);
+            if (!el) continue;
+            const box = document.createElement('div');
+            box.className = 'aurora-highlight';
+            place(box, el);
+            root.appendChild(box);
+            highlights.push({el, box});
+        }
+        return highlights.length;
+    }
+
+    function highlightElement(el) {
+        return highlight([el]);
+    }
+
+    function inViewport(el) {
+        const rect = el.getBoundingClientRect();
+        return rect.top >= 0 && rect.left >= 0
+            && rect.bottom <= window.innerHeight && rect.right <= window.innerWidth;
+    }
+
+    function annotate(target, color, text, scroll) {
+        const el = resolve(target);
+        if (!el) return false;
+        // Like scroll_into_view_if_needed: a visible target must not jump the viewport
+        if (scroll && !inViewport(el)) el.scrollIntoView({block: 'center', inline: 'nearest'});
+        const root = ensureLayer();
+        let state = annotations.get(el);
+        if (!state) {
+            state = {label: null};
+            annotations.set(el, state);
+        }
+        el.classList.add('aurora-annotated');
+        el.style.setProperty('--aurora-color', color || 'red');
+        if (text) {
+            if (!state.label) {
+                state.label = document.createElement('div');
+                state.label.className = 'aurora-label';
+                root.appendChild(state.label);
+            }
+            state.label.style.setProperty('--aurora-color', color || 'red');
+            state.label.textContent = text;
+            place(state.label, el, -25);
+        } else if (state.label) {
+            state.label.remove();
+            state.label = null;
+        }
+        return true;
+    }
+
+    function annotateBatch(items) {
+        let count = 0;
+        for (const item of items || []) {
+            if (annotate(item.target, item.color, item.text, item.scroll)) count++;
+        }
+        return count;
+    }
+
+    function clearAnnotations() {
+        for (const [el, state] of annotations) {
+            el.classList.remove('aurora-annotated');
+            el.style.removeProperty('--aurora-color');
+            if (state.label) state.label.remove();
+        }
+        annotations.clear();
+    }
+
+    function moveCursor(x, y, text) {
+        const root = ensureLayer();
+        if (!cursor || !cursor.isConnected) {
+            cursor = document.createElement('div');
+            cursor.className = 'aurora-cursor';
+            root.appendChild(cursor);
+        }
+        cursor.hidden = false;
+        cursor.style.left = x + 'px';
+        cursor.style.top = y + 'px';
+        let label = cursor.querySelector('.aurora-label');
+        if (text) {
+            if (!label) {
+                label = document.createElement('div');
+                label.className = 'aurora-label';
+                cursor.appendChild(label);
+            }
+            label.textContent = text;
+        } else if (label) {
+            label.remove();
+        }
+        return true;
+    }
+
+    function hideCursor() {
+        if (cursor) cursor.hidden = true;
+        return true;
+    }
+
+    function clear() {
+        clearHighlights();
+        clearAnnotations();
+        hideCursor();
+        return true;
+    }
+
+    window.__auroraOverlay = {
+        version: VERSION,
+        highlight, highlightElement, clearHighlights, annotate, annotateBatch, clearAnnotations,
+        moveCursor, hideCursor, clear,
+    };
+})();
+""" % {"version": OVERLAY_VERSION}
+
+
+async def install_overlay(target: Union[BrowserContext, Page]) -> None:
+    """
+    Registers the runtime as an init script so every new document gets it, and
+    injects it into documents that are already loaded.
+    """
+    await target.add_init_script(OVERLAY_RUNTIME_SCRIPT)
+    pages = target.pages if isinstance(target, BrowserContext) else [target]
+    for page in pages:
+        try:
+            await page.evaluate(OVERLAY_RUNTIME_SCRIPT)
+        except Exception as e:
+            logger.warning(f"Could not inject overlay runtime into {page.url}: {e}")
+
+
+def _page_command(command: str) -> str:
+    return f"(args) => window.__auroraOverlay ? window.__auroraOverlay.{command}(...args) : '{_MISSING}'"
+
+
+def _element_command(command: str) -> str:
+    return f"(el, args) => window.__auroraOverlay ? window.__auroraOverlay.{command}(el, ...args) : '{_MISSING}'"
+
+
+async def _run_on_page(page: Page, command: str, *args: Any) -> Any:
+    result = await page.evaluate(_page_command(command), list(args))
+    if result == _MISSING:
+        # Document loaded before the runtime was registered: inject once and retry.
+        await page.evaluate(OVERLAY_RUNTIME_SCRIPT)
+        result = await page.evaluate(_page_command(command), list(args))
+    return result
+
+
+async def _run_on_locator(locator: Locator, command: str, *args: Any, timeout: Optional[float] = None) -> Any:
+    result = await locator.evaluate(_element_command(command), list(args), timeout=timeout)
+    if result == _MISSING:
+        await locator.page.evaluate(OVERLAY_RUNTIME_SCRIPT)
+        result = await locator.evaluate(_element_command(command), list(args), timeout=timeout)
+    return result
+
+
+async def highlight(page: Page, selectors: List[str]) -> int:
+    """Draws highlight boxes around the elements matching `selectors`, replacing earlier ones."""
+    return await _run_on_page(page, "highlight", selectors)
+
+
+async def highlight_locator(locator: Locator, timeout: Optional[float] = None) -> int:
+    """Highlights the element behind a Locator (waits for it to be attached)."""
+    return await _run_on_locator(locator, "highlightElement", timeout=timeout)
+
+
+async def clear_highlights(page: Page) -> None:
+    """Removes highlight boxes but keeps teacher annotations."""
+    await _run_on_page(page, "clearHighlights")
+
+
+async def annotate(page: Page, selector: str, color: str = "red", text: Optional[str] = None, scroll: bool = True) -> bool:
+    """Marks the element matching `selector` with a colored outline and an optional label."""
+    return await _run_on_page(page, "annotate", selector, color, text, scroll)
+
+
+async def annotate_locator(locator: Locator, color: str = "red", text: Optional[str] = None,
+                           scroll: bool = True, timeout: Optional[float] = None) -> bool:
+    """Like `annotate`, for the element behind a Locator."""
+    return await _run_on_locator(locator, "annotate", color, text, scroll, timeout=timeout)
+
+
+async def annotate_batch(page: Page, items: List[Dict[str, Any]]) -> int:
+    """
+    Annotates several elements in one call.
+
+    Args:
+        items: Dicts with `target` (CSS selector), `color`, optional `text` and `scroll`.
+    """
+    return await _run_on_page(page, "annotateBatch", items)
+
+
+async def clear(page: Page) -> None:
+    """Removes every highlight, annotation and the teacher cursor."""
+    await _run_on_page(page, "clear")
+
+
+async def move_cursor(page: Page, x: float, y: float, text: Optional[str] = None) -> None:
+    """Moves the teacher cursor to viewport coordinates, with an optional label."""
+    await _run_on_page(page, "moveCursor", x, y, text)
+
+
+async def hide_cursor(page: Page) -> None:
+    await _run_on_page(page, "hideCursor")
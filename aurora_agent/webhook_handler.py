@@ -0,0 +1,198 @@
+# File: session-bubble/aurora_agent/webhook_handler.py
+# in aurora_agent/webhook_handler.py
+"""
+Ingestion pipeline for Google Sheets change events posted by the Apps Script spy.
+
+An edit trigger can fire many near-identical events per second while a student
+types, so the HTTP handler only validates the payload, drops redelivered events
+(same delivery id, or same content and event timestamp) and enqueues it on a
+bounded queue. A single dispatcher drains the
+queue in short windows, keeps only the latest change per sheet/range within a
+window, and sends each affected user one batched `sheet_changes` message over
+their WebSocket.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .websocket_manager import websocket_manager
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+# Events for the same range that arrive within this window are merged into one change.
+WEBHOOK_COALESCE_WINDOW_MS = int(os.getenv("WEBHOOK_COALESCE_WINDOW_MS", "250"))
+# A delivery seen again within this long is treated as a retry and dropped.
+WEBHOOK_DEDUP_TTL_SECONDS = float(os.getenv("WEBHOOK_DEDUP_TTL_SECONDS", "10"))
+MAX_FINGERPRINTS = 10000
+DEFAULT_USER_ID = "default_teacher"
+
+# Payload keys carrying a per-delivery id, preferred when the sender provides one.
+_DELIVERY_ID_KEYS = ("delivery_id", "event_id")
+# Otherwise a delivery is identified by the edit plus the time it was made, so a
+# retry matches but making the same edit again (A -> B -> A) does not.
+_FINGERPRINT_KEYS = ("spreadsheet_id", "sheet_name", "range", "change_type", "value", "old_value", "user_email", "timestamp")
+
+RangeKey = Tuple[str, str, str, str]
+
+
+class WebhookQueueFullError(Exception):
+    """Raised when an event arrives while the ingestion queue is at capacity."""
+
+
+def _user_id(payload: Dict[str, Any]) -> str:
+    return str(payload.get("user_id") or payload.get("teacher_id") or DEFAULT_USER_ID)
+
+
+def fingerprint(user_id: str, payload: Dict[str, Any]) -> Optional[str]:
+    """
+    Stable hash identifying one delivery, or None when the payload has neither
+    a delivery id nor a timestamp; such events are never treated as duplicates
+    and near-repeats are left to the coalescing window.
+    """
+    for key in _DELIVERY_ID_KEYS:
+        if payload.get(key):
+            identity = [user_id, key, payload[key]]
+            break
+    else:
+        if not payload.get("timestamp"):
+            return None
+        identity = [user_id] + [payload.get(key) for key in _FINGERPRINT_KEYS]
+    return hashlib.sha1(json.dumps(identity, default=str).encode()).hexdigest()
+
+
+class WebhookHandler:
+    """Bounded, deduplicating, coalescing queue between the webhook endpoint and the WebSockets."""
+
+    def __init__(
+        self,
+        max_queued: int = WEBHOOK_QUEUE_SIZE,
+        window_ms: int = WEBHOOK_COALESCE_WINDOW_MS,
+        dedup_ttl: float = WEBHOOK_DEDUP_TTL_SECONDS,
+    ):
+        self.max_queued = max_queued
+        self.window = window_ms / 1000
+        self.dedup_ttl = dedup_ttl
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        # fingerprint -> time it was last seen, oldest first
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.stats = {"received": 0, "duplicates": 0, "dropped": 0, "coalesced": 0, "dispatched": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and not self._dispatcher.done()
+
+    def start(self):
+        """Starts the dispatcher. Must be called from the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._dispatcher = asyncio.create_task(self._dispatch_loop(), name="webhook-dispatcher")
+        logger.info(f"Webhook dispatcher started (queue {self.max_queued}, window {self.window * 1000:.0f}ms)")
+
+    async def stop(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        logger.info("Webhook dispatcher stopped")
+
+    async def process_webhook_event(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Entry point for `POST /webhook/sheets`: acknowledges without waiting for delivery."""
+        return await self.process_event(payload, _user_id(payload))
+
+    async def process_event(self, event: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        """
+        Enqueues a change event for `user_id`.
+
+        Raises:
+            WebhookQueueFullError: The dispatcher is too far behind to accept more events.
+        """
+        if not self.running:
+            self.start()
+        self.stats["received"] += 1
+
+        now = time.monotonic()
+        key = fingerprint(user_id, event)
+        if key is not None and self._is_duplicate(key, now):
+            self.stats["duplicates"] += 1
+            return {"status": "duplicate"}
+
+        try:
+            self._queue.put_nowait((user_id, event, now))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            if key is not None:
+                self._seen.pop(key, None)  # Let the sender's retry through
+            raise WebhookQueueFullError(f"Webhook queue is full ({self.max_queued} events waiting)")
+        return {"status": "accepted", "queued": self._queue.qsize()}
+
+    def _is_duplicate(self, key: str, now: float) -> bool:
+        while self._seen:
+            seen_at = next(iter(self._seen.values()))
+            if now - seen_at < self.dedup_ttl and len(self._seen) < MAX_FINGERPRINTS:
+                break
+            self._seen.popitem(last=False)
+        if key in self._seen:
+            return True
+        self._seen[key] = now
+        return False
+
+    async def _dispatch_loop(self):
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while True:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._dispatch(batch)
+            except Exception as e:
+                logger.error(f"Webhook dispatch failed for {len(batch)} events: {e}", exc_info=True)
+
+    async def _dispatch(self, batch: List[Tuple[str, Dict[str, Any], float]]):
+        # user_id -> range -> latest change, in first-seen order
+        changes: Dict[str, Dict[RangeKey, Dict[str, Any]]] = {}
+        for user_id, event, _ in batch:
+            key = (
+                str(event.get("spreadsheet_id", "")),
+                str(event.get("sheet_name", "")),
+                str(event.get("range", "")),
+                str(event.get("change_type", "")),
+            )
+            user_changes = changes.setdefault(user_id, {})
+            previous = user_changes.get(key)
+            if previous:
+                self.stats["coalesced"] += 1
+                count = previous["count"] + 1
+                previous.clear()
+                previous.update(event, count=count)
+            else:
+                user_changes[key] = dict(event, count=1)
+
+        for user_id, user_changes in changes.items():
+            if not websocket_manager.is_user_connected(user_id):
+                logger.debug(f"No WebSocket for {user_id}; discarding {len(user_changes)} sheet changes")
+                continue
+            await websocket_manager.send_to_user(user_id, {
+                "type": "sheet_changes",
+                "changes": list(user_changes.values()),
+                "events": sum(change["count"] for change in user_changes.values()),
+            })
+            self.stats["dispatched"] += len(user_changes)
+
+
+# Global instance, started by the FastAPI app
+webhook_handler = WebhookHandler()
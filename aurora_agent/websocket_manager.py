@@ -0,0 +1,219 @@
+# File: session-bubble/aurora_agent/websocket_manager.py
+# in aurora_agent/websocket_manager.py
+"""
+WebSocket connection manager for the teacher dashboards.
+
+A user may have several sockets open (tabs, devices). Every socket gets a
+bounded outbound queue drained by its own writer task, so one slow client can
+never block a broadcast or grow memory without limit: when its queue is full
+the oldest pending message is dropped. Messages are serialized once per
+broadcast, and heartbeats are answered without decoding JSON.
+
+Group membership is decided on the server: server code grants users access
+to a group (`grant_group`, e.g. the roster of a class) or installs its own
+`group_authorizer`, and a client's request to join a group is refused unless
+it is authorized. The app exposes grants through the `/ws/groups` admin
+endpoints, which are only enabled when WEBSOCKET_GROUP_ADMIN_TOKEN is set.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Union
+
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "32"))
+# Close a socket once it has dropped this many messages in a row without catching up.
+MAX_CONSECUTIVE_DROPS = int(os.getenv("WEBSOCKET_MAX_CONSECUTIVE_DROPS", "256"))
+# Shared secret for the group administration endpoints; unset disables them.
+GROUP_ADMIN_TOKEN = os.getenv("WEBSOCKET_GROUP_ADMIN_TOKEN")
+
+# Whole frames answered without decoding; a heartbeat with extra fields takes the JSON path
+_HEARTBEAT_FRAMES = frozenset({"ping", '{"type":"heartbeat"}', '{"type": "heartbeat"}'})
+
+Message = Union[str, Dict[str, Any]]
+
+
+class Connection:
+    """One open socket and its outbound queue."""
+    __slots__ = ("user_id", "websocket", "queue", "writer", "dropped", "connected_at")
+
+    def __init__(self, user_id: str, websocket: WebSocket):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.writer: Optional[asyncio.Task] = None
+        self.dropped = 0
+        self.connected_at = time.time()
+
+    def enqueue(self, text: str) -> bool:
+        """Queues a serialized message, dropping the oldest one if the client is behind."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            if self.dropped >= MAX_CONSECUTIVE_DROPS:
+                return False
+        self.queue.put_nowait(text)
+        return True
+
+
+def _serialize(message: Message) -> str:
+    return message if isinstance(message, str) else json.dumps(message, default=str)
+
+
+class WebSocketManager:
+    """Tracks sockets per user and per group and fans messages out to them."""
+
+    def __init__(self, group_authorizer: Optional[Callable[[str, str], bool]] = None):
+        self.connections: Dict[str, List[Connection]] = {}
+        self.groups: Dict[str, Set[str]] = {}
+        # Users allowed to join each group, granted by server code
+        self.group_grants: Dict[str, Set[str]] = {}
+        # (user_id, group) -> allowed; replaces the grant check when set
+        self.group_authorizer = group_authorizer
+
+    async def connect(self, user_id: str, websocket: WebSocket, groups: Iterable[str] = ()) -> Connection:
+        """
+        Accepts the socket, registers it for `user_id` and starts its writer.
+        `groups` are client-requested and only joined where authorized.
+        """
+        await websocket.accept()
+        connection = Connection(user_id, websocket)
+        connection.writer = asyncio.create_task(self._writer(connection))
+        self.connections.setdefault(user_id, []).append(connection)
+        for group in groups:
+            self.request_join(user_id, group)
+        logger.info(f"WebSocket connected for {user_id} ({len(self.connections[user_id])} open for this user)")
+        return connection
+
+    def disconnect(self, user_id: str, websocket: Optional[WebSocket] = None):
+        """Unregisters one socket of a user, or all of them when `websocket` is None."""
+        connections = self.connections.get(user_id, [])
+        for connection in [c for c in connections if websocket is None or c.websocket is websocket]:
+            connections.remove(connection)
+            if connection.writer and connection.writer is not asyncio.current_task():
+                connection.writer.cancel()
+        if not connections:
+            self.connections.pop(user_id, None)
+            for members in self.groups.values():
+                members.discard(user_id)
+            self.groups = {group: members for group, members in self.groups.items() if members}
+        logger.info(f"WebSocket disconnected for {user_id}")
+
+    async def _writer(self, connection: Connection):
+        try:
+            while True:
+                text = await connection.queue.get()
+                await connection.websocket.send_text(text)
+                if connection.queue.empty():
+                    connection.dropped = 0
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"WebSocket send to {connection.user_id} failed, dropping the socket: {e}")
+            self.disconnect(connection.user_id, connection.websocket)
+
+    def _enqueue(self, connection: Connection, text: str):
+        if not connection.enqueue(text):
+            logger.warning(f"WebSocket client {connection.user_id} is not keeping up, closing it")
+            self.disconnect(connection.user_id, connection.websocket)
+            asyncio.create_task(self._close(connection.websocket))
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013, reason="Client too slow")
+        except Exception:
+            pass
+
+    async def send_to_user(self, user_id: str, message: Message) -> int:
+        """Queues a message to every socket of a user. Returns the number of sockets."""
+        connections = list(self.connections.get(user_id, []))
+        if connections:
+            text = _serialize(message)
+            for connection in connections:
+                self._enqueue(connection, text)
+        return len(connections)
+
+    async def send_to_users(self, user_ids: Iterable[str], message: Message) -> int:
+        text = _serialize(message)
+        sent = 0
+        for user_id in user_ids:
+            sent += await self.send_to_user(user_id, text)
+        return sent
+
+    async def broadcast_to_group(self, group: str, message: Message) -> int:
+        """Sends to every connected member of a group (e.g. a whole class)."""
+        return await self.send_to_users(list(self.groups.get(group, ())), message)
+
+    async def broadcast(self, message: Message) -> int:
+        return await self.send_to_users(list(self.connections), message)
+
+    def grant_group(self, group: str, user_ids: Iterable[str]):
+        """Allows users to join a group (server side, e.g. a class roster)."""
+        self.group_grants.setdefault(group, set()).update(user_ids)
+
+    def revoke_group(self, group: str, user_ids: Optional[Iterable[str]] = None):
+        """Withdraws group access from some users (all when None) and removes them from it."""
+        granted = self.group_grants.get(group, set())
+        revoked = set(granted) if user_ids is None else set(user_ids)
+        granted -= revoked
+        if not granted:
+            self.group_grants.pop(group, None)
+        for user_id in revoked:
+            self.leave_group(user_id, group)
+
+    def is_authorized(self, user_id: str, group: str) -> bool:
+        if self.group_authorizer is not None:
+            return bool(self.group_authorizer(user_id, group))
+        return user_id in self.group_grants.get(group, ())
+
+    def request_join(self, user_id: str, group: str) -> bool:
+        """Joins a group on a client's request if the user is authorized for it."""
+        if not self.is_authorized(user_id, group):
+            logger.warning(f"Refused {user_id}'s request to join group '{group}'")
+            return False
+        self.join_group(user_id, group)
+        return True
+
+    def join_group(self, user_id: str, group: str):
+        """Adds a user to a group unconditionally; for server code, see `request_join`."""
+        self.groups.setdefault(group, set()).add(user_id)
+
+    def leave_group(self, user_id: str, group: str):
+        members = self.groups.get(group)
+        if members:
+            members.discard(user_id)
+            if not members:
+                del self.groups[group]
+
+    def get_active_users(self) -> List[str]:
+        return list(self.connections)
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.connections.values())
+
+    def is_user_connected(self, user_id: str) -> bool:
+        return bool(self.connections.get(user_id))
+
+    def handle_heartbeat(self, connection: Connection, raw: str) -> bool:
+        """
+        Answers a heartbeat straight from the raw frame, without decoding it.
+        Returns False if `raw` is not a canonical heartbeat frame.
+        """
+        if raw not in _HEARTBEAT_FRAMES:
+            return False
+        self.answer_heartbeat(connection)
+        return True
+
+    def answer_heartbeat(self, connection: Connection):
+        self._enqueue(connection, f'{{"type":"heartbeat_response","timestamp":"{datetime.utcnow().isoformat()}"}}')
+
+
+# Global instance
+websocket_manager = WebSocketManager()
@@ -0,0 +1,2 @@
+# File: session-bubble/benchmarks/__init__.py
+# Offline benchmarks for the parser layer (see parser_benchmark.py)
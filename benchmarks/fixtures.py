@@ -0,0 +1,211 @@
+# File: session-bubble/benchmarks/fixtures.py
+"""
+Synthetic page fixtures for the parser benchmark.
+
+Each fixture is a self-contained HTML document that mimics the DOM shape of
+an application the parsers target: a JupyterLab notebook (with a stand-in
+`window.jupyterapp` model), the Google Sheets chrome around a grid, and the
+Google Docs chrome around an editor body. Sheets and Docs chrome is generated
+from the locator catalogs, so catalog validation passes the way it does on
+the live apps. Content is deterministic (seeded), so reports are comparable
+across commits.
+"""
+
+import json
+import random
+import re
+from dataclasses import dataclass
+from html import escape
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class Fixture:
+    """A benchmark page, served at `url` so the parser registry picks its parser."""
+    name: str
+    url: str
+    build: Callable[[], str]
+
+
+_LOREM = (
+    "data frame value column index plot mean sum group filter chart total revenue region quarter "
+    "student lesson result average report model train test score feature sample"
+).split()
+
+_SELECTOR_TOKEN = re.compile(r"#([\w-]+)|\.([\w-]+)|\[([\w-]+)(\^?=)'([^']*)'\]")
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(_LOREM) for _ in range(count))
+
+
+def _element_for_selector(selector: str, role: str, name: str) -> str:
+    """Builds an element matched by a simple catalog selector (#id, .class, [attr='v'], [attr^='v'])."""
+    attributes: Dict[str, str] = {"role": role}
+    classes: List[str] = []
+    for element_id, class_name, attribute, operator, value in _SELECTOR_TOKEN.findall(selector):
+        if element_id:
+            attributes["id"] = element_id
+        elif class_name:
+            classes.append(class_name)
+        else:
+            # Prefix matches carry a shortcut suffix, as the real toolbar labels do
+            attributes[attribute] = value + (" (Ctrl+Alt+K)" if operator == "^=" else "")
+    attributes.setdefault("aria-label", name)
+    if classes:
+        attributes["class"] = " ".join(classes)
+    rendered = " ".join(f'{key}="{escape(value)}"' for key, value in attributes.items())
+    return f'<div {rendered} tabindex="0"><span class="icon"></span>{escape(name)}</div>'
+
+
+def _catalog_chrome(name: str, skip: Tuple[str, ...] = ()) -> Tuple[str, str]:
+    """Returns (menu bar, toolbar) HTML for the entries of a locator catalog, except `skip`."""
+    from aurora_agent.parsers.catalog_parser import load_catalog
+
+    menus, tools = [], []
+    for entry in load_catalog(name).entries:
+        if entry.id in skip:
+            continue
+        html = _element_for_selector(entry.selector, entry.role, entry.name)
+        (menus if entry.id.startswith("menu-") else tools).append(html)
+    return (
+        f'<div id="docs-menubar" role="menubar">{"".join(menus)}</div>',
+        f'<div id="docs-toolbar" role="toolbar" aria-label="Main toolbar">{"".join(tools)}</div>',
+    )
+
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>body{{margin:0;font:13px sans-serif}} [role=button],[role=menuitem]{{display:inline-block;padding:4px}}
+td{{border:1px solid #ddd;min-width:60px;height:20px}} .jp-Cell{{border:1px solid #eee;margin:4px}}</style>
+</head><body>{body}<script>{script}</script></body></html>"""
+
+
+# --- JupyterLab ---
+
+def jupyter_notebook(cells: int, rendered: int = None, seed: int = 7) -> str:
+    """A JupyterLab notebook with `cells` cells; only the first `rendered` are in the DOM (windowing)."""
+    rng = random.Random(seed)
+    rendered = cells if rendered is None else min(rendered, cells)
+    model, nodes = [], []
+    for i in range(cells):
+        code = i % 4 != 0
+        lines = [_words(rng, rng.randint(3, 9)) for _ in range(rng.randint(1, 8))]
+        source = "\n".join(f"{line.split()[0]} = {line.replace(' ', '_')}()" for line in lines) if code else "## " + "\n".join(lines)
+        outputs = rng.randint(0, 2) if code else 0
+        model.append({"type": "code" if code else "markdown", "source": source, "execution_count": i + 1 if code else None, "outputs": outputs})
+        if i >= rendered:
+            continue
+        editor_lines = "".join(f'<div class="cm-line">{escape(line)}</div>' for line in source.split("\n"))
+        output_html = "".join(
+            f'<div class="jp-OutputArea-child"><div class="jp-OutputPrompt">[{i + 1}]:</div>'
+            f'<div class="jp-RenderedText"><pre>{escape(_words(rng, 12))}</pre></div></div>'
+            for _ in range(outputs)
+        )
+        nodes.append(
+            f'<div class="jp-Cell {"jp-CodeCell" if code else "jp-MarkdownCell"}{" jp-mod-active" if i == 0 else ""}" data-windowed-list-index="{i}">'
+            f'<div class="jp-Cell-inputWrapper"><div class="jp-InputPrompt">{f"[{i + 1}]:" if code else ""}</div>'
+            f'<div class="jp-InputArea-editor"><div class="cm-editor"><div class="cm-scroller">'
+            f'<div class="cm-content" contenteditable="true" role="textbox">{editor_lines}</div></div></div></div></div>'
+            f'<div class="jp-Cell-outputWrapper"><div class="jp-Cell-outputArea jp-OutputArea">{output_html}</div></div></div>'
+        )
+    commands = {
+        "notebook:run-cell-and-select-next": "Run", "notebook:run-all-cells": "Run All Cells",
+        "notebook:insert-cell-below": "Insert Cell Below", "notebook:delete-cell": "Delete Cell",
+        "notebook:change-cell-to-code": "Change to Code Cell Type", "notebook:change-cell-to-markdown": "Change to Markdown Cell Type",
+        "notebook:interrupt-kernel": "Interrupt Kernel", "notebook:restart-kernel": "Restart Kernel",
+        "docmanager:save": "Save Notebook",
+    }
+    toolbar = "".join(
+        f'<jp-button class="jp-ToolbarButtonComponent" data-command="{command}" title="{label}" role="button" tabindex="0">{label}</jp-button>'
+        for command, label in list(commands.items())[:5] + [("docmanager:save", "Save Notebook")]
+    )
+    body = (
+        '<div class="jp-LabShell"><div id="jp-top-panel" role="menubar">'
+        + "".join(f'<li class="lm-MenuBar-item" role="menuitem">{menu}</li>' for menu in ("File", "Edit", "View", "Run", "Kernel", "Tabs", "Settings", "Help"))
+        + '</div><div class="jp-NotebookPanel"><div class="jp-NotebookPanel-toolbar" role="toolbar">' + toolbar
+        + '</div><div class="jp-WindowedPanel-outer"><div class="jp-Notebook">' + "".join(nodes) + "</div></div></div></div>"
+    )
+    script = """
+const MODEL = %s, COMMANDS = %s;
+const nodes = [...document.querySelectorAll('.jp-Notebook .jp-Cell')];
+const notebook = {
+    activeCellIndex: 0,
+    widgets: MODEL.map((cell, i) => ({node: nodes[i] || document.createElement('div')})),
+    model: {cells: {length: MODEL.length, get: (i) => ({
+        type: MODEL[i].type, executionCount: MODEL[i].execution_count,
+        sharedModel: {getSource: () => MODEL[i].source}, outputs: {length: MODEL[i].outputs},
+    })}},
+    scrollToItem: async (i) => {},
+};
+window.jupyterapp = {
+    commands: {hasCommand: (id) => id in COMMANDS, label: (id) => COMMANDS[id], isEnabled: () => true, execute: async () => {}},
+    shell: {currentWidget: {content: notebook, context: {path: 'benchmark.ipynb'},
+            sessionContext: {kernelDisplayName: 'Python 3 (ipykernel)', session: {kernel: {status: 'idle'}}}}},
+};
+""" % (json.dumps(model), json.dumps(commands))
+    return _PAGE.format(title="benchmark.ipynb - JupyterLab", body=body, script=script)
+
+
+# --- Google Sheets ---
+
+def sheets_workbook(rows: int, columns: int = 26, seed: int = 11) -> str:
+    """The Sheets chrome around a `rows` x `columns` grid."""
+    rng = random.Random(seed)
+    # The grid chrome entries are laid out by hand below
+    menubar, toolbar = _catalog_chrome("sheets", skip=("name-box", "formula-bar", "add-sheet"))
+    header = "".join(f"<th>{chr(65 + c % 26)}</th>" for c in range(columns))
+    grid_rows = "".join(
+        f'<tr><th>{r + 1}</th>' + "".join(
+            f"<td>{rng.randint(0, 9999) if rng.random() < 0.6 else ''}</td>" for _ in range(columns)
+        ) + "</tr>"
+        for r in range(rows)
+    )
+    tabs = "".join(
+        f'<div class="docs-sheet-tab{" docs-sheet-active-tab" if i == 0 else ""}" role="button">'
+        f'<span class="docs-sheet-tab-name">Sheet{i + 1}</span></div>'
+        for i in range(4)
+    )
+    body = (
+        f'<div id="docs-chrome">{menubar}{toolbar}'
+        '<div id="formula-bar"><input id="t-name-box" role="combobox" aria-label="Name box" value="A1">'
+        '<div id="t-formula-bar-input" role="textbox" aria-label="Formula bar" contenteditable="true"></div></div></div>'
+        f'<div id="waffle-grid-container"><table class="waffle"><thead><tr><th></th>{header}</tr></thead>'
+        f"<tbody>{grid_rows}</tbody></table></div>"
+        f'<div id="grid-bottom-bar"><div class="docs-sheet-add" role="button" aria-label="Add Sheet">+</div>{tabs}</div>'
+    )
+    return _PAGE.format(title="Benchmark - Google Sheets", body=body, script="")
+
+
+# --- Google Docs ---
+
+def docs_document(paragraphs: int, seed: int = 13) -> str:
+    """The Docs chrome around an editor with `paragraphs` paragraphs."""
+    rng = random.Random(seed)
+    menubar, toolbar = _catalog_chrome("docs", skip=("document-body",))
+    lines = []
+    for i in range(paragraphs):
+        spans = "".join(
+            f'<span class="kix-wordhtmlgenerator-word-node">{escape(_words(rng, rng.randint(2, 6)))} </span>'
+            for _ in range(rng.randint(1, 3))
+        )
+        link = f'<a href="https://example.com/{i}">{escape(_words(rng, 2))}</a>' if i % 25 == 0 else ""
+        lines.append(f'<div class="kix-paragraphrenderer"><div class="kix-lineview">{spans}{link}</div></div>')
+    editor = (
+        '<div class="kix-appview-editor" role="document" aria-label="Document content">'
+        f'<div class="kix-page" role="presentation">{"".join(lines)}</div></div>'
+    )
+    body = f'<div id="docs-chrome">{menubar}{toolbar}</div>{editor}'
+    return _PAGE.format(title="Benchmark - Google Docs", body=body, script="")
+
+
+FIXTURES = [
+    Fixture("jupyter-10", "http://localhost:8888/lab/tree/benchmark.ipynb", lambda: jupyter_notebook(10)),
+    Fixture("jupyter-100", "http://localhost:8888/lab/tree/benchmark.ipynb", lambda: jupyter_notebook(100)),
+    Fixture("jupyter-500", "http://localhost:8888/lab/tree/benchmark.ipynb", lambda: jupyter_notebook(500)),
+    Fixture("jupyter-500-windowed", "http://localhost:8888/lab/tree/benchmark.ipynb", lambda: jupyter_notebook(500, rendered=40)),
+    Fixture("sheets-small", "https://docs.google.com/spreadsheets/d/benchmark/edit", lambda: sheets_workbook(35)),
+    Fixture("sheets-large", "https://docs.google.com/spreadsheets/d/benchmark/edit", lambda: sheets_workbook(1800)),
+    Fixture("docs-small", "https://docs.google.com/document/d/benchmark/edit", lambda: docs_document(250)),
+    Fixture("docs-large", "https://docs.google.com/document/d/benchmark/edit", lambda: docs_document(12500)),
+]
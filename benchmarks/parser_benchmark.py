@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# File: session-bubble/benchmarks/parser_benchmark.py
+"""
+Parser Benchmark
+================
+
+Runs every parser in `aurora_agent/parsers` against the synthetic fixtures in
+`benchmarks/fixtures.py` in a local headless Chromium (all requests are
+answered from the fixtures; nothing touches the network) and writes a JSON
+report that can be compared across commits.
+
+For each fixture and parser it measures three phases on a fresh page:
+  - cold:    the first parse of the page
+  - warm:    repeated parses with nothing changed (median of --repeat runs)
+  - mutated: a parse after a small DOM change (median of --repeat runs)
+and records wall time, browser round trips and output size. A round trip is
+one awaited call into Playwright (evaluate, CDP `send`, locator action, ...),
+each of which is at least one CDP request/response pair.
+
+Usage:
+    python -m benchmarks.parser_benchmark [--repeat 5] [--fixtures jupyter,sheets]
+                                          [--output report.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.fixtures import FIXTURES, Fixture  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+VIEWPORT = {"width": 1280, "height": 800}
+
+# A small change the incremental parsers should handle without a rescan
+MUTATE_SCRIPT = """(n) => {
+    const button = document.createElement('button');
+    button.textContent = 'Benchmark ' + n;
+    (document.querySelector('[role="toolbar"]') || document.body).appendChild(button);
+}"""
+
+
+class RoundTripCounter:
+    """Wraps Playwright objects and counts the awaited calls made through them."""
+
+    def __init__(self):
+        self.count = 0
+
+    def wrap(self, value: Any) -> Any:
+        module = type(value).__module__ or ""
+        if module.startswith("playwright.async_api") and not isinstance(value, (str, bytes, dict, list)):
+            return _Counted(value, self)
+        return value
+
+
+def _unwrap(value: Any) -> Any:
+    return value._target if isinstance(value, _Counted) else value
+
+
+class _Counted:
+    def __init__(self, target: Any, counter: RoundTripCounter):
+        self._target = target
+        self._counter = counter
+
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        counter = self._counter
+        if inspect.iscoroutinefunction(value):
+            async def call(*args, **kwargs):
+                counter.count += 1
+                result = await value(*map(_unwrap, args), **{k: _unwrap(v) for k, v in kwargs.items()})
+                return counter.wrap(result)
+            return call
+        if callable(value):
+            def call(*args, **kwargs):
+                return counter.wrap(value(*map(_unwrap, args), **{k: _unwrap(v) for k, v in kwargs.items()}))
+            return call
+        return counter.wrap(value)
+
+
+def parsers_for(fixture: Fixture) -> List[type]:
+    """The parser the registry picks for the fixture, plus the general-purpose parsers as baselines."""
+    from aurora_agent.parsers import AccessibilityParser, GenericParser, get_parser_for_url
+
+    selected = type(get_parser_for_url(fixture.url))
+    return list(dict.fromkeys([selected, GenericParser, AccessibilityParser]))
+
+
+async def _measure(parser, page, counter: RoundTripCounter) -> Dict[str, Any]:
+    counter.count = 0
+    started = time.perf_counter()
+    elements = await parser.get_interactive_elements(page)
+    wall_ms = (time.perf_counter() - started) * 1000
+    return {
+        "wall_ms": round(wall_ms, 2),
+        "round_trips": counter.count,
+        "elements": len(elements),
+        "bytes": len(json.dumps(elements, default=str)),
+    }
+
+
+def _median(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in samples[0]}
+
+
+async def run(fixtures: List[Fixture], repeat: int) -> List[Dict[str, Any]]:
+    from playwright.async_api import async_playwright
+
+    results = []
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        context = await browser.new_context(viewport=VIEWPORT)
+        pages_html: Dict[str, str] = {}
+
+        async def serve(route):
+            html = pages_html.get(route.request.url)
+            if html is None or route.request.resource_type != "document":
+                await route.abort()
+            else:
+                await route.fulfill(status=200, content_type="text/html", body=html)
+
+        await context.route("**/*", serve)
+        try:
+            for fixture in fixtures:
+                pages_html.clear()
+                pages_html[fixture.url] = fixture.build()
+                for parser_class in parsers_for(fixture):
+                    page = await context.new_page()
+                    await page.goto(fixture.url, wait_until="load")
+                    nodes = await page.evaluate("() => document.getElementsByTagName('*').length")
+                    counter = RoundTripCounter()
+                    counted_page = counter.wrap(page)
+                    parser = parser_class()
+                    cold = await _measure(parser, counted_page, counter)
+                    warm = _median([await _measure(parser, counted_page, counter) for _ in range(repeat)])
+                    mutated = []
+                    for n in range(repeat):
+                        await page.evaluate(MUTATE_SCRIPT, n)
+                        mutated.append(await _measure(parser, counted_page, counter))
+                    await page.close()
+                    result = {
+                        "fixture": fixture.name,
+                        "nodes": nodes,
+                        "parser": parser_class.__name__,
+                        "cold": cold,
+                        "warm": warm,
+                        "mutated": _median(mutated),
+                    }
+                    results.append(result)
+                    print(
+                        f"{fixture.name:<22} {nodes:>6} nodes  {parser_class.__name__:<20} "
+                        f"cold {cold['wall_ms']:>8.1f}ms/{cold['round_trips']:>3} rt  "
+                        f"warm {warm['wall_ms']:>8.1f}ms/{warm['round_trips']:>3} rt  "
+                        f"{cold['elements']:>4} elements {cold['bytes'] / 1024:>7.1f} KB"
+                    )
+        finally:
+            await browser.close()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=ROOT, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]):
+    """Prints the change of every metric against a baseline report."""
+    previous = {(r["fixture"], r["parser"]): r for r in baseline["results"]}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for result in report["results"]:
+        old = previous.get((result["fixture"], result["parser"]))
+        if not old:
+            continue
+        changes = []
+        for phase in ("cold", "warm", "mutated"):
+            if phase not in old:
+                continue
+            before, after = old[phase], result[phase]
+            ratio = after["wall_ms"] / before["wall_ms"] if before["wall_ms"] else 1.0
+            changes.append(
+                f"{phase} {ratio:>5.2f}x time, {after['round_trips'] - before['round_trips']:+g} rt, "
+                f"{after['bytes'] - before['bytes']:+g} B"
+            )
+        print(f"  {result['fixture']:<22} {result['parser']:<20} " + " | ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the page parsers on synthetic fixtures")
+    parser.add_argument("--fixtures", default="", help="Comma-separated fixture name prefixes (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm and mutated runs per parser; the median is reported")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/parsers-<commit>.json)")
+    parser.add_argument("--compare", help="Baseline report to compare against")
+    args = parser.parse_args()
+
+    prefixes = [prefix for prefix in args.fixtures.split(",") if prefix]
+    fixtures = [f for f in FIXTURES if not prefixes or any(f.name.startswith(p) for p in prefixes)]
+    if not fixtures:
+        print(f"❌ No fixture matches {args.fixtures!r}")
+        sys.exit(2)
+
+    results = asyncio.run(run(fixtures, max(1, args.repeat)))
+
+    import playwright
+
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "playwright": getattr(playwright, "__version__", None),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"parsers-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Report written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
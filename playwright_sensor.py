@@ -31,6 +31,7 @@ import traceback
 from datetime import datetime
 from typing import Dict, Any, Optional, Set
 from playwright.async_api import async_playwright, Browser, Page, Playwright
+from aurora_agent.parsers.readiness import goto_and_wait_until_ready
 
 # Configure logging
 logging.basicConfig(
@@ -354,7 +355,7 @@ class BrowserInteractionSensor:
             
             # Navigate to target URL
             if target_url != 'about:blank':
-                await self.page.goto(target_url, wait_until='domcontentloaded')
+                await goto_and_wait_until_ready(self.page, target_url)
             
             logger.info("Browser monitoring started successfully")
             
@@ -483,7 +484,7 @@ class SensorWebSocketServer:
                 url = data.get('url')
                 if url and self.sensor.page:
                     logger.info(f"Frontend requested navigation to: {url}")
-                    await self.sensor.page.goto(url, wait_until='domcontentloaded')
+                    await goto_and_wait_until_ready(self.sensor.page, url)
                     await websocket.send(json.dumps({
                         'success': True,
                         'message': f'Navigated to {url}',
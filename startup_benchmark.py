@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# File: session-bubble/startup_benchmark.py
+"""
+Startup Benchmark
+=================
+
+Imports `app` in a fresh interpreter with `python -X importtime`, prints the
+slowest imports and fails if the total exceeds the import-time budget or if a
+subsystem that should load on first use was imported eagerly.
+
+Usage:
+    python startup_benchmark.py [--budget-ms 1200] [--top 15] [--runs 3]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+DEFAULT_BUDGET_MS = int(os.getenv("IMPORT_TIME_BUDGET_MS", "1200"))
+
+# Heavy packages that must only be imported when their feature is first used.
+LAZY_MODULES = (
+    "google.adk",
+    "google.genai",
+    "google.generativeai",
+    "google_auth_oauthlib",
+    "playwright",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def measure(module: str):
+    """Returns [(module, self_us, cumulative_us, depth)] for a cold import of `module`."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        tail = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))
+        raise RuntimeError(f"Importing {module} failed:\n{tail}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and budget the import time of app.py")
+    parser.add_argument("--module", default="app", help="Module to import (default: app)")
+    parser.add_argument("--budget-ms", type=int, default=DEFAULT_BUDGET_MS, help="Fail above this many milliseconds")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="Cold imports to run; the fastest one is reported")
+    args = parser.parse_args()
+
+    # The fastest of several runs filters out noise from the machine, not from the code
+    runs = [measure(args.module) for _ in range(max(1, args.runs))]
+    rows = min(runs, key=lambda rows: next(cumulative for name, _, cumulative, _ in rows if name == args.module))
+    total_ms = next(cumulative for name, _, cumulative, _ in rows if name == args.module) / 1000
+
+    print(f"Import time of '{args.module}': {total_ms:.0f} ms (budget {args.budget_ms} ms, best of {len(runs)})")
+    print("\nSlowest top-level imports:")
+    top_level = sorted((row for row in rows if row[3] == 1), key=lambda row: row[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds the {args.budget_ms} ms budget")
+    eager = sorted({prefix for name, *_ in rows for prefix in LAZY_MODULES if name == prefix or name.startswith(prefix + ".")})
+    if eager:
+        failures.append(f"imported eagerly, should load on first use: {', '.join(eager)}")
+
+    if failures:
+        print("\n❌ Startup benchmark failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ Startup benchmark passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+# File: session-bubble/tests/test_browser_profile.py
+"""Unit tests for per-session profile clones."""
+import asyncio
+import os
+
+from aurora_agent.browser_manager import BrowserManager
+from aurora_agent.browser_profile import clone_profile
+
+
+def test_clone_skips_process_locks_and_is_removed_on_close(tmp_path):
+    base = tmp_path / "profile"
+    (base / "Default").mkdir(parents=True)
+    (base / "Default" / "Preferences").write_text("{}")
+    (base / "SingletonLock").write_text("")
+
+    clone = clone_profile(str(base), "lesson/1", str(tmp_path / "clones"))
+    assert os.path.basename(clone) == "lesson_1"
+    assert os.path.exists(os.path.join(clone, "Default", "Preferences"))
+    assert not os.path.exists(os.path.join(clone, "SingletonLock"))
+
+    manager = BrowserManager()
+    manager.profile_clone_dir = clone
+    asyncio.run(manager.close_browser())
+    assert not os.path.exists(clone)
+    assert manager.profile_clone_dir is None
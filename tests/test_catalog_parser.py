@@ -0,0 +1,42 @@
+# File: session-bubble/tests/test_catalog_parser.py
+"""Unit tests for the catalog-backed Sheets parser."""
+import asyncio
+
+from aurora_agent.parsers import SheetsParser
+from aurora_agent.parsers import catalog_parser
+from aurora_agent.parsers.element_index import UID_ATTRIBUTE
+
+
+class FakeSheetsPage:
+    url = "https://docs.google.com/spreadsheets/d/test/edit"
+
+    def __init__(self):
+        self.live_fields = None
+
+    async def evaluate(self, script, arg=None):
+        if script is catalog_parser.VALIDATE_SCRIPT:
+            return {"bold": '[data-aurora-catalog="bold"]', "italic": None}
+        if script is catalog_parser.LIVE_STATE_SCRIPT:
+            self.live_fields = arg[0]
+            return {"name-box": "B2:C4", "formula-bar": "=SUM(A1:A3)"}
+        raise RuntimeError("element index unavailable")
+
+
+def _parse():
+    page = FakeSheetsPage()
+    elements = asyncio.run(SheetsParser().get_interactive_elements(page))
+    return page, {element["uid"]: element for element in elements}
+
+
+def test_grid_selection_is_read_live():
+    page, elements = _parse()
+    assert {field["id"] for field in page.live_fields} == {"name-box", "formula-bar"}
+    assert elements["catalog-name-box"]["value"] == "B2:C4"
+    assert elements["catalog-formula-bar"]["value"] == "=SUM(A1:A3)"
+
+
+def test_validation_overrides_do_not_use_index_uids():
+    _, elements = _parse()
+    assert "catalog-italic" not in elements
+    assert elements["catalog-bold"]["playwright_locator"] == 'page.locator("[data-aurora-catalog=\\"bold\\"]")'
+    assert catalog_parser.CATALOG_ATTRIBUTE != UID_ATTRIBUTE
@@ -0,0 +1,125 @@
+# File: session-bubble/tests/test_code_cache.py
+"""Unit tests for the generated-code cache: tiers, eviction and persistence."""
+import asyncio
+
+from aurora_agent.ui_tools.code_cache import CodeCache
+
+SHEETS_URL = "https://docs.google.com/spreadsheets/d/test/edit"
+SCREEN_A = [{"playwright_locator": 'page.locator("#insert")'}]
+SCREEN_B = SCREEN_A + [{"playwright_locator": 'page.locator("#dialog")'}]
+INSERT_CODE = 'await page.locator("#insert").click()'
+UID_CODE = 'await page.locator("[data-aurora-uid=\\"el-3\\"]").click()'
+
+
+class FakeLocator:
+    def __init__(self, matches):
+        self.matches = matches
+
+    async def count(self):
+        return self.matches
+
+
+class FakePage:
+    url = SHEETS_URL
+
+    def __init__(self, counts):
+        self.counts = counts
+
+    def locator(self, selector):
+        return FakeLocator(self.counts.get(selector, 0))
+
+
+def _cache(tmp_path, **kwargs):
+    return CodeCache(path=str(tmp_path / "cache.json"), use_embeddings=False, **kwargs)
+
+
+async def _store(cache, prompt, elements, code, url=SHEETS_URL):
+    cache.remember(url, prompt, elements, code)
+    await cache.record_result(code, True)
+
+
+def test_exact_and_request_tiers(tmp_path):
+    async def scenario():
+        cache = _cache(tmp_path)
+        await _store(cache, "Open the Insert menu", SCREEN_A, INSERT_CODE)
+        page = FakePage({"#insert": 1})
+        exact = await cache.lookup(page, "open the insert menu!", SCREEN_A)
+        changed = await cache.lookup(page, "Open the Insert menu", SCREEN_B)
+        other = await cache.lookup(page, "Open the Format menu", SCREEN_A)
+        return cache.stats, exact, changed, other
+
+    stats, exact, changed, other = asyncio.run(scenario())
+    assert exact == changed == INSERT_CODE
+    assert other is None
+    assert (stats["exact_hits"], stats["request_hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_similar_tier_requires_matching_literals(tmp_path):
+    async def scenario():
+        cache = CodeCache(path=str(tmp_path / "cache.json"), use_embeddings=True)
+
+        async def embed(prompt):
+            return [1.0, 0.0]
+
+        cache._embed = embed
+        await _store(cache, "make cell B2 bold", SCREEN_A, INSERT_CODE)
+        page = FakePage({"#insert": 1})
+        return (await cache.lookup(page, "set B2 to bold", SCREEN_A),
+                await cache.lookup(page, "set C7 to bold", SCREEN_A))
+
+    same_literals, other_literals = asyncio.run(scenario())
+    assert same_literals == INSERT_CODE
+    assert other_literals is None
+
+
+def test_per_load_uid_scripts_are_only_reused_on_the_same_screen(tmp_path):
+    async def scenario():
+        cache = _cache(tmp_path)
+        await _store(cache, "click the chart", SCREEN_A, UID_CODE)
+        page = FakePage({'[data-aurora-uid="el-3"]': 1})
+        return (await cache.lookup(page, "click the chart", SCREEN_B),
+                await cache.lookup(page, "click the chart", SCREEN_A))
+
+    other_screen, same_screen = asyncio.run(scenario())
+    assert other_screen is None
+    assert same_screen == UID_CODE
+
+
+def test_ambiguous_or_missing_targets_are_dropped(tmp_path):
+    async def scenario():
+        cache = _cache(tmp_path)
+        await _store(cache, "open insert", SCREEN_A, INSERT_CODE)
+        ambiguous = await cache.lookup(FakePage({"#insert": 2}), "open insert", SCREEN_A)
+        return cache, ambiguous
+
+    cache, ambiguous = asyncio.run(scenario())
+    assert ambiguous is None
+    assert cache.stats["stale"] == 1
+    assert not cache._entries
+
+
+def test_failed_reuse_evicts_and_lru_bounds_size(tmp_path):
+    async def scenario():
+        cache = _cache(tmp_path, max_entries=2)
+        for i in range(3):
+            await _store(cache, f"task {i}", SCREEN_A, f'await page.locator("#b{i}").click()')
+        prompts = [entry.prompt for entry in cache._entries.values()]
+        page = FakePage({"#b2": 1})
+        code = await cache.lookup(page, "task 2", SCREEN_A)
+        await cache.record_result(code, False)
+        return cache, prompts
+
+    cache, prompts = asyncio.run(scenario())
+    assert prompts == ["task 1", "task 2"]
+    assert cache.stats["evicted"] == 1
+    assert [entry.prompt for entry in cache._entries.values()] == ["task 1"]
+
+
+def test_entries_persist_across_instances(tmp_path):
+    async def scenario():
+        await _store(_cache(tmp_path), "open insert", SCREEN_A, INSERT_CODE)
+        # Code that does not parse into a plan is never cached
+        await _store(_cache(tmp_path), "run it", SCREEN_A, "page.evaluate('x')")
+        return await _cache(tmp_path).lookup(FakePage({"#insert": 1}), "open insert", SCREEN_A)
+
+    assert asyncio.run(scenario()) == INSERT_CODE
@@ -0,0 +1,72 @@
+# File: session-bubble/tests/test_element_context.py
+"""Unit tests for the element context builder."""
+import asyncio
+import json
+
+from aurora_agent.ui_tools.element_context import build_element_context, sanitize_element
+
+
+class FakeLocator:
+    """Stands in for a Playwright Locator, which is not JSON data."""
+
+
+def _build(request, elements, budget=2000):
+    return asyncio.run(build_element_context(request, elements, token_budget=budget, use_embeddings=False))
+
+
+def test_sanitize_drops_only_non_json_values():
+    element = {
+        "name": "Insert",
+        "locator": FakeLocator(),
+        "bounds": {"x": 10, "y": None, "handle": FakeLocator()},
+        "classes": ["btn", FakeLocator()],
+        "visible": True,
+        "enabled": False,
+        "text": "",
+    }
+    assert sanitize_element(element) == {
+        "name": "Insert",
+        "bounds": {"x": 10, "y": None},
+        "classes": ["btn"],
+        "enabled": False,
+    }
+
+
+def test_duplicates_are_removed_in_page_order():
+    elements = [
+        {"name": "Save", "playwright_locator": "page.get_by_role('button', name='Save')", "index": 1},
+        {"name": "Save", "playwright_locator": "page.get_by_role('button', name='Save')", "index": 2},
+        {"name": "Share", "role": "button"},
+        {"name": "Share", "role": "button", "locator": FakeLocator()},
+    ]
+    context, stats = _build("anything", elements)
+    kept = json.loads(context)
+    assert [element["name"] for element in kept] == ["Save", "Share"]
+    assert kept[0]["index"] == 1
+    assert stats["duplicates"] == 2
+
+
+def test_elements_matching_the_request_rank_first():
+    elements = [
+        {"name": "File", "role": "menuitem"},
+        {"name": "Format", "role": "menuitem"},
+        {"name": "Insert", "role": "menuitem", "description": "Insert rows and columns"},
+        {"name": "Help", "role": "menuitem"},
+    ]
+    context, _ = _build("click Insert to add a row", elements)
+    names = [element["name"] for element in json.loads(context)]
+    assert names[0] == "Insert"
+    assert names[1:] == ["File", "Format", "Help"]
+
+
+def test_budget_keeps_the_best_elements_that_fit():
+    elements = [{"name": f"Button {i}", "role": "button"} for i in range(50)]
+    elements.append({"name": "Merge cells", "role": "button", "description": "x" * 400})
+    elements.append({"name": "Merge", "role": "button"})
+    context, stats = _build("merge", elements, budget=60)
+    kept = json.loads(context)
+    assert stats["tokens_after"] <= 60
+    # The long description does not fit, but the shorter, equally named control does
+    assert kept[0]["name"] == "Merge"
+    assert all(element["name"] != "Merge cells" for element in kept)
+    assert stats["elements_kept"] == len(kept) < stats["elements_in"]
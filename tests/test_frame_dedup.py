@@ -0,0 +1,69 @@
+# File: session-bubble/tests/test_frame_dedup.py
+"""Unit tests for perceptual screenshot deduplication."""
+import asyncio
+import gc
+import io
+
+from PIL import Image, ImageDraw
+
+from aurora_agent.frame_dedup import FrameDeduplicator, page_key
+
+
+def _png(marks=()) -> bytes:
+    image = Image.new("RGB", (200, 100), "white")
+    draw = ImageDraw.Draw(image)
+    for box in marks:
+        draw.rectangle(box, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_identical_frames_are_unchanged():
+    dedup = FrameDeduplicator()
+    assert dedup.compare("page", _png()).changed
+    assert not dedup.compare("page", _png()).changed
+
+
+def test_a_caret_sized_change_is_detected():
+    dedup = FrameDeduplicator()
+    dedup.compare("page", _png())
+    diff = dedup.compare("page", _png([(50, 40, 51, 55)]))  # 2 x 16 px, like a text caret
+    assert diff.changed
+    assert diff.bbox == (50, 40, 52, 56)
+
+
+def test_page_keys_are_not_reused():
+    class Page:
+        pass
+
+    first = Page()
+    first_key = page_key(first)
+    assert page_key(first) == first_key
+    del first
+    gc.collect()
+    assert page_key(Page()) != first_key
+
+
+def test_feedback_skips_the_diff_when_nothing_uses_it():
+    from aurora_agent.tools.jupyter.screenshot_feedback import ScreenshotFeedbackSystem
+
+    class Page:
+        async def screenshot(self, **kwargs):
+            return _png()
+
+    sent = []
+    feedback = ScreenshotFeedbackSystem(skip_unchanged=False, send_changed_region=False)
+
+    async def send(payload):
+        sent.append(payload)
+        return True
+
+    async def page_info(page):
+        return {}
+
+    feedback._send_to_langgraph = send
+    feedback._get_page_info = page_info
+    asyncio.run(feedback.capture_and_send_feedback(Page(), "click", "ok"))
+    assert feedback.deduplicator.frames_seen == 0
+    assert set(sent[0]["screenshot"]) == {"data", "format", "encoding"}
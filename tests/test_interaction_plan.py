@@ -0,0 +1,105 @@
+# File: session-bubble/tests/test_interaction_plan.py
+"""Unit tests for the interaction plan IR (no browser needed)."""
+import asyncio
+from unittest import mock
+
+import pytest
+
+from aurora_agent.ui_tools import interaction_plan
+from aurora_agent.ui_tools.interaction_plan import execute_plan, parse_interaction_code
+
+
+def _actions(plan):
+    return [(step.action, step.target, step.annotate) for step in plan.steps]
+
+
+def test_highlight_is_fused_with_the_action_on_the_same_element():
+    plan = parse_interaction_code(
+        "await highlight_element(page, page.get_by_role('button', name='Run'))\n"
+        "await page.get_by_role('button', name='Run').click()\n"
+        "await remove_annotations(page)\n"
+    )
+    assert _actions(plan) == [("click", "page.get_by_role('button', name='Run')", True)]
+    assert plan.clear_annotations
+    assert plan.round_trips == 3
+    assert plan.original_round_trips == 5
+
+
+def test_removed_highlight_without_action_is_drawn_and_cleared():
+    plan = parse_interaction_code(
+        "await highlight_element(page, page.locator('#x'))\n"
+        "await remove_annotations(page)\n"
+        "await page.locator('#y').click()\n"
+    )
+    assert _actions(plan) == [
+        ("highlight", "page.locator('#x')", True),
+        ("click", "page.locator('#y')", False),
+    ]
+    assert plan.clear_annotations
+
+
+def test_last_highlight_without_removal_is_kept():
+    plan = parse_interaction_code(
+        "await highlight_element(page, page.locator('#x'))\n"
+        "await page.locator('#x').click()\n"
+        "await remove_annotations(page)\n"
+        "await highlight_element(page, page.locator('#y'))\n"
+        "await page.locator('#y').click()\n"
+    )
+    assert not plan.clear_annotations
+
+
+def test_highlight_of_another_element_becomes_its_own_step():
+    plan = parse_interaction_code(
+        "await highlight_element(page, page.locator('#x'))\n"
+        "await page.locator('#y').click()\n"
+        "await remove_annotations(page)\n"
+    )
+    assert _actions(plan) == [("highlight", "page.locator('#x')", True), ("click", "page.locator('#y')", False)]
+    assert plan.clear_annotations
+
+
+def test_wait_for_before_an_action_on_the_same_element_is_dropped():
+    plan = parse_interaction_code(
+        "cell = page.locator('.jp-Cell').first\n"
+        "await cell.wait_for()\n"
+        "await cell.click()\n"
+        "await page.keyboard.press('Shift+Enter')\n"
+    )
+    assert [step.action for step in plan.steps] == ["click", "press"]
+
+
+def test_get_by_aria_label_is_an_alias():
+    plan = parse_interaction_code("await page.get_by_aria_label('Bold').click()")
+    assert plan.steps[0].chain == [("get_by_label", ["Bold"], {})]
+
+
+@pytest.mark.parametrize("code", [
+    # Everything the sanitizer in execute_interaction rewrites or drops must not be planned.
+    "asyncio.run(main())",
+    "async def main():\n    await page.click('#x')",
+    "if __name__ == '__main__':\n    pass",
+    "await locator('#x').click()",
+    "await element.click()",
+    "await page.page.locator('#x').click()",
+    "await page.evaluate('arguments[0].click()')",
+    "await page.locator('#x').evaluate('el => el.click()')",
+    "await page.locator(selector).click()",
+    "for i in range(3):\n    await page.keyboard.press('Tab')",
+    "await page.goto('https://example.com')",
+])
+def test_code_outside_the_supported_subset_is_not_planned(code):
+    assert parse_interaction_code(code) is None
+
+
+def test_failed_highlight_does_not_abort_the_interaction():
+    plan = parse_interaction_code(
+        "await highlight_element(page, page.locator('#x'))\n"
+        "await page.locator('#x').click()\n"
+    )
+    page = mock.MagicMock()
+    page.locator.return_value.click = mock.AsyncMock()
+    with mock.patch.object(interaction_plan, "highlight_locator", mock.AsyncMock(side_effect=RuntimeError("no overlay"))):
+        result = asyncio.run(execute_plan(page, plan))
+    assert result["success"]
+    page.locator.return_value.click.assert_awaited_once()
@@ -0,0 +1,53 @@
+# File: session-bubble/tests/test_jupyter_parser.py
+"""Unit tests for the locators JupyterParser emits."""
+import asyncio
+
+from aurora_agent.parsers.jupyter_parser import JupyterParser
+from aurora_agent.ui_tools.interaction_plan import parse_interaction_code
+
+
+class FakePage:
+    def __init__(self, state):
+        self.state = state
+
+    async def evaluate(self, script, arg=None):
+        return self.state
+
+
+def _cell(index, window_index=None, rendered=True):
+    return {"index": index, "type": "code", "source": "x = 1", "rendered": rendered, "window_index": window_index}
+
+
+def _elements(state):
+    return asyncio.run(JupyterParser().get_interactive_elements(FakePage(state)))
+
+
+def test_cell_locators_are_single_selectors():
+    state = {"model": True, "notebook": {"active_cell": 0}, "kernel": None, "commands": [],
+             "cells": [_cell(0, "0"), _cell(7, "7", rendered=False)]}
+    cells = [element for element in _elements(state) if element["element_id"].startswith("jupyter-cell-")]
+    assert cells[1]["playwright_locator"] == (
+        "page.locator(\".jp-Notebook .jp-Cell[data-windowed-list-index='7'] .jp-InputArea-editor\")"
+    )
+    assert "scroll_into_view" in cells[1]
+    for cell in cells:
+        # One call on `page`, so the legacy sanitizer's locator( rewrite cannot widen it
+        assert cell["playwright_locator"].count("locator(") == 1
+        assert parse_interaction_code(f"await {cell['playwright_locator']}.click()") is not None
+
+
+def test_unwindowed_cells_are_indexed_within_the_selector():
+    state = {"model": True, "notebook": None, "kernel": None, "commands": [], "cells": [_cell(0), _cell(1)]}
+    locators = [element["playwright_locator"] for element in _elements(state)]
+    assert locators[1] == "page.locator(\".jp-Notebook .jp-Cell >> nth=1 >> .jp-InputArea-editor\")"
+
+
+def test_fallback_without_app_model_keeps_toolbar_buttons():
+    state = {"model": False, "notebook": None, "kernel": None, "cells": [_cell(0)], "commands": [
+        {"id": "notebook:insert-cell-below", "label": "Insert a cell below", "enabled": True, "in_toolbar": True},
+    ]}
+    command = _elements(state)[0]
+    assert command["playwright_locator"] == (
+        "page.locator(\".jp-NotebookPanel-toolbar [data-command='notebook:insert-cell-below']\")"
+    )
+    assert "run_command" not in command
@@ -0,0 +1,71 @@
+# File: session-bubble/tests/test_llm_clients.py
+"""Unit tests for explicit prompt cache creation, backoff and renewal."""
+import asyncio
+
+import pytest
+from google.api_core import exceptions
+from google.generativeai import GenerativeModel, caching
+
+from aurora_agent import llm_clients
+
+INSTRUCTION = "static instructions " * 500
+
+
+class FakeCachedContent:
+    def __init__(self, name):
+        self.name = name
+        self.deleted = False
+
+    def delete(self):
+        self.deleted = True
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Replaces CachedContent.create with a scripted sequence of results."""
+    calls = {"results": [], "created": []}
+
+    def create(**kwargs):
+        result = calls["results"].pop(0)
+        if isinstance(result, Exception):
+            raise result
+        calls["created"].append(result)
+        return result
+
+    monkeypatch.setattr(caching.CachedContent, "create", staticmethod(create))
+    monkeypatch.setattr(GenerativeModel, "from_cached_content", classmethod(lambda cls, cached_content: ("model", cached_content)))
+    for name in ("_cached_contents", "_cache_locks", "_cache_retry_at"):
+        monkeypatch.setattr(llm_clients, name, {})
+    monkeypatch.setattr(llm_clients, "_uncacheable", set())
+    return calls
+
+
+def _cached_model():
+    return asyncio.run(llm_clients._cached_model("gemini-2.5-flash", INSTRUCTION))
+
+
+def test_transient_errors_back_off_instead_of_disabling_caching(provider, monkeypatch):
+    provider["results"] = [exceptions.ServiceUnavailable("try again"), FakeCachedContent("c1")]
+    assert _cached_model() is None
+    assert not llm_clients._uncacheable
+    # Within the backoff window no new attempt is made
+    assert _cached_model() is None
+    monkeypatch.setattr(llm_clients, "_cache_retry_at", {})
+    assert _cached_model() == ("model", provider["created"][0])
+
+
+def test_definitive_refusal_marks_the_prompt_uncacheable(provider):
+    provider["results"] = [exceptions.InvalidArgument("Cached content is too small")]
+    assert _cached_model() is None
+    assert len(llm_clients._uncacheable) == 1
+
+
+def test_renewal_deletes_the_superseded_cache(provider):
+    first, second = FakeCachedContent("c1"), FakeCachedContent("c2")
+    provider["results"] = [first, second]
+    _cached_model()
+    key = next(iter(llm_clients._cached_contents))
+    model, cached, _ = llm_clients._cached_contents[key]
+    llm_clients._cached_contents[key] = (model, cached, 0)  # Expired
+    assert _cached_model() == ("model", second)
+    assert first.deleted and not second.deleted
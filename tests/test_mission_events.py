@@ -0,0 +1,55 @@
+# File: session-bubble/tests/test_mission_events.py
+"""Unit tests for translating ADK events into mission progress records."""
+from google.adk.events import Event
+from google.genai.types import Content, FunctionCall, FunctionResponse, Part
+
+from aurora_agent.mission_events import (
+    MODEL_TEXT, TOOL_FINISHED, TOOL_STARTED, MissionEventTranslator, final_text, format_sse,
+)
+
+
+def _model_event(*parts, partial=None):
+    return Event(author="expert_agent", invocation_id="inv", partial=partial, content=Content(role="model", parts=list(parts)))
+
+
+def test_streamed_chunks_then_final_text():
+    translator = MissionEventTranslator()
+    events = [
+        _model_event(Part(text="Opening the "), partial=True),
+        _model_event(Part(text="Insert menu."), partial=True),
+        _model_event(Part(text="Opening the Insert menu.")),
+    ]
+    records = [r for event in events for r in translator.translate(event)]
+    assert records == [
+        {"type": MODEL_TEXT, "text": "Opening the ", "partial": True},
+        {"type": MODEL_TEXT, "text": "Insert menu.", "partial": True},
+        {"type": MODEL_TEXT, "text": "Opening the Insert menu.", "partial": False},
+    ]
+    assert [final_text(event) for event in events] == [None, None, "Opening the Insert menu."]
+
+
+def test_tool_calls_are_reported_once_with_duration():
+    translator = MissionEventTranslator()
+    call = _model_event(Part(function_call=FunctionCall(id="c1", name="click", args={"selector": "#run"})))
+    response = Event(author="expert_agent", invocation_id="inv", content=Content(role="user", parts=[
+        Part(function_response=FunctionResponse(id="c1", name="click", response={"result": "Clicked"})),
+    ]))
+    started = translator.translate(call)
+    finished = translator.translate(response)
+    assert started == [{"type": TOOL_STARTED, "tool": "click", "call_id": "c1", "args": {"selector": "#run"}}]
+    assert finished[0]["type"] == TOOL_FINISHED
+    assert finished[0]["ok"] and finished[0]["result"] == "Clicked"
+    assert finished[0]["duration_ms"] is not None
+
+
+def test_thoughts_and_user_text_are_not_streamed():
+    translator = MissionEventTranslator()
+    assert translator.translate(_model_event(Part(text="thinking", thought=True), partial=True)) == []
+    user = Event(author="user", invocation_id="inv", content=Content(role="user", parts=[Part(text="hi")]))
+    assert translator.translate(user) == []
+
+
+def test_sse_format():
+    assert format_sse({"type": MODEL_TEXT, "seq": 3, "text": "hi"}) == (
+        'event: model_text\nid: 3\ndata: {"type": "model_text", "seq": 3, "text": "hi"}\n\n'
+    )
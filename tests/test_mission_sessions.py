@@ -0,0 +1,107 @@
+# File: session-bubble/tests/test_mission_sessions.py
+"""Unit tests for mission runners and session persistence, run on an in-memory store."""
+import asyncio
+import time
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.events import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai.types import Content, Part
+
+from aurora_agent import mission_sessions
+from aurora_agent.mission_sessions import APP_NAME, STAGING_SUFFIX, SUMMARY_PREFIX
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Stands in for the database session store and starts from empty caches."""
+    service = InMemorySessionService()
+    monkeypatch.setattr(mission_sessions, "_session_service", service)
+    monkeypatch.setattr(mission_sessions, "_ephemeral_service", None)
+    monkeypatch.setattr(mission_sessions, "_runners", {})
+    monkeypatch.setattr(mission_sessions, "_session_locks", {})
+    return service
+
+
+def _agent(name="tutor"):
+    return LlmAgent(name=name, model="gemini-2.5-flash", instruction="Help the student.")
+
+
+def _message(author, text, timestamp):
+    return Event(author=author, invocation_id=f"inv-{timestamp}", timestamp=timestamp,
+                 content=Content(role="user" if author == "user" else "model", parts=[Part(text=text)]))
+
+
+async def _seed(service, session_id, turns):
+    session = await service.create_session(app_name=APP_NAME, user_id="u1", session_id=session_id)
+    started = time.time() - 1000
+    for i in range(turns):
+        await service.append_event(session, _message("user", f"question {i} " + "x" * 200, started + 2 * i))
+        await service.append_event(session, _message("tutor", f"answer {i} " + "y" * 200, started + 2 * i + 1))
+    return session
+
+
+def test_runners_are_cached_per_agent_and_store(store):
+    agent = _agent()
+    persistent = mission_sessions.get_runner(agent)
+    assert mission_sessions.get_runner(agent) is persistent
+    assert persistent.session_service is store
+    ephemeral = mission_sessions.get_runner(agent, persistent=False)
+    assert ephemeral is not persistent and ephemeral.session_service is not store
+
+
+def test_prepare_session_compacts_long_history(store):
+    async def scenario():
+        await _seed(store, "lesson", turns=20)
+        session = await mission_sessions.prepare_session("u1", "lesson", token_budget=500)
+        staging = await store.get_session(app_name=APP_NAME, user_id="u1", session_id="lesson" + STAGING_SUFFIX)
+        return session, staging
+
+    session, staging = asyncio.run(scenario())
+    assert session.events[0].content.parts[0].text.startswith(SUMMARY_PREFIX)
+    assert len(session.events) <= mission_sessions.KEEP_RECENT_EVENTS + 1
+    assert session.events[1].author == "user"
+    assert staging is None
+
+
+def test_interrupted_compaction_is_completed(store):
+    async def scenario():
+        original = await _seed(store, "lesson", turns=2)
+        staged = await _seed(store, "lesson" + STAGING_SUFFIX, turns=1)
+        await store.delete_session(app_name=APP_NAME, user_id="u1", session_id=original.id)
+        session = await mission_sessions.prepare_session("u1", "lesson")
+        return session, staged
+
+    session, staged = asyncio.run(scenario())
+    assert [event.id for event in session.events] == [event.id for event in staged.events]
+
+
+def test_unnamed_sessions_are_ephemeral(store):
+    async def scenario():
+        agent = _agent()
+        async with mission_sessions.mission_session(agent, "u1", None) as (runner, first):
+            assert await runner.session_service.get_session(app_name=APP_NAME, user_id="u1", session_id=first)
+            assert not mission_sessions._session_locks
+        async with mission_sessions.mission_session(agent, "u1", None) as (runner, second):
+            pass
+        leftover = await runner.session_service.get_session(app_name=APP_NAME, user_id="u1", session_id=first)
+        persisted = await store.list_sessions(app_name=APP_NAME, user_id="u1")
+        return first, second, leftover, persisted
+
+    first, second, leftover, persisted = asyncio.run(scenario())
+    assert first != second
+    assert leftover is None
+    assert not persisted.sessions
+
+
+def test_named_sessions_persist_and_release_their_lock(store):
+    async def scenario():
+        async with mission_sessions.mission_session(_agent(), "u1", "lesson") as (runner, session_id):
+            assert ("u1", "lesson") in mission_sessions._session_locks
+        return runner, session_id, await store.get_session(app_name=APP_NAME, user_id="u1", session_id="lesson")
+
+    runner, session_id, session = asyncio.run(scenario())
+    assert session_id == "lesson" and session is not None
+    assert runner.session_service is store
+    assert not mission_sessions._session_locks
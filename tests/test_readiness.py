@@ -0,0 +1,32 @@
+# File: session-bubble/tests/test_readiness.py
+"""Unit tests for the navigation readiness wait."""
+import asyncio
+
+from aurora_agent.parsers.readiness import goto_and_wait_until_ready
+
+
+class FakePage:
+    def __init__(self, goto_seconds):
+        self.url = "about:blank"
+        self.goto_seconds = goto_seconds
+        self.wait_timeouts = []
+
+    async def goto(self, url, wait_until, timeout):
+        await asyncio.sleep(self.goto_seconds)
+        self.url = url
+
+    async def wait_for_function(self, expression, timeout):
+        self.wait_timeouts.append(timeout)
+
+
+def test_navigation_and_readiness_share_one_deadline():
+    page = FakePage(goto_seconds=0.2)
+    assert asyncio.run(goto_and_wait_until_ready(page, "https://example.com/", timeout=1000))
+    assert len(page.wait_timeouts) == 1
+    assert page.wait_timeouts[0] <= 800
+
+
+def test_readiness_gets_a_minimal_budget_after_a_slow_navigation():
+    page = FakePage(goto_seconds=0.05)
+    asyncio.run(goto_and_wait_until_ready(page, "https://example.com/", timeout=10))
+    assert page.wait_timeouts == [1]
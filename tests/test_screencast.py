@@ -0,0 +1,84 @@
+# File: session-bubble/tests/test_screencast.py
+"""Flow-control tests for ScreencastSession against a fake CDP session."""
+import asyncio
+import json
+
+from aurora_agent import screencast
+from aurora_agent.screencast import ScreencastSession
+
+
+class FakeChromium:
+    """Emits a frame whenever fewer than `slots` frames are unacked, like Chromium."""
+
+    def __init__(self, slots: int = 2):
+        self.slots = slots
+        self.unacked = set()
+        self.acked = []
+        self.next_session = 0
+        self.handler = None
+
+    def on(self, event, handler):
+        self.handler = handler
+
+    async def send(self, method, params=None):
+        if method == "Page.screencastFrameAck":
+            self.acked.append(params["sessionId"])
+            self.unacked.discard(params["sessionId"])
+        if method in ("Page.startScreencast", "Page.screencastFrameAck"):
+            asyncio.get_running_loop().call_soon(self.emit)
+
+    def emit(self):
+        while len(self.unacked) < self.slots:
+            self.next_session += 1
+            self.unacked.add(self.next_session)
+            asyncio.ensure_future(self.handler({"sessionId": self.next_session, "data": "", "metadata": {}}))
+
+    async def detach(self):
+        pass
+
+
+class FakePage:
+    url = "about:blank"
+
+    def __init__(self, cdp):
+        self.context = self
+        self.cdp = cdp
+
+    async def new_cdp_session(self, page):
+        return self.cdp
+
+
+async def _stream(client_acks: bool, seconds: float):
+    chromium = FakeChromium()
+    sent = []
+
+    async def send(message):
+        sent.append(json.loads(message)["seq"])
+
+    session = ScreencastSession(FakePage(chromium), send, max_fps=100)
+    await session.start()
+    deadline = asyncio.get_running_loop().time() + seconds
+    acked_seq = 0
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+        if client_acks and sent and sent[-1] > acked_seq:
+            acked_seq = sent[-1]
+            await session.handle_client_ack(acked_seq)
+    await session.stop()
+    return chromium, sent
+
+
+def test_every_received_frame_is_acked_once_while_the_client_keeps_up():
+    chromium, sent = asyncio.run(_stream(client_acks=True, seconds=0.3))
+    assert len(sent) > 10
+    assert len(chromium.acked) == len(set(chromium.acked))
+    # Only the frames still in flight at the end are unacked.
+    assert len(chromium.unacked) <= chromium.slots
+
+
+def test_silent_client_does_not_stall_the_stream(monkeypatch):
+    monkeypatch.setattr(screencast, "LOST_FRAME_SECONDS", 0.05)
+    chromium, sent = asyncio.run(_stream(client_acks=False, seconds=0.4))
+    # Unacked frames are written off on a timer, so frames keep flowing at a reduced rate.
+    assert len(sent) > 4
+    assert len(chromium.acked) == len(set(chromium.acked))
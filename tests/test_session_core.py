@@ -0,0 +1,71 @@
+# File: session-bubble/tests/test_session_core.py
+"""Unit tests for verifying candidate actions against the sheet."""
+import asyncio
+
+from aurora_agent.session_core import CandidateAction, LocalSheetsReader, VerificationSession, values_match
+
+
+class RenderingReader:
+    """Answers reads the way the Sheets API renders a few formatted cells."""
+
+    CELLS = {
+        "FORMATTED_VALUE": {"B2": "50%", "B3": "1,000", "B4": "=not a formula", "C2": "6"},
+        "FORMULA": {"B2": 0.5, "B3": 1000, "C2": "=SUM(A1:A3)"},
+    }
+
+    def __init__(self):
+        self.options = []
+
+    async def batch_get(self, spreadsheet_id, ranges, value_render_option="FORMATTED_VALUE"):
+        from aurora_agent.session_core import parse_a1, to_a1
+
+        self.options.append(value_render_option)
+        cells = self.CELLS[value_render_option]
+        result = {}
+        for a1_range, _, (left, top) in ranges:
+            right, bottom = parse_a1(a1_range.split("!")[-1].split(":")[-1])
+            result[a1_range] = [[cells.get(to_a1(c, r), "") for c in range(left, right + 1)] for r in range(top, bottom + 1)]
+        return result
+
+
+def test_values_match_formatted_numbers_and_formulas():
+    assert values_match("50%", "50%")
+    assert values_match("1,000", "1000")
+    assert values_match("$12.50", "12.5")
+    assert not values_match("1,001", "1000")
+    assert not values_match("abc", "abd")
+    assert values_match("=SUM(A1:A3)", "=sum( a1:a3 )", formula=True)
+
+
+def test_typed_values_read_formatted_and_formulas_read_as_formulas():
+    reader = RenderingReader()
+    session = VerificationSession("teacher", sheets_reader=reader, translator=object(), capture=False)
+    session.spreadsheet_id = "sheet"
+    actions = [
+        CandidateAction("edit_cell", "typed 50%", sheet="Sheet1", cell="B2", expected_value="50%"),
+        CandidateAction("edit_cell", "typed 1000", sheet="Sheet1", cell="B3", expected_value="1000"),
+        CandidateAction("enter_formula", "sum", sheet="Sheet1", cell="C2", expected_value="=sum(A1:A3)"),
+        CandidateAction("ui_action", "clicked Bold"),
+    ]
+    results = asyncio.run(session.verify_batch(actions))
+    assert [r.verified for r in results] == [True, True, True, None]
+    assert sorted(reader.options) == ["FORMATTED_VALUE", "FORMULA"]
+
+
+def test_local_reader_fails_edits_that_disagree_with_its_grid():
+    async def scenario():
+        session = VerificationSession(
+            "teacher", sheets_reader=LocalSheetsReader({"Sheet1": {"A1": "42"}}),
+            translator=object(), capture=False,
+        )
+        session.active = True
+        session.spreadsheet_id = "sheet"
+        # Submitting an edit must not teach the offline grid the expected value
+        session.submit_raw_event({"kind": "edit", "sheet": "Sheet1", "cell": "A2", "value": "7"})
+        return await session.verify_batch([
+            CandidateAction("edit_cell", "typed 42", sheet="Sheet1", cell="A1", expected_value="42"),
+            CandidateAction("edit_cell", "typed 7", sheet="Sheet1", cell="A2", expected_value="7"),
+        ])
+
+    results = asyncio.run(scenario())
+    assert [r.verified for r in results] == [True, False]
@@ -0,0 +1,62 @@
+# File: session-bubble/tests/test_spatial_index.py
+"""Unit tests for the spatial index and its per-page lifetime."""
+import asyncio
+import gc
+import weakref
+
+from aurora_agent.spatial_index import SpatialGrid, SpatialIndex
+
+ITEMS = [
+    {"layer": "controls", "name": "outer", "bounds": [0, 0, 300, 300]},
+    {"layer": "controls", "name": "inner", "bounds": [100, 100, 50, 50]},
+    {"layer": "controls", "name": "far", "bounds": [600, 0, 40, 40]},
+]
+
+
+class FakePage:
+    main_frame = object()
+
+    def __init__(self):
+        self.bindings = {}
+        self.handlers = {}
+
+    async def expose_binding(self, name, callback):
+        self.bindings[name] = callback
+
+    async def add_init_script(self, script):
+        pass
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    async def evaluate(self, script, arg=None):
+        return {"scroll_x": 0, "scroll_y": 0, "viewport": [800, 600], "full": True, "items": ITEMS}
+
+    def close(self):
+        for handler in self.handlers.get("close", []):
+            handler(self)
+
+
+def test_grid_returns_innermost_and_nearest_items():
+    grid = SpatialGrid(ITEMS, cell_size=64)
+    assert [item["name"] for item in grid.at(120, 120)] == ["inner", "outer"]
+    assert [item["name"] for item in grid.near((560, 10, 10, 10), radius=50)] == ["far"]
+
+
+def test_closed_pages_are_dropped():
+    index = SpatialIndex()
+    page = FakePage()
+    assert asyncio.run(index.element_at(page, 120, 120))["name"] == "inner"
+    page.close()
+    assert len(index._pages) == 0
+
+
+def test_index_does_not_keep_its_page_alive():
+    index = SpatialIndex()
+    page = FakePage()
+    asyncio.run(index.for_page(page))
+    page_ref = weakref.ref(page)
+    del page
+    gc.collect()
+    assert page_ref() is None
+    assert len(index._pages) == 0
@@ -0,0 +1,39 @@
+# File: session-bubble/tests/test_webhook_handler.py
+"""Unit tests for webhook delivery deduplication."""
+import asyncio
+
+from aurora_agent.webhook_handler import WebhookHandler, fingerprint
+
+EDIT = {"spreadsheet_id": "s1", "sheet_name": "Grades", "range": "B2", "change_type": "EDIT", "value": "A"}
+
+
+def _statuses(events):
+    async def scenario():
+        handler = WebhookHandler(window_ms=10)
+        results = [(await handler.process_event(event, "teacher-1"))["status"] for event in events]
+        await handler.stop()
+        return results
+
+    return asyncio.run(scenario())
+
+
+def test_retried_delivery_is_dropped():
+    event = dict(EDIT, timestamp="2026-10-18T10:00:00Z")
+    assert _statuses([event, dict(event)]) == ["accepted", "duplicate"]
+
+
+def test_repeating_an_edit_is_not_a_duplicate():
+    first = dict(EDIT, timestamp="2026-10-18T10:00:00Z")
+    changed = dict(EDIT, value="B", timestamp="2026-10-18T10:00:01Z")
+    reverted = dict(EDIT, timestamp="2026-10-18T10:00:02Z")
+    assert _statuses([first, changed, reverted]) == ["accepted"] * 3
+
+
+def test_delivery_id_takes_precedence_over_content():
+    assert fingerprint("u", dict(EDIT, delivery_id="d1")) != fingerprint("u", dict(EDIT, delivery_id="d2"))
+    assert fingerprint("u", dict(EDIT, delivery_id="d1", value="B")) == fingerprint("u", dict(EDIT, delivery_id="d1"))
+
+
+def test_events_without_identity_are_never_deduplicated():
+    assert fingerprint("u", EDIT) is None
+    assert _statuses([EDIT, dict(EDIT)]) == ["accepted", "accepted"]
@@ -0,0 +1,74 @@
+# File: session-bubble/tests/test_websocket_manager.py
+"""Unit tests for WebSocketManager group authorization."""
+import asyncio
+
+from aurora_agent.websocket_manager import WebSocketManager
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(text)
+
+
+async def _connect(manager, user_id, groups=()):
+    socket = FakeSocket()
+    await manager.connect(user_id, socket, groups)
+    return socket
+
+
+def test_clients_only_join_granted_groups():
+    async def scenario():
+        manager = WebSocketManager()
+        manager.grant_group("class-7b", ["teacher-1"])
+        teacher = await _connect(manager, "teacher-1", ["class-7b"])
+        intruder = await _connect(manager, "someone", ["class-7b"])
+        assert not manager.request_join("someone", "class-7b")
+        await manager.broadcast_to_group("class-7b", {"type": "update"})
+        await asyncio.sleep(0)
+        return teacher.sent, intruder.sent
+
+    teacher_sent, intruder_sent = asyncio.run(scenario())
+    assert teacher_sent == ['{"type": "update"}']
+    assert intruder_sent == []
+
+
+def test_revoking_access_removes_members():
+    async def scenario():
+        manager = WebSocketManager()
+        manager.grant_group("class-7b", ["teacher-1"])
+        await _connect(manager, "teacher-1", ["class-7b"])
+        manager.revoke_group("class-7b")
+        return manager
+
+    manager = asyncio.run(scenario())
+    assert "class-7b" not in manager.groups
+    assert not manager.request_join("teacher-1", "class-7b")
+
+
+def test_custom_authorizer():
+    manager = WebSocketManager(group_authorizer=lambda user_id, group: group == f"user:{user_id}")
+    assert manager.request_join("u1", "user:u1")
+    assert not manager.request_join("u1", "user:u2")
+
+
+def test_only_whole_heartbeat_frames_are_answered_raw():
+    async def scenario():
+        manager = WebSocketManager()
+        socket = FakeSocket()
+        connection = await manager.connect("u1", socket)
+        handled = [
+            manager.handle_heartbeat(connection, frame)
+            for frame in ("ping", '{"type":"heartbeat"}', '{"type": "chat", "text": "{\\"type\\":\\"heartbeat\\"}"}')
+        ]
+        await asyncio.sleep(0)
+        return handled, socket.sent
+
+    handled, sent = asyncio.run(scenario())
+    assert handled == [True, True, False]
+    assert len(sent) == 2 and all('"heartbeat_response"' in text for text in sent)
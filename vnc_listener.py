@@ -25,6 +25,7 @@ Message Format:
 import asyncio
 import json
 import logging
+import os
 import sys
 import websockets
 import websockets.server
@@ -44,10 +45,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger('vnc_listener')
 
+# "vnc" shows a headed browser on Xvfb for x11vnc; "screencast" runs Chromium headless
+# and streams CDP screencast frames over a WebSocket instead.
+DISPLAY_MODE = os.getenv("BROWSER_DISPLAY_MODE", "vnc")
+SCREENCAST_PORT = int(os.getenv("SCREENCAST_PORT", "8767"))
+
 class BrowserAutomationHandler:
     """Handles browser automation using Playwright"""
     
-    def __init__(self):
+    def __init__(self, headless: bool = False):
+        self.headless = headless
+        self.screencasts = set()  # Active ScreencastSessions, they follow the active tab
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.page: Optional[Page] = None
@@ -63,7 +71,7 @@ class BrowserAutomationHandler:
             
             # Launch browser with options suitable for Docker/VNC environment
             self.browser = await self.playwright.chromium.launch(
-                headless=False,  # We want to see the browser in VNC
+                headless=self.headless,  # Headed for VNC, headless when screencasting
                 args=[
                     '--no-sandbox',
                     '--disable-dev-shm-usage',
@@ -101,6 +109,9 @@ class BrowserAutomationHandler:
     async def cleanup(self):
         """Clean up browser resources"""
         try:
+            for session in list(self.screencasts):
+                await session.stop()
+            self.screencasts.clear()
             if self.page:
                 await self.page.close()
             if self.browser:
@@ -131,6 +142,7 @@ class BrowserAutomationHandler:
                 self.pages.append(new_page)
                 self.current_page_index = len(self.pages) - 1
                 self.page = new_page  # Switch to the new tab
+                await self._follow_active_page()
                 
                 logger.info(f"Opened new tab {self.current_page_index + 1}. Total tabs: {len(self.pages)}")
                 return f"Successfully opened new tab {self.current_page_index + 1}"
@@ -141,6 +153,15 @@ class BrowserAutomationHandler:
             logger.error(f"Failed to open new tab: {e}")
             return f"Error opening new tab: {str(e)}"
     
+    async def _follow_active_page(self):
+        """Moves running screencasts to the currently active tab."""
+        for session in list(self.screencasts):
+            try:
+                await session.switch_page(self.page)
+            except Exception as e:
+                logger.error(f"Failed to move screencast to the active tab: {e}")
+                self.screencasts.discard(session)
+
     async def switch_to_tab(self, tab_index: int) -> str:
         """Switch to a specific tab by index (1-based)"""
         try:
@@ -154,6 +175,7 @@ class BrowserAutomationHandler:
             self.current_page_index = zero_based_index
             self.page = self.pages[zero_based_index]
             await self.page.bring_to_front()
+            await self._follow_active_page()
             
             logger.info(f"Switched to tab {tab_index}")
             return f"Successfully switched to tab {tab_index}"
@@ -232,8 +254,9 @@ class BrowserAutomationHandler:
         if not current_page:
             raise ValueError("No active page available for navigation")
         
-        # Navigate to the URL in the current active page
-        await current_page.goto(url, wait_until='domcontentloaded')
+        # Navigate and wait for the application's own readiness signal
+        from aurora_agent.parsers.readiness import goto_and_wait_until_ready
+        await goto_and_wait_until_ready(current_page, url)
         
         # Bring the page to front for visibility
         try:
@@ -441,15 +464,16 @@ async def get_global_browser_handler():
     """Get or create the global browser handler instance"""
     global _global_browser_handler
     if _global_browser_handler is None:
-        _global_browser_handler = BrowserAutomationHandler()
+        _global_browser_handler = BrowserAutomationHandler(headless=DISPLAY_MODE == "screencast")
         await _global_browser_handler.initialize()
     return _global_browser_handler
 
 class VNCListener:
     """Main VNC listener class"""
     
-    def __init__(self, port: int = 8765):
+    def __init__(self, port: int = 8765, screencast_port: Optional[int] = None):
         self.port = port
+        self.screencast_port = screencast_port
         self.running = False
     
     async def start(self):
@@ -465,7 +489,12 @@ class VNCListener:
             # This line is already correct from your previous fix
             async with websockets.serve(self.handle_client, '0.0.0.0', self.port):
                 logger.info("VNC listener server started successfully on 0.0.0.0")
-                await self.wait_for_shutdown()
+                if self.screencast_port:
+                    async with websockets.serve(self.handle_screencast_client, '0.0.0.0', self.screencast_port):
+                        logger.info(f"Screencast server started on 0.0.0.0:{self.screencast_port}")
+                        await self.wait_for_shutdown()
+                else:
+                    await self.wait_for_shutdown()
                 
         except Exception as e:
             logger.error(f"Failed to start VNC listener: {e}")
@@ -518,6 +547,35 @@ class VNCListener:
         except Exception as e:
             logger.error(f"Error with client {client_addr}: {e}")
     
+    async def handle_screencast_client(self, websocket, path='/'):
+        """
+        Streams the active tab to a viewer. The viewer sends back
+        {"type": "frame_ack", "seq": N} for each frame it has displayed, which
+        drives frame rate and JPEG quality; {"type": "set_fps", "fps": N} caps the rate.
+        """
+        from aurora_agent.screencast import ScreencastSession
+
+        client_addr = websocket.remote_address
+        logger.info(f"Screencast viewer connected: {client_addr}")
+        browser_handler = await get_global_browser_handler()
+        session = ScreencastSession(browser_handler.page, websocket.send)
+        try:
+            await session.start()
+            browser_handler.screencasts.add(session)
+            async for message in websocket:
+                try:
+                    await session.handle_client_message(message)
+                except (json.JSONDecodeError, KeyError, ValueError) as e:
+                    logger.warning(f"Ignoring malformed screencast message from {client_addr}: {e}")
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        except Exception as e:
+            logger.error(f"Screencast error with {client_addr}: {e}")
+        finally:
+            browser_handler.screencasts.discard(session)
+            await session.stop()
+            logger.info(f"Screencast viewer disconnected: {client_addr}")
+
     async def wait_for_shutdown(self):
         """Wait for shutdown signal"""
         try:
@@ -535,12 +593,18 @@ class VNCListener:
 
 async def main():
     """Main entry point"""
+    global DISPLAY_MODE
     import argparse
     
     parser = argparse.ArgumentParser(description='VNC Listener for Browser Automation')
     # --- CHANGE HERE: Remove the '--host' argument ---
     # parser.add_argument('--host', default='localhost', help='Host to bind to (default: localhost)')
     parser.add_argument('--port', type=int, default=8765, help='Port to bind to (default: 8765)')
+    parser.add_argument('--display-mode', default=DISPLAY_MODE, choices=['vnc', 'screencast'],
+                       help='vnc: headed browser for x11vnc; screencast: headless browser streamed over CDP '
+                            '(default: $BROWSER_DISPLAY_MODE or vnc)')
+    parser.add_argument('--screencast-port', type=int, default=SCREENCAST_PORT,
+                       help='Port for the screencast WebSocket in screencast mode (default: 8767)')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                        help='Log level (default: INFO)')
     
@@ -550,7 +614,8 @@ async def main():
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
     # --- CHANGE HERE: Do not pass the host to the VNCListener constructor ---
-    listener = VNCListener(args.port)
+    DISPLAY_MODE = args.display_mode
+    listener = VNCListener(args.port, screencast_port=args.screencast_port if DISPLAY_MODE == 'screencast' else None)
     
     try:
         await listener.start()